@@ -0,0 +1,190 @@
+import os
+import re
+import gzip
+import fnmatch
+import hashlib
+import mimetypes
+from collections import namedtuple
+from flask import Response, request
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    # Brotli is optional, without it the media is only compressed with gzip
+    brotli = None
+
+'''
+Media pipeline of the visualizer. When the visualizer starts, the images in the media folder are read, fingerprinted
+by the hash of their content and compressed once with gzip (and brotli, if the brotli package is installed). The views
+get a manifest that maps the image names of the objects ('/images/tree.svg') to fingerprinted urls
+('/media/<fingerprint>/images/tree.svg'), which browsers may cache forever because the url changes with the content.
+The victim and terrain icons are bundled into one SVG sprite sheet, in which every icon has a <view> with its own
+name, so a view loads all of them with a single request: '/media/<fingerprint>/sprite.svg#healthy_girl'.
+Images outside the manifest are still served by /fetch_external_media, with an ETag so the browser revalidates them
+instead of downloading them again.
+'''
+
+# Folders of the media folder with the images of the world, which are loaded when the visualizer starts
+media_subfolders = ['images']
+# Extensions of the media files that are loaded when the visualizer starts
+media_extensions = ['.svg', '.png', '.gif', '.jpg', '.jpeg', '.ico']
+# Icons bundled into the sprite sheet: the victims, and the roofs, water, streets, plants, trees, stones and signs
+sprite_icons = ['critically injured *.svg', 'mildly injured *.svg', 'healthy *.svg', 'roof*.svg', 'lake*.svg',
+                'pool*.svg', 'paving*.svg', 'plant*.svg', 'tree*.svg', 'stone*.svg', 'rocks.svg', 'sign*.svg']
+# Name of the sprite sheet in the media urls
+sprite_name = 'sprite.svg'
+# Space between the icons of the sprite sheet, so the edges of an icon never show its neighbours
+sprite_gap = 4
+# Seconds fingerprinted media may be cached, one year
+immutable_max_age = 31536000
+
+# A media file: its content, its compressed content by content coding, its fingerprint and its mimetype
+MediaFile = namedtuple('MediaFile', ['data', 'encodings', 'fingerprint', 'mimetype'])
+
+_svg_element = re.compile(r'<svg\b([^>]*)>(.*)</svg>\s*$', re.S)
+_attribute = re.compile(r'([\w:.-]+)\s*=\s*("[^"]*"|\'[^\']*\')')
+_style_element = re.compile(r'(<style\b[^>]*>)(.*?)(</style>)', re.S)
+# Attributes of the root of an icon that the sprite sheet replaces or drops
+_sprite_attributes = {'id', 'x', 'y', 'width', 'height', 'viewBox', 'version', 'xml:space', 'class'}
+
+
+def media_file(data, mimetype):
+    '''
+    @return the MediaFile of the content, compressed if it is text like SVG (other images are compressed already)
+    '''
+    encodings = {}
+    if mimetype.startswith('text/') or mimetype == 'image/svg+xml':
+        encodings['gzip'] = gzip.compress(data, compresslevel=9, mtime=0)
+        if brotli is not None:
+            encodings['br'] = brotli.compress(data)
+    return MediaFile(data, encodings, hashlib.sha256(data).hexdigest()[:12], mimetype)
+
+
+def _sprite_icon(text, prefix):
+    # The attributes, content and view box of an SVG, with its ids and classes prefixed so that the style and
+    # references of the icons of a sprite sheet do not mix. None when the SVG cannot be placed in a sprite sheet
+    match = _svg_element.search(text)
+    if match is None or '<!ENTITY' in text:
+        return None
+    attributes = {name: value[1:-1] for name, value in _attribute.findall(match.group(1))}
+    try:
+        view_box = [float(value) for value in attributes['viewBox'].replace(',', ' ').split()]
+    except (KeyError, ValueError):
+        return None
+    if len(view_box) != 4:
+        return None
+    classes = lambda names: ' '.join(prefix + name for name in names.split())
+    content = match.group(2)
+    content = re.sub(r'\bid="([^"]*)"', lambda m: 'id="{}{}"'.format(prefix, m.group(1)), content)
+    content = re.sub(r'url\(#([^)]*)\)', lambda m: 'url(#{}{})'.format(prefix, m.group(1)), content)
+    content = re.sub(r'href="#([^"]*)"', lambda m: 'href="#{}{}"'.format(prefix, m.group(1)), content)
+    content = re.sub(r'\bclass="([^"]*)"', lambda m: 'class="{}"'.format(classes(m.group(1))), content)
+    content = _style_element.sub(lambda m: m.group(1) + re.sub(r'\.(-?[A-Za-z_][\w-]*)', '.' + prefix + r'\1',
+                                                               m.group(2)) + m.group(3), content)
+    kept = ''.join(' {}="{}"'.format(name, value) for name, value in attributes.items()
+                   if name not in _sprite_attributes and not name.startswith('xmlns'))
+    if 'class' in attributes:
+        kept += ' class="{}"'.format(classes(attributes['class']))
+    return kept, content, view_box
+
+
+def sprite_sheet(icons):
+    '''
+    Bundles SVG icons into one SVG, below each other, with a <view> of every icon to show it on its own.
+    @param icons list of (view id, SVG text) of the icons
+    @return the SVG text of the sprite sheet, and the view ids of the icons that were bundled
+    '''
+    views, icon_svgs, bundled = [], [], []
+    top, width = 0., 0.
+    for nr, (view_id, text) in enumerate(icons):
+        icon = _sprite_icon(text, 'i{}_'.format(nr))
+        if icon is None:
+            continue
+        attributes, content, view_box = icon
+        views.append('<view id="{}" viewBox="0 {:g} {:g} {:g}"/>'.format(view_id, top, view_box[2], view_box[3]))
+        icon_svgs.append('<svg x="0" y="{:g}" width="{:g}" height="{:g}" viewBox="{}"{}>{}</svg>'.format(
+            top, view_box[2], view_box[3], ' '.join('{:g}'.format(value) for value in view_box), attributes, content))
+        bundled.append(view_id)
+        top += view_box[3] + sprite_gap
+        width = max(width, view_box[2])
+    return '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" ' \
+           'width="{0:g}" height="{1:g}" viewBox="0 0 {0:g} {1:g}">\n{2}\n{3}\n</svg>\n'.format(
+               width, top, '\n'.join(views), '\n'.join(icon_svgs)), bundled
+
+
+class MediaLibrary:
+    '''
+    The fingerprinted and compressed media of the visualizer, with the manifest of the urls of the images for the views.
+    '''
+    def __init__(self):
+        self.folder = None
+        # Image names as the objects use them ('/images/tree.svg'), with the url the views load them from
+        self.manifest = {}
+        self._files = {}
+
+    def load(self, folder, sprite=True):
+        '''
+        Reads, fingerprints and compresses the images in the media subfolders of the folder.
+        @param sprite whether to bundle the victim and terrain icons into a sprite sheet
+        '''
+        self.folder = os.fspath(folder)
+        self.manifest = {}
+        self._files = {}
+        icons = []
+        for subfolder in media_subfolders:
+            for root, _, file_names in os.walk(os.path.join(self.folder, subfolder)):
+                for file_name in sorted(file_names):
+                    if os.path.splitext(file_name)[1].lower() not in media_extensions:
+                        continue
+                    path = os.path.relpath(os.path.join(root, file_name), self.folder).replace(os.sep, '/')
+                    media = self.file(path)
+                    self.manifest['/' + path] = '/media/{}/{}'.format(media.fingerprint, path)
+                    if sprite and any(fnmatch.fnmatch(file_name, pattern) for pattern in sprite_icons):
+                        icons.append(('/' + path, media))
+        if icons:
+            view_ids = {path: re.sub(r'[^\w-]', '_', os.path.splitext(os.path.basename(path))[0]) for path, _ in icons}
+            text, bundled = sprite_sheet([(view_ids[path], media.data.decode('utf-8', 'replace'))
+                                          for path, media in icons])
+            sheet = self._files[sprite_name] = media_file(text.encode(), 'image/svg+xml')
+            for path, _ in icons:
+                if view_ids[path] in bundled:
+                    self.manifest[path] = '/media/{}/{}#{}'.format(sheet.fingerprint, sprite_name, view_ids[path])
+        return self
+
+    def file(self, path):
+        '''
+        @return the MediaFile of a file in the media folder, read the first time it is asked for, or None when there is
+        no such file
+        '''
+        if path in self._files:
+            return self._files[path]
+        file_name = safe_join(self.folder, path) if self.folder is not None else None
+        if file_name is None or not os.path.isfile(file_name):
+            return None
+        with open(file_name, 'rb') as media_data:
+            data = media_data.read()
+        media = self._files[path] = media_file(data, mimetypes.guess_type(file_name)[0] or 'application/octet-stream')
+        return media
+
+
+def media_response(media, immutable):
+    '''
+    @return the response of the current request for the media file: 304 Not Modified when the browser has it already,
+    otherwise its content in the best compression the browser accepts
+    @param immutable whether the url is fingerprinted, so the browser may cache the content forever
+    '''
+    encoding = request.accept_encodings.best_match([encoding for encoding in ['br', 'gzip']
+                                                    if encoding in media.encodings])
+    etag = media.fingerprint + ('-' + encoding if encoding else '')
+    headers = {'Vary': 'Accept-Encoding',
+               'Cache-Control': 'public, max-age={}, immutable'.format(immutable_max_age) if immutable else 'no-cache'}
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+    else:
+        response = Response(media.encodings[encoding] if encoding else media.data, mimetype=media.mimetype,
+                            headers=headers)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    return response
@@ -128,6 +128,11 @@ function draw(state, world_settings, new_messages, accessible_chatrooms, new_tic
             obj_vis_settings['subtile_loc'] = obj["subtile_loc"];
         }
 
+        // Tile layers draw their image on each of the tiles in their 'tiles' property
+        if (Object.keys(obj).includes('tiles')) {
+            obj_vis_settings['tiles'] = obj['tiles'];
+        }
+
         var obj_element = null; // the html element of this object
         var animate_movement = false; // whether any x,y position changes should be animated
         var object_is_new = false; // whether this is a new object, not present in the html yet
@@ -198,7 +203,9 @@ function draw(state, world_settings, new_messages, accessible_chatrooms, new_tic
             set_tile_dimensions(obj_element);
 
             // draw the object with the correct shape, size and colour
-            if (obj_vis_settings['img'] != null) {
+            if (Object.keys(obj_vis_settings).includes('tiles')) {
+                gen_tile_layer(obj_vis_settings, obj_element);
+            } else if (obj_vis_settings['img'] != null) {
                 gen_image(obj_vis_settings, obj_element);
             } else if (obj_vis_settings['shape'] == 0) {
                 gen_rectangle(obj_vis_settings, obj_element);
@@ -650,6 +657,46 @@ function gen_image(obj_vis_settings, obj_element) {
 
 
 
+/**
+ * Generate the images of a tile layer, one image on each of its tiles. The layer is only regenerated when its
+ * visualization settings or the tile size change, so a layer with hundreds of tiles is drawn once.
+ *
+ * @param {Object} obj_vis_settings: contains the visualization settings of the layer, including its tiles
+ * @param {HTML Element} obj_element: contains the HTML element of the layer
+ */
+function gen_tile_layer(obj_vis_settings, obj_element) {
+    var size = obj_vis_settings['size'];
+
+    // remove any old tiles
+    while (obj_element.firstChild) {
+        obj_element.removeChild(obj_element.firstChild);
+    }
+
+    // create all tile images before adding them to the grid at once
+    var tiles = document.createDocumentFragment();
+    obj_vis_settings['tiles'].forEach(function(tile) {
+        var shape = document.createElement("img");
+        shape.className = "shape";
+        shape.setAttribute("src", obj_vis_settings["img"]);
+
+        // coords of the top left corner relative to the layer, such that the image is centered in its tile
+        shape.style.left = ((tile[0] - obj_element.cell_x) + (1 - size) * 0.5) * tile_size + "px";
+        shape.style.top = ((tile[1] - obj_element.cell_y) + (1 - size) * 0.5) * tile_size + "px";
+        shape.style.width = size * tile_size + "px";
+        shape.style.height = size * tile_size + "px";
+
+        // set the background as transparent
+        shape.style.background = "transparent";
+        shape.style.opacity = obj_vis_settings["opacity"];
+
+        // let clicks through to the background tile, which has the context menu of that location
+        shape.style.pointerEvents = "none";
+        tiles.append(shape);
+    });
+    obj_element.append(tiles);
+}
+
+
 /**
  * Regenerate all bg tiles in the correct size
  */
@@ -2,6 +2,11 @@
  * In this file the loop is managed for requesting updates via the MATRX API, and calling the draw functions for
  * updating the visualization.
  *
+ * The visualizer server pushes the updates of every tick (the changed objects and new messages) as Server-Sent
+ * Events, which are merged into the state of the view. The objects that never change (walls, doors, area tiles and
+ * tile layers) are not in the updates, but in a layout that is fetched once by hash. The MATRX API is only polled for the full state when the
+ * browser does not support event streams, or the stream failed.
+ *
  * As this file has access to the gen_grid.js file variables, all variables are prefixed with lv_ (loop variable)
  * such that no variables are accidently created in both files, leading to unexpected behaviours.
  */
@@ -41,9 +46,17 @@ var lv_base_url = window.location.hostname,
     lv_init_url = 'http://' + lv_base_url + ':3001/get_info',
     lv_update_url = 'http://' + lv_base_url + ':3001/get_latest_state_and_messages',
     lv_send_userinput_url = 'http://' + lv_base_url + ':3001/send_userinput/',
+    lv_stream_url = '/updates/',
+    lv_layout_url = '/layout/',
     lv_agent_id = "",
     lv_agent_type = null;
 
+// the stream of updates pushed by the visualizer server, null when polling the MATRX API
+var lv_stream = null,
+    lv_stream_update = false, // whether an update was received that has not been drawn yet
+    lv_layouts = {}, // the objects of the static layouts received, by hash
+    lv_pending_updates = null; // the updates received while fetching the layout of a keyframe
+
 // check if message offsets are defined and used in gen_grid.js
 if (typeof chat_offsets !== 'undefined') {
     var chat_offsets = {};
@@ -80,6 +93,7 @@ function init() {
     // init a number of vis variables
     lv_reinitialize_vis = false;
     lv_open_update_request = false;
+    close_update_stream();
 
     // fetch the canvas element from the html
     initialize_grid();
@@ -102,7 +116,8 @@ function init() {
         // if MATRX is running, change the start/pause button to match that
         sync_play_button(lv_matrx_paused);
 
-        // start the visualization loop
+        // receive the updates of every tick from the visualizer server, and start the visualization loop
+        open_update_stream();
         world_loop();
     });
 
@@ -187,6 +202,12 @@ function world_loop() {
         lv_frames_this_second++;
     }
 
+    // updates are pushed by the visualizer server, only draw them
+    if (lv_stream != null) {
+        draw_stream_update();
+        return;
+    }
+
     // Check if we need to fetch an update from MATRX
     var lv_to_update_or_not_to_update = Date.now() > lv_last_update + lv_wait_for_next_tick && !lv_open_update_request;
     var lv_update_request = false
@@ -261,6 +282,155 @@ function request_new_frame() {
 }
 
 
+/*
+ * Draw the updates received from the update stream since the last frame
+ */
+function draw_stream_update() {
+    // we received an update for a different world from our current, so reinitialize the visualization
+    if (lv_new_world_ID != null && lv_world_ID != lv_new_world_ID) {
+        console.log("New world ID received:", lv_new_world_ID);
+        lv_first_tick = false;
+        lv_reinitialize_vis = true;
+        sync_play_button(lv_matrx_paused);
+        return;
+    }
+
+    if (lv_stream_update) {
+        lv_stream_update = false;
+        lv_first_tick = false;
+        draw(lv_state, lv_world_settings, lv_messages, lv_chatrooms, new_tick = true);
+        lv_messages = {};
+    }
+    request_new_frame();
+}
+
+
+/*
+ * Open the stream of updates of this view from the visualizer server, if the browser supports event streams
+ */
+function open_update_stream() {
+    if (typeof(EventSource) === "undefined") {
+        return;
+    }
+    lv_state = {};
+    lv_messages = {};
+    lv_stream_update = false;
+    lv_stream = new EventSource(lv_stream_url + encodeURIComponent(lv_agent_id));
+    lv_stream.onmessage = receive_update;
+
+    // if the stream fails, fall back to polling the MATRX API, which reinitializes the visualization if MATRX is gone
+    lv_stream.onerror = function() {
+        console.log("Update stream closed, polling the MATRX API instead.");
+        close_update_stream();
+    };
+}
+
+
+function close_update_stream() {
+    lv_pending_updates = null;
+    if (lv_stream != null) {
+        lv_stream.close();
+        lv_stream = null;
+    }
+}
+
+
+/*
+ * Receive an update from the update stream, fetching the layout of a keyframe first if we do not have it yet
+ */
+function receive_update(event) {
+    var update = JSON.parse(event.data);
+
+    // updates are merged in order, so they wait while the layout of a keyframe is fetched
+    if (lv_pending_updates != null) {
+        lv_pending_updates.push(update);
+        return;
+    }
+    if (update.keyframe && !(update.layout in lv_layouts)) {
+        var stream = lv_stream;
+        lv_pending_updates = [update];
+        jQuery.getJSON(lv_layout_url + update.layout).done(function(layout) {
+            // skip the layout if the stream was closed in the meantime
+            if (stream !== lv_stream) {
+                return;
+            }
+            lv_layouts[update.layout] = layout;
+            var updates = lv_pending_updates;
+            lv_pending_updates = null;
+            updates.forEach(merge_update);
+        }).fail(function() {
+            console.log("Could not fetch the layout, polling the MATRX API instead.");
+            close_update_stream();
+        });
+        return;
+    }
+    merge_update(update);
+}
+
+
+/*
+ * Merge an update from the update stream into the state and messages of this view
+ */
+function merge_update(update) {
+    // make sure to synchronize the play/pause button of the frontend with the current MATRX version
+    if (update.matrx_paused != lv_matrx_paused) {
+        lv_matrx_paused = update.matrx_paused;
+        sync_play_button(lv_matrx_paused);
+    }
+    if (!('tick' in update)) {
+        return;
+    }
+
+    // view is disconnected
+    if (update.disconnected) {
+        $("body").append(`<div class="disconnected_notification">View Disconnected - <span>Agent doesn't exist (anymore)</span></div>`)
+        return;
+    }
+
+    // a keyframe replaces the state with the layout and its objects, other updates only hold the changed and
+    // removed objects
+    if (update.keyframe) {
+        lv_state = Object.assign({}, lv_layouts[update.layout]);
+    }
+    Object.assign(lv_state, update.objects);
+    update.removed.forEach(function(objID) {
+        delete lv_state[objID];
+    });
+
+    // collect the new messages until they are drawn, skipping those of a keyframe that we already have
+    lv_chatrooms = update.chatrooms;
+    Object.keys(update.messages).forEach(function(chatroom_ID) {
+        var mssgs = update.messages[chatroom_ID];
+        var offset = chat_offsets[chatroom_ID];
+        if (update.keyframe && offset != null) {
+            mssgs = mssgs.filter(function(mssg) {
+                return jQuery.parseJSON(mssg)['chat_mssg_count'] > offset;
+            });
+        }
+        lv_messages[chatroom_ID] = (lv_messages[chatroom_ID] || []).concat(mssgs);
+    });
+
+    read_world_settings();
+    lv_stream_update = true;
+}
+
+
+/*
+ * Read the world settings and current tick from the state of this view
+ */
+function read_world_settings() {
+    lv_current_tick = lv_state['World']['nr_ticks'];
+    curr_tick_timestamp = lv_state['World']['curr_tick_timestamp'];
+    lv_tick_duration = lv_state['World']['tick_duration'];
+    lv_tps = (1.0 / lv_tick_duration).toFixed(1); // round to 1 decimal behind the dot
+
+    lv_world_settings = lv_state['World'];
+
+    // check what the ID of this world is. Is it still the same world we were expecting, or a different world?
+    lv_new_world_ID = lv_state['World']['world_ID'];
+}
+
+
 /*
  * Fetch an update from the MATRX API
  */
@@ -289,15 +459,7 @@ function get_MATRX_update() {
 
             // decode lv_state and other info from the request
             lv_state = data['states'][data['states'].length - 1][lv_agent_id]['state'];
-            var lv_new_tick = lv_state['World']['nr_ticks'];
-            curr_tick_timestamp = lv_state['World']['curr_tick_timestamp'];
-            lv_tick_duration = lv_state['World']['tick_duration'];
-            lv_tps = (1.0 / lv_tick_duration).toFixed(1); // round to 1 decimal behind the dot
-
-            lv_world_settings = lv_state['World'];
-
-            // check what the ID of this world is. Is it still the same world we were expecting, or a different world?
-            lv_new_world_ID = lv_state['World']['world_ID'];
+            read_world_settings();
 
             // we request more often than the lv_tick_duration, as to not miss any ticks
             lv_wait_for_next_tick = lv_tick_duration * 1000 * 0.6;
@@ -307,9 +469,6 @@ function get_MATRX_update() {
                 lv_wait_for_next_tick = 500;
             }
 
-            // note our new current tick
-            lv_current_tick = lv_new_tick;
-
             // make sure to synchronize the play/pause button of the frontend with the current MATRX version
             var matrx_paused = data.matrx_paused;
             if (matrx_paused != lv_matrx_paused) {
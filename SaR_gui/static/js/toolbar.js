@@ -434,6 +434,10 @@ function add_message(chatroom_ID, mssg) {
     if (typeof mssg.content == "string") {
         mssg_content = mssg.content.trim();
     }
+    // show typed messages as the text of their chat button
+    else if (mssg.content && typeof mssg.content.kind == "number") {
+        mssg_content = message_text(mssg.content);
+    }
     // show objects as strings by default
     else {
         mssg_content = JSON.stringify(mssg.content);
@@ -595,6 +599,45 @@ function my_send_message_function(message) {
     send_matrx_api_post_message(matrx_send_message_url, data);
 }
 
+/**
+ * Send the typed message of a chat button to all agents, e.g. send_team_message('found', 'critically injured girl', 5).
+ * The kinds and victims are numbered as in brains1/MessageProtocol.py, of which the template gives the tables.
+ */
+function send_team_message(kind, victim, area) {
+    var content = {"kind": message_protocol.kinds[kind]};
+    if (content["kind"] === undefined) {
+        throw new Error("Unknown kind of team message: " + kind);
+    }
+    if (victim !== undefined) {
+        content["victim"] = message_protocol.victims.indexOf(victim);
+        if (content["victim"] === -1) {
+            throw new Error("Unknown victim of team message: " + victim);
+        }
+    }
+    if (area !== undefined) {
+        content["area"] = area;
+    }
+    content["tick"] = lv_current_tick;
+    my_send_message_function(content);
+}
+
+/**
+ * The display text of a typed message
+ */
+function message_text(content) {
+    var text = message_protocol.texts[content.kind];
+    if (text === undefined) {
+        return JSON.stringify(content);
+    }
+    if (content.victim !== undefined) {
+        text = text.replace("{victim}", message_protocol.victims[content.victim]);
+    }
+    if (content.area !== undefined) {
+        text = text.replace("{area}", content.area);
+    }
+    return text;
+}
+
 /*
  * Reset the chat by removing all messages etc.
  */
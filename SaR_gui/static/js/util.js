@@ -1,10 +1,17 @@
 /*
  * Convert the path to an image to the correct url. This depends on if it is a local image file in the MATRX package
  * (url starting with '/static/'), or a local file relative from the users folder in which the user imported MATRX (NOT
- * starting with '/static/').
+ * starting with '/static/'). Files in the media manifest of the visualizer have a fingerprinted url that the browser
+ * caches, or are an icon of the sprite sheet.
  */
 function fix_img_url(img_name) {
 
+   // check if the visualizer has a fingerprinted url for this media file
+   var media_name = ("/" + img_name).replace('//', '/').replace('/\\','/');
+   if (typeof media_manifest !== 'undefined' && media_manifest.hasOwnProperty(media_name)) {
+        return media_manifest[media_name];
+   }
+
    // check if it is an external media file
    if (!img_name.includes('/static/')) {
         // append the path such that Flask will recognize it as an external media file
@@ -0,0 +1,322 @@
+import json
+import hashlib
+import queue
+import threading
+import gevent
+import gevent.event
+from matrx.api import api
+
+'''
+Pushes the updates of the MATRX world to the views of the visualizer as Server-Sent Events, instead of every view
+polling the MATRX api for the full state every tick. When the world has finished a tick, the state of every view (an
+agent id, or "god") that has observers is compared with the state sent the tick before, once for all observers of the
+view, so the number of observers no longer multiplies the work per tick.
+
+Most objects never change after the world is built: the walls, doors, area tiles and tile layers (all objects that are
+not movable and not agents). They form the static layout of the view, which is serialized once per world and served by
+the visualizer server at /layout/<hash>, keyed by the hash of its content so browsers cache it. The other objects are
+compared by the properties the visualizer draws (location, is_carrying, carried_by, visualization, img_name and
+is_blocked_by_action), and only the objects of which these changed are serialized and sent. A new observer first gets a
+keyframe with the hash of the layout and the other objects and all messages of its view, built from the serialized
+objects of the last update.
+
+Update format (JSON):
+    tick          the tick of the state
+    keyframe      true when the layout and objects hold all objects of the view, which replace the objects the view knows
+    layout        in a keyframe, the hash of the layout of the view, the objects of which are not in objects
+    objects       the changed objects by object id, including the World object with the world settings
+    removed       ids of the objects that are no longer in the state of the view, in a keyframe those of the layout
+    chatrooms     the chatrooms of the view, as returned by the MATRX api
+    messages      the new messages per chatroom, as JSON text like the MATRX api sends them
+    matrx_paused  whether MATRX is paused
+An update with only matrx_paused is sent when MATRX is paused or started between ticks, and an update with
+disconnected true when the agent of the view is not in the world (anymore).
+'''
+
+# Seconds between the comments sent to idle observers, which keep the connection open and detect closed views
+heartbeat = 15
+# Properties of the objects that the visualizer draws, an object is only sent again when one of these changed
+drawn_properties = ['location', 'is_carrying', 'carried_by', 'visualization', 'img_name', 'is_blocked_by_action']
+# Updates an observer can fall behind, after which its queued updates are dropped for a keyframe
+max_queued_updates = 50
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'))
+
+
+def _event(text):
+    return 'data: ' + text + '\n\n'
+
+
+class _Observer:
+    # A connected view, with the queue of its events and whether it waits for a keyframe
+    def __init__(self):
+        self.events = queue.Queue()
+        self.keyframe = True
+
+    def put(self, event):
+        self.events.put(event)
+
+    def get(self):
+        return self.events.get()
+
+    def close(self):
+        pass
+
+
+class _GreenObserver(_Observer):
+    # A view served by gevent. Its greenlet waits for events without blocking the thread of the server, so the server
+    # keeps serving the other views, and the thread of the stream wakes it up with a thread safe signal of the loop
+    def __init__(self):
+        super().__init__()
+        self._ready = gevent.event.Event()
+        self._wake = gevent.get_hub().loop.async_()
+        self._wake.start(self._ready.set)
+
+    def put(self, event):
+        self.events.put(event)
+        self._wake.send()
+
+    def get(self):
+        while True:
+            try:
+                return self.events.get_nowait()
+            except queue.Empty:
+                self._ready.wait()
+                self._ready.clear()
+
+    def close(self):
+        self._wake.close()
+
+
+class _View:
+    # What the observers of a view have been sent: the serialized objects and all messages of the view
+    def __init__(self):
+        self.observers = []
+        self.tick = None
+        self.states = None
+        self.world_id = None
+        self.layout = None
+        self.static = set()
+        self.gone = []
+        self.drawn = {}
+        self.objects = {}
+        self.chatrooms = {}
+        self.messages = {}
+        self.disconnected = False
+
+
+class UpdateStream:
+    '''
+    Serializes the state of every observed view once per tick, and sends the updates to the observers of the views.
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._new_tick = threading.Event()
+        self._views = {}
+        self._layouts = {}
+        self._thread = None
+        self._next_tick = None
+        self._paused = None
+        self._stopped = False
+        self._green = False
+
+    def start(self, green=False):
+        '''
+        Starts sending updates: the MATRX api signals every finished tick, and a thread sends the updates of the tick.
+        @param green whether the views are served by gevent, from greenlets of one thread, instead of a thread per view
+        '''
+        if self._thread is not None:
+            return
+        self._stopped = False
+        self._green = green
+        next_tick = self._next_tick = api._next_tick
+
+        def _next_tick():
+            next_tick()
+            self._new_tick.set()
+        api._next_tick = _next_tick
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''
+        Stops sending updates and ends the streams of all observers.
+        '''
+        if self._thread is None:
+            return
+        api._next_tick = self._next_tick
+        self._stopped = True
+        self._new_tick.set()
+        self._thread.join()
+        self._thread = None
+        with self._lock:
+            for view in self._views.values():
+                for observer in view.observers:
+                    observer.put(None)
+            self._views = {}
+
+    def layout(self, layout_hash):
+        '''
+        @return the JSON text of the objects of the layout with the hash, or None when the layout is unknown
+        '''
+        return self._layouts.get(layout_hash)
+
+    def events(self, view_id):
+        '''
+        @return generator of the events of the stream of a new observer of the view, until it disconnects
+        '''
+        observer = _GreenObserver() if self._green else _Observer()
+        with self._lock:
+            view = self._views.setdefault(view_id, _View())
+            view.observers.append(observer)
+            # Views that are up to date get their keyframe right away, new views with the update of the next tick
+            if view.tick is not None:
+                observer.put(self._keyframe(view))
+                observer.keyframe = False
+        self._new_tick.set()
+        try:
+            # A comment opens the stream right away, also when the world has not started yet
+            yield ': connected\n\n'
+            while True:
+                event = observer.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            with self._lock:
+                view.observers.remove(observer)
+                if not view.observers and self._views.get(view_id) is view:
+                    del self._views[view_id]
+            observer.close()
+
+    def _run(self):
+        idle = 0.
+        while not self._stopped:
+            # Wake up at least twice a second to see whether MATRX was paused or started
+            new_tick = self._new_tick.wait(0.5)
+            self._new_tick.clear()
+            if self._stopped:
+                return
+            idle = 0. if new_tick else idle + 0.5
+            with self._lock:
+                if self._paused != api.matrx_paused:
+                    self._paused = api.matrx_paused
+                    self._send_all(_event(_dumps({'matrx_paused': self._paused})))
+                for view_id, view in self._views.items():
+                    self._update(view_id, view)
+                if idle >= heartbeat:
+                    idle = 0.
+                    self._send_all(': keep-alive\n\n')
+
+    def _send_all(self, event):
+        # Observers that wait for a keyframe get it with the next update of their view
+        for view in self._views.values():
+            for observer in view.observers:
+                if not observer.keyframe:
+                    self._put(observer, event)
+
+    def _send(self, view, event):
+        for observer in view.observers:
+            if observer.keyframe:
+                observer.put(self._keyframe(view))
+                observer.keyframe = False
+            else:
+                self._put(observer, event)
+
+    @staticmethod
+    def _put(observer, event):
+        if observer.events.qsize() >= max_queued_updates:
+            # The observer cannot keep up, drop its updates and send it everything again with the next update
+            while not observer.events.empty():
+                observer.events.get_nowait()
+            observer.keyframe = True
+        else:
+            observer.put(event)
+
+    def _update(self, view_id, view):
+        # Sends the objects that changed and the new messages since the last update of the view
+        tick = api._current_tick
+        # The api publishes the states of a tick in a new dictionary, the first tick is published twice
+        states = getattr(api, '__states').get(tick)
+        if states is None or states is view.states:
+            # No new tick, only observers that wait for a keyframe get one
+            for observer in view.observers:
+                if observer.keyframe and view.tick is not None:
+                    observer.put(self._keyframe(view))
+                    observer.keyframe = False
+            return
+        view.tick = tick
+        view.states = states
+        if view_id not in states:
+            if not view.disconnected:
+                view.disconnected = True
+                self._send(view, self._keyframe(view))
+            return
+        view.disconnected = False
+        state = states[view_id]['state']
+        if not isinstance(state, dict):
+            state = state.as_dict()
+        if state['World']['world_ID'] != view.world_id:
+            # A new world, everything the observers know is of the previous world
+            view.world_id = state['World']['world_ID']
+            view.drawn = {}
+            view.objects = {}
+            view.messages = {}
+            self._add_layout(view, state)
+            for observer in view.observers:
+                observer.keyframe = True
+
+        changed = {}
+        drawn = {}
+        for obj_id, obj in state.items():
+            if obj_id in view.static:
+                continue
+            # The World object changes every tick, other objects are only serialized when what is drawn changed
+            text = drawn[obj_id] = _dumps([obj.get(prop) for prop in drawn_properties]) if obj_id != 'World' else None
+            if text is None or view.drawn.get(obj_id) != text:
+                changed[obj_id] = view.objects[obj_id] = _dumps(obj)
+        removed = [obj_id for obj_id in view.drawn if obj_id not in drawn]
+        for obj_id in removed:
+            del view.objects[obj_id]
+        if len(view.static) + len(drawn) != len(state):
+            # Objects of the layout can only disappear, e.g. when they were removed by an action
+            gone = sorted(view.static.difference(state))
+            view.static.difference_update(gone)
+            view.gone += gone
+            removed += gone
+        view.drawn = drawn
+
+        message_manager = api._gw_message_manager
+        view.chatrooms = message_manager.fetch_chatrooms(agent_id=view_id)
+        offsets = {chatroom_id: len(messages) - 1 for chatroom_id, messages in view.messages.items()}
+        new_messages = message_manager.fetch_messages(agent_id=view_id, chatroom_mssg_offsets=offsets)
+        new_messages = {str(chatroom_id): messages for chatroom_id, messages in new_messages.items()}
+        for chatroom_id, messages in new_messages.items():
+            view.messages.setdefault(chatroom_id, []).extend(messages)
+
+        self._send(view, self._text(view, changed, removed, new_messages, False))
+
+    def _add_layout(self, view, state):
+        # The objects that are not movable and not agents form the layout of the view
+        static = {obj_id: obj for obj_id, obj in state.items()
+                  if obj_id != 'World' and obj.get('is_movable') is False and 'isAgent' not in obj}
+        text = _dumps(static)
+        view.layout = hashlib.sha256(text.encode()).hexdigest()[:16]
+        view.static = set(static)
+        view.gone = []
+        self._layouts[view.layout] = text
+
+    def _text(self, view, objects, removed, messages, keyframe):
+        # The event of an update, built from the serialized objects of the view
+        objects = ','.join(_dumps(obj_id) + ':' + text for obj_id, text in objects.items())
+        layout = '"layout":{},'.format(_dumps(view.layout)) if keyframe else ''
+        return _event('{{"tick":{},"keyframe":{},{}"objects":{{{}}},"removed":{},"chatrooms":{},"messages":{},'
+                      '"matrx_paused":{}}}'.format(view.tick, _dumps(keyframe), layout, objects, _dumps(removed),
+                                                   _dumps(view.chatrooms), _dumps(messages), _dumps(self._paused)))
+
+    def _keyframe(self, view):
+        if view.disconnected:
+            return _event(_dumps({'tick': view.tick, 'disconnected': True}))
+        return self._text(view, view.objects, view.gone, view.messages, True)
@@ -1,6 +1,13 @@
+import socket
 import threading
 import logging
-from flask import Flask, render_template, request, jsonify, send_from_directory
+import gevent
+from gevent.pywsgi import WSGIServer
+from werkzeug.serving import make_server
+from flask import Flask, Response, abort, render_template, jsonify
+from brains1.MessageProtocol import protocol_tables
+from SaR_gui.update_stream import UpdateStream
+from SaR_gui.media import MediaLibrary, media_response
 
 '''
 This file holds the code for the MATRX RESTful api. 
@@ -17,6 +24,23 @@ app = Flask(__name__, template_folder='templates')
 # the path to the media folder of the user (outside of the MATRX package)
 ext_media_folder = ""
 
+# the fingerprinted and compressed images of the media folder, with the manifest of their urls (see media.py)
+media = MediaLibrary()
+
+# the tables of the typed messages of the chat (see brains1/MessageProtocol.py), for the chat code of the views
+message_protocol = protocol_tables()
+
+# the updates of the world pushed to the views, serialized once per tick for all views (see update_stream.py)
+update_stream = UpdateStream()
+
+# the servers that can host the app: the development server of Werkzeug with a thread per request, or the WSGI server
+# of gevent with a greenlet per request and HTTP keep-alive, for many views at once
+servers = ['werkzeug', 'gevent']
+
+# the thread of the running server, and the function that stops the server from any thread
+_vis_thread = None
+_stop_server = None
+
 #########################################################################
 # Visualization server routes
 #########################################################################
@@ -37,7 +61,8 @@ def human_agent_view(id):
         The template for this agent's view.
 
     """
-    return render_template('human_agent.html', id=id)
+    return render_template('human_agent.html', id=id, message_protocol=message_protocol,
+                           media_manifest=media.manifest)
 
 
 # route for agent, get the ID from the URL
@@ -57,7 +82,8 @@ def agent_view(id):
         The template for this agent's view.
 
     """
-    return render_template('agent.html', id=id)
+    return render_template('agent.html', id=id, message_protocol=message_protocol,
+                           media_manifest=media.manifest)
 
 
 @app.route('/god')
@@ -71,7 +97,8 @@ def god_view():
         The template for this view.
 
     """
-    return render_template('god.html')
+    return render_template('god.html', message_protocol=message_protocol,
+                           media_manifest=media.manifest)
 
 
 @app.route('/')
@@ -86,24 +113,62 @@ def start_view():
         The template for this view.
 
     """
-    return render_template('start.html')
+    return render_template('start.html', media_manifest=media.manifest)
+
+
+
+@app.route('/updates/<id>')
+def updates(id):
+    """
+    Stream of Server-Sent Events with the updates of the state and messages of a view, sent after every tick.
+
+    Parameters
+    ----------
+    id
+        The agent ID of the view, or "god" for the god view. Is obtained from the URL.
+
+    Returns
+    -------
+    Response
+        The event stream, which ends when the view disconnects or the visualizer shuts down.
+
+    """
+    return Response(update_stream.events(id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/layout/<layout_hash>')
+def layout(layout_hash):
+    """
+    The objects of a static layout of the views, which the update stream refers to by hash.
+
+    Parameters
+    ----------
+    layout_hash
+        The hash of the layout. Is obtained from the URL.
 
+    Returns
+    -------
+    Response
+        The objects of the layout by object ID, cached by the browser because the content of a hash never changes.
 
+    """
+    text = update_stream.layout(layout_hash)
+    if text is None:
+        abort(404)
+    return Response(text, mimetype='application/json', headers={'Cache-Control': 'public, max-age=31536000, immutable'})
 
 
 @app.route('/shutdown_visualizer', methods=['GET', 'POST'])
 def shutdown():
-    """ Shuts down the visualizer by stopping the Flask thread
+    """ Shuts down the visualizer by stopping the Flask thread, after this request has been answered. Python code
+    should call stop_matrx_visualizer instead.
 
     Returns
         True
     -------
     """
-    func = request.environ.get('werkzeug.server.shutdown')
-    if func is None:
-        raise RuntimeError('Unable to shutdown visualizer server. Not running with the Werkzeug Server')
-    func()
-    print("Visualizer server shutting down...")
+    threading.Thread(target=stop_matrx_visualizer).start()
     return jsonify(True)
 
 
@@ -118,40 +183,113 @@ def external_media(filename):
 
     Returns
     -------
-        Returns the url (relative from the website root) to that file
+        Returns the file, compressed if the browser accepts it, or 304 Not Modified if its ETag did not change
     """
-    return send_from_directory(ext_media_folder, filename, as_attachment=True)
+    media_file = media.file(filename)
+    if media_file is None:
+        abort(404)
+    return media_response(media_file, immutable=False)
+
+
+@app.route('/media/<fingerprint>/<path:filename>')
+def fingerprinted_media(fingerprint, filename):
+    """ The images of the media manifest, at urls with the fingerprint of their content
+
+    Parameters
+    ----------
+    fingerprint
+        the fingerprint of the content of the file, part of the url so the browser can cache it forever.
+    filename
+        path to the image file in the external media folder of the user, or the sprite sheet.
+
+    Returns
+    -------
+        Returns the file, compressed if the browser accepts it, or 304 Not Modified if its ETag did not change
+    """
+    media_file = media.file(filename)
+    if media_file is None:
+        abort(404)
+    # an old fingerprint gets the current content, which must not be cached under the old url
+    return media_response(media_file, immutable=media_file.fingerprint == fingerprint)
 
 
 #########################################################################
 # Visualization Flask methods
 #########################################################################
 
-def _flask_thread():
+class _WSGIServer(WSGIServer):
+    """
+    The gevent WSGI server, sending every response right away. With keep-alive, Nagle's algorithm would hold the body
+    of a response back until the browser acknowledged its headers, which takes 40ms.
+    """
+    def handle(self, sock, address):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().handle(sock, address)
+
+def _flask_thread(server, started):
     """
-    Starts the Flask server on localhost:3000
+    Starts the Flask server on localhost:3000, hosted by the Werkzeug or gevent server, and serves until it is stopped
     """
+    global _stop_server
 
     if not debug:
         log = logging.getLogger('werkzeug')
         log.setLevel(logging.ERROR)
 
-    app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False)
-
-def run_matrx_visualizer(verbose, media_folder):
+    try:
+        update_stream.start(green=server == 'gevent')
+        if server == 'gevent':
+            http_server = _WSGIServer(('0.0.0.0', port), app, log='default' if debug else None)
+            http_server.start()
+            # the server can only be stopped from this thread, other threads signal the loop of this thread to stop it
+            stop_signal = gevent.get_hub().loop.async_()
+            stop_signal.start(lambda: gevent.spawn(http_server.stop, timeout=1))
+            _stop_server = stop_signal.send
+        else:
+            http_server = make_server('0.0.0.0', port, app, threaded=True)
+            _stop_server = http_server.shutdown
+    finally:
+        started.set()
+    http_server.serve_forever()
+    if server == 'gevent':
+        stop_signal.close()
+
+def run_matrx_visualizer(verbose, media_folder, server='werkzeug'):
     """
     Creates a seperate Python thread in which the visualization server (Flask) is started, serving the JS visualization
+    :param server: the server that hosts the app, 'werkzeug' or 'gevent' (see servers)
     :return: MATRX visualization Python thread
     """
-    global debug, ext_media_folder
+    global debug, ext_media_folder, _vis_thread
+    if server not in servers:
+        raise ValueError(f"Unknown visualization server {server}, choose one of {servers}.")
     debug = verbose
     ext_media_folder = media_folder
+    media.load(media_folder)
 
     print("Starting visualization server")
     print("Initialized app:", app)
-    vis_thread = threading.Thread(target=_flask_thread)
-    vis_thread.start()
-    return vis_thread
+    started = threading.Event()
+    _vis_thread = threading.Thread(target=_flask_thread, args=(server, started))
+    _vis_thread.start()
+    started.wait()
+    return _vis_thread
+
+def stop_matrx_visualizer():
+    """
+    Stops the visualization server started by run_matrx_visualizer: ends the update streams of the views, stops the
+    server and waits until its thread has finished. Can be called from any thread but the thread of the server.
+    """
+    global _vis_thread, _stop_server
+    if _vis_thread is None:
+        return
+    vis_thread, _vis_thread = _vis_thread, None
+    update_stream.stop()
+    if _stop_server is not None:
+        _stop_server()
+        _stop_server = None
+    vis_thread.join()
+    print("Visualizer server shutting down...")
 
 if __name__ == "__main__":
     run_matrx_visualizer()
\ No newline at end of file
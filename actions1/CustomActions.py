@@ -1,3 +1,4 @@
+import collections
 import numpy as np
 from matrx.actions.action import Action, ActionResult
 from matrx.objects.agent_body import AgentBody
@@ -383,6 +384,7 @@ class CarryObject(Action):
         if not succeeded:
             return GrabObjectResult(GrabObjectResult.FAILED_TO_REMOVE_OBJECT_FROM_WORLD.replace("{OBJECT_ID}",
                                                                                                 env_obj.obj_id), False)
+        _location_changed(grid_world, env_obj.location)
 
         # Updating Location (done after removing from grid, or the grid will search the object on the wrong location)
         env_obj.location = reg_ag.location
@@ -831,6 +833,7 @@ class CarryObjectTogether(Action):
         if not succeeded:
             return GrabObjectResult(GrabObjectResult.FAILED_TO_REMOVE_OBJECT_FROM_WORLD.replace("{OBJECT_ID}",
                                                                                                 env_obj.obj_id), False)
+        _location_changed(grid_world, env_obj.location)
 
         # Updating Location (done after removing from grid, or the grid will search the object on the wrong location)
         env_obj.location = reg_ag.location
@@ -1195,10 +1198,21 @@ def _act_drop(grid_world, agent, env_obj, drop_loc):
     # We return the object to the grid location we are standing at without registering a new ID
     env_obj.location = drop_loc
     grid_world._register_env_object(env_obj, ensure_unique_id=False)
+    _location_changed(grid_world, drop_loc)
 
     return DropObjectResult(DropObjectResult.RESULT_SUCCESS, True)
 
 
+def _location_changed(grid_world, location):
+    """ Tells the simulation goal that an object was picked up from or dropped at a location, so it only has to check
+    the locations that changed.
+    """
+    goals = grid_world.simulation_goal if isinstance(grid_world.simulation_goal, (list, tuple)) else [grid_world.simulation_goal]
+    for goal in goals:
+        if hasattr(goal, 'location_changed'):
+            goal.location_changed(location)
+
+
 def _is_drop_poss(grid_world, env_obj, drop_location, agent_id):
     """ Private MATRX method.
     A breadth first search starting from the agent's location to find the
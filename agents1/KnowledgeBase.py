@@ -0,0 +1,169 @@
+from collections import namedtuple, defaultdict
+
+# Sources of knowledge: seen by the agent itself, or reported by the human in a message
+AGENT = 'agent'
+HUMAN = 'human'
+
+# What is known about a found victim, location and obj_id are None when only the area of the victim is known
+VictimRecord = namedtuple('VictimRecord', ['room', 'location', 'obj_id', 'source', 'tick'])
+# What is known about an obstacle blocking the door of an area, obj_id is None when the human reported the obstacle
+ObstacleRecord = namedtuple('ObstacleRecord', ['obj_id', 'room', 'location', 'source', 'tick'])
+# Entry of the provenance log: at which tick which source told what happened to which victim, obstacle or area
+Provenance = namedtuple('Provenance', ['tick', 'source', 'event', 'subject', 'room'])
+
+
+class KnowledgeBase:
+    '''
+    What RescueBot knows about the victims, obstacles and areas of the world: which victims were found in which area,
+    which victims were collected, which areas were searched and which obstacles block the doors. Membership checks are
+    set and dictionary lookups, and the victims and obstacles are indexed per area. Every change is recorded in a
+    provenance log with the tick and whether the agent saw it or the human reported it.
+    The collected victims and searched areas keep the order in which they became known, because the agent lists them in
+    its messages.
+    '''
+    def __init__(self):
+        # Tick of the current decision of the agent, with which changes are stamped
+        self.tick = None
+        # Found victims by name, and the names of the found victims per area
+        self._victims = {}
+        self._room_victims = defaultdict(set)
+        # Collected victims and searched areas by name, with the provenance of the entry, in the order they were added
+        self._collected = {}
+        self._searched = {}
+        # Found victims that the human rescues alone, or that wait until all areas have been searched
+        self._todo = set()
+        # Obstacles blocking the door of an area, by object id per area
+        self._room_obstacles = defaultdict(dict)
+        self.log = []
+
+    def _record(self, source, event, subject, room=None):
+        self.log.append(Provenance(self.tick, source, event, subject, room))
+
+    def add_victim(self, victim, room, source, location=None, obj_id=None):
+        '''
+        Adds a found victim, or replaces what is known about it.
+        '''
+        if victim in self._victims:
+            self._room_victims[self._victims[victim].room].discard(victim)
+        self._victims[victim] = VictimRecord(room, location, obj_id, source, self.tick)
+        self._room_victims[room].add(victim)
+        self._record(source, 'found', victim, room)
+
+    def report_victim(self, victim, room):
+        '''
+        Adds a victim the human found in an area. What the agent knows about the victim is only replaced when the
+        victim was found in another area.
+        '''
+        if victim not in self._victims or self._victims[victim].room != room:
+            self.add_victim(victim, room, HUMAN)
+
+    def forget_victim(self, victim, source=AGENT):
+        '''
+        Forgets a found victim, because it was not in the area where it was found.
+        '''
+        record = self._victims.pop(victim, None)
+        if record is not None:
+            self._room_victims[record.room].discard(victim)
+            self._record(source, 'not found', victim, record.room)
+
+    def is_found(self, victim):
+        return victim in self._victims
+
+    def victim(self, victim):
+        '''
+        @return the VictimRecord of a found victim, or None
+        '''
+        return self._victims.get(victim)
+
+    def knows_location(self, victim):
+        '''
+        @return whether the exact location of the found victim is known, i.e. the agent saw the victim itself
+        '''
+        return self._victims[victim].location is not None
+
+    def victims_in(self, room):
+        '''
+        @return the set of names of the victims found in the area
+        '''
+        return set(self._room_victims.get(room, ()))
+
+    def collect(self, victim, source):
+        '''
+        Adds a collected victim, unless it was collected already.
+        '''
+        if victim not in self._collected:
+            self._collected[victim] = (source, self.tick)
+            self._record(source, 'collected', victim)
+
+    def is_collected(self, victim):
+        return victim in self._collected
+
+    @property
+    def collected_victims(self):
+        '''
+        @return list of the collected victims, in the order in which they were collected
+        '''
+        return list(self._collected)
+
+    def add_todo(self, victim):
+        self._todo.add(victim)
+
+    def in_todo(self, victim):
+        return victim in self._todo
+
+    def clear_todo(self):
+        self._todo.clear()
+
+    def search(self, room, source):
+        '''
+        Adds a searched area, unless it was searched already.
+        '''
+        if room not in self._searched:
+            self._searched[room] = (source, self.tick)
+            self._record(source, 'searched', room, room)
+
+    def unsearch(self, room):
+        '''
+        Marks an area as not searched, so it is searched (again).
+        '''
+        self._searched.pop(room, None)
+
+    def clear_searched(self):
+        self._searched.clear()
+
+    def is_searched(self, room):
+        return room in self._searched
+
+    @property
+    def searched_rooms(self):
+        '''
+        @return list of the searched areas, in the order in which they were searched
+        '''
+        return list(self._searched)
+
+    @property
+    def nr_searched_rooms(self):
+        return len(self._searched)
+
+    def add_obstacle(self, obj_id, room, source, location=None):
+        '''
+        Adds an obstacle blocking the door of an area, unless it is known already. Obstacles the human reports have no
+        object id.
+        '''
+        if obj_id not in self._room_obstacles[room]:
+            self._room_obstacles[room][obj_id] = ObstacleRecord(obj_id, room, location, source, self.tick)
+            self._record(source, 'obstacle', obj_id, room)
+
+    def clear_obstacles(self, room, source=AGENT):
+        '''
+        Forgets the obstacles of an area, because its door is not blocked (anymore).
+        '''
+        if self._room_obstacles.get(room):
+            self._room_obstacles[room].clear()
+            self._record(source, 'cleared', room, room)
+
+    def obstacles_in(self, room):
+        '''
+        @return list of the ObstacleRecords of the obstacles blocking the door of the area
+        '''
+        return list(self._room_obstacles.get(room, {}).values())
@@ -0,0 +1,135 @@
+import os, hashlib
+from collections import deque
+import numpy as np
+
+# Graphs that were computed or loaded in this process, keyed by the hash of the world layout
+_graphs = {}
+
+# Classes of objects that block a path only until they are removed, or that move around
+dynamic_classes = ['ObstacleObject', 'CollectableBlock', 'AgentBody']
+
+
+class NavigationGraph:
+    '''
+    Exact shortest path lengths over the static walkable grid of a world, from every location to the doormat of every
+    area and to the drop zone. Walls and other intraversable objects are static; obstacles that can be removed, victims
+    and agents are ignored, so the path lengths are those of a world without obstacles.
+    The distance fields are computed with a breadth first search from each doormat and from the drop zone, once per world
+    layout, and are cached on disk keyed by the hash of the layout.
+    '''
+    def __init__(self, shape, blocked, doormats, drop_zone, moves):
+        self._shape = tuple(shape)
+        self._doormats = dict(doormats)
+        self._drop_zone = sorted(drop_zone)
+        self._blocked = np.zeros(self._shape, dtype=bool)
+        for loc in blocked:
+            self._blocked[loc[0], loc[1]] = True
+        self._moves = sorted(set(move for move in moves if move != (0, 0)))
+        self._fields = {}
+
+    @classmethod
+    def from_state(cls, state, moves, folder=None):
+        '''
+        @param state the (first) state of the agent, which contains the walls, doors and areas of the world
+        @param moves the move deltas of the agent, e.g. the values of matrx' get_move_actions(action_set)
+        @param folder the folder in which the 'cache' folder with computed graphs is stored, no disk cache when None
+        @return the navigation graph of the world, shared by all agents with the same world layout and moves
+        '''
+        blocked = set()
+        doormats = {}
+        drop_zone = set()
+        for obj_id, obj in state.items():
+            if obj_id == 'World' or not isinstance(obj, dict) or 'location' not in obj:
+                continue
+            if 'doormat' in obj and obj.get('room_name') is not None:
+                doormats[obj['room_name']] = tuple(obj['doormat'])
+            if obj.get('is_drop_zone'):
+                drop_zone.add(tuple(obj['location']))
+            if obj.get('is_traversable') is False and \
+                    not any(name in obj.get('class_inheritance', []) for name in dynamic_classes):
+                blocked.add(tuple(obj['location']))
+        graph = cls(state['World']['grid_shape'], blocked, doormats, drop_zone, moves)
+        key = graph.layout_hash()
+        if key in _graphs:
+            return _graphs[key]
+        cache_file = os.path.join(folder, 'cache', 'navigation_' + key + '.npz') if folder is not None else None
+        if cache_file is not None and os.path.isfile(cache_file):
+            graph._load(cache_file)
+        else:
+            graph._compute()
+            if cache_file is not None:
+                graph._save(cache_file)
+        _graphs[key] = graph
+        return graph
+
+    def layout_hash(self):
+        '''
+        @return a hash of the grid shape, the intraversable locations, the doormats, the drop zone and the moves
+        '''
+        layout = repr((self._shape, np.argwhere(self._blocked).tolist(), sorted(self._doormats.items()),
+                       self._drop_zone, self._moves))
+        return hashlib.sha1(layout.encode()).hexdigest()[:16]
+
+    def distance(self, location, room_name):
+        '''
+        @return the length of the shortest path from the location to the doormat of the area, inf if there is no path
+        '''
+        return self._lookup(self._fields.get(room_name), location)
+
+    def drop_zone_distance(self, location):
+        '''
+        @return the length of the shortest path from the location to the closest drop zone tile, inf if there is no path
+        '''
+        return self._lookup(self._fields.get(None), location)
+
+    def doormat(self, room_name):
+        return self._doormats.get(room_name)
+
+    def closest_room(self, location, room_names):
+        '''
+        @return the area of which the doormat is closest to the location, the first one of room_names on a tie
+        '''
+        return min(room_names, key=lambda room_name: self.distance(location, room_name))
+
+    def _lookup(self, field, location):
+        if field is None or location is None:
+            return np.inf
+        value = field[location[0], location[1]]
+        return np.inf if value < 0 else int(value)
+
+    def _compute(self):
+        for room_name, doormat in self._doormats.items():
+            self._fields[room_name] = self._bfs([doormat])
+        self._fields[None] = self._bfs(self._drop_zone)
+
+    def _bfs(self, sources):
+        field = np.full(self._shape, -1, dtype=np.int32)
+        queue = deque()
+        for loc in sources:
+            field[loc[0], loc[1]] = 0
+            queue.append(loc)
+        while queue:
+            x, y = queue.popleft()
+            for dx, dy in self._moves:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < self._shape[0] and 0 <= ny < self._shape[1] and field[nx, ny] < 0 \
+                        and not self._blocked[nx, ny]:
+                    field[nx, ny] = field[x, y] + 1
+                    queue.append((nx, ny))
+        return field
+
+    def _save(self, cache_file):
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        room_names = sorted(self._doormats.keys())
+        # Write to a temporary file first, so agents in other processes never read a half written cache file
+        tmp_file = cache_file[:-len('.npz')] + '.' + str(os.getpid()) + '.tmp.npz'
+        np.savez_compressed(tmp_file, room_names=np.array(room_names),
+                            fields=np.stack([self._fields[room_name] for room_name in room_names]),
+                            drop_zone=self._fields[None])
+        os.replace(tmp_file, cache_file)
+
+    def _load(self, cache_file):
+        with np.load(cache_file) as cached:
+            for room_name, field in zip(cached['room_names'].tolist(), cached['fields']):
+                self._fields[room_name] = field
+            self._fields[None] = cached['drop_zone']
@@ -6,7 +6,7 @@ from actions1.CustomActions import *
 from matrx import utils
 from matrx.grid_world import GridWorld
 from matrx.agents.agent_utils.state import State
-from matrx.agents.agent_utils.navigator import Navigator
+from matrx.agents.agent_utils.navigator import Navigator, get_move_actions
 from matrx.agents.agent_utils.state_tracker import StateTracker
 from matrx.actions.door_actions import OpenDoorAction
 from matrx.actions.object_actions import GrabObject, DropObject, RemoveObject
@@ -14,6 +14,14 @@ from matrx.actions.move_actions import MoveNorth
 from matrx.messages.message import Message
 from matrx.messages.message_manager import MessageManager
 from actions1.CustomActions import RemoveObjectTogether, CarryObjectTogether, DropObjectTogether, CarryObject, Drop
+from agents1.TrustBeliefStore import TrustBeliefStore
+from agents1.NavigationGraph import NavigationGraph
+from agents1.PathCache import CachedNavigator
+from agents1.KnowledgeBase import KnowledgeBase, AGENT, HUMAN
+from brains1.MessageProtocol import MessageKind, read_message
+
+# Areas of which the doormat is at most this path length away from the drop zone are close to the drop zone
+drop_zone_close_distance = 10
 
 
 class Phase(enum.Enum):
@@ -38,6 +46,10 @@ class Phase(enum.Enum):
     ENTER_ROOM = 19
 
 
+# Area numbers that identify the last known location of the human
+AREA_NUMBERS = set(range(1, 15))
+
+
 class BaselineAgent(ArtificialBrain):
     def __init__(self, slowdown, condition, name, folder):
         super().__init__(slowdown, condition, name, folder)
@@ -48,11 +60,9 @@ class BaselineAgent(ArtificialBrain):
         self._human_name = name
         self._folder = folder
         self._phase = Phase.INTRO
-        self._room_vics = []
-        self._searched_rooms = []
-        self._found_victims = []
-        self._collected_victims = []
-        self._found_victim_logs = {}
+        self._room_vics = set()
+        # What the agent knows about the victims, obstacles and areas, seen itself or reported by the human
+        self._knowledge = KnowledgeBase()
         self._send_messages = []
         self._current_door = None
         self._team_members = []
@@ -64,7 +74,6 @@ class BaselineAgent(ArtificialBrain):
         self._distance_human = None
         self._distance_drop = None
         self._agent_loc = None
-        self._todo = []
         self._answered = False
         self._to_search = []
         self._carrying = False
@@ -72,34 +81,47 @@ class BaselineAgent(ArtificialBrain):
         self._rescue = None
         self._recent_vic = None
         self._received_messages = []
+        self._received_messages_set = set()
+        self._message_cursor = 0
+        self._rescue_together_requested = False
+        self._pending_remove = None
+        self._trust_values = None
+        self._navigation = None
         self._moving = False
 
     def initialize(self):
         # Initialization of the state tracker and navigation algorithm
         self._state_tracker = StateTracker(agent_id=self.agent_id)
-        self._navigator = Navigator(agent_id=self.agent_id, action_set=self.action_set,
-                                    algorithm=Navigator.A_STAR_ALGORITHM)
+        # The navigator plans with A* through a path cache, so repeated trips are not planned again
+        self._navigator = CachedNavigator(agent_id=self.agent_id, action_set=self.action_set)
+        # Load the logged trust beliefs once, instead of reading the beliefs files every tick
+        self._trust_beliefs = TrustBeliefStore.for_folder(self._folder).load()
+        self._trust_values = None
+        self._message_cursor = 0
+        # The navigation graph of the static world is built from the first state
+        self._navigation = None
 
     def filter_observations(self, state):
         # Filtering of the world state before deciding on an action 
         return state
 
     def decide_on_actions(self, state):
+        # Path lengths between all areas and the drop zone, computed once per world layout
+        if self._navigation is None:
+            self._navigation = NavigationGraph.from_state(state, get_move_actions(self.action_set).values(), self._folder)
         # Identify team members
         agent_name = state[self.agent_id]['obj_id']
         for member in state['World']['team_members']:
             if member != agent_name and member not in self._team_members:
                 self._team_members.append(member)
-        # Create a list of received messages from the human team member
-        for mssg in self.received_messages:
-            for member in self._team_members:
-                if mssg.from_id == member and mssg.content not in self._received_messages:
-                    self._received_messages.append(mssg.content)
-        # Process messages from team members
-        self._process_messages(state, self._team_members, self._condition)
-        # Initialize and update trust beliefs for team members
-        trustBeliefs = self._loadBelief(self._team_members, self._folder)
-        self._trustBelief(self._team_members, trustBeliefs, self._folder, self._received_messages)
+        # Stamp what the agent learns during this tick with the tick
+        self._knowledge.tick = state['World']['nr_ticks']
+        # Parse the messages received since the previous tick, and process them
+        new_messages = self._process_messages(state, self._team_members, self._condition)
+        # Initialize and update trust beliefs for team members, only the newly received messages have to be processed
+        if self._trust_values is None:
+            self._trust_values = self._loadBelief(self._team_members, self._folder)
+        self._trust_values = self._trustBelief(self._team_members, self._trust_values, self._folder, new_messages)
 
         # Check whether human is close in distance
         if state[{'is_human_agent': True}]:
@@ -115,22 +137,20 @@ class BaselineAgent(ArtificialBrain):
             if self._agent_loc in [8, 9, 10, 11, 12, 13, 14] and self._human_loc in [8, 9, 10, 11, 12, 13, 14]:
                 self._distance_human = 'close'
 
-        # Define distance to drop zone based on last known area location
-        if self._agent_loc in [1, 2, 5, 6, 8, 9, 11, 12]:
-            self._distance_drop = 'far'
-        if self._agent_loc in [3, 4, 7, 10, 13, 14]:
-            self._distance_drop = 'close'
+        # Define distance to drop zone based on the path length from the last known area location
+        if self._agent_loc is not None:
+            drop_distance = self._navigation.drop_zone_distance(self._navigation.doormat('area ' + str(self._agent_loc)))
+            self._distance_drop = 'close' if drop_distance <= drop_zone_close_distance else 'far'
 
         # Check whether victims are currently being carried together by human and agent 
-        for info in state.values():
+        for info in state.get_objects_with_property('is_human_agent'):
             if 'is_human_agent' in info and self._human_name in info['name'] and len(
                     info['is_carrying']) > 0 and 'critical' in info['is_carrying'][0]['obj_id'] or \
                     'is_human_agent' in info and self._human_name in info['name'] and len(
                 info['is_carrying']) > 0 and 'mild' in info['is_carrying'][0][
                 'obj_id'] and self._rescue == 'together' and not self._moving:
                 # If victim is being carried, add to collected victims memory
-                if info['is_carrying'][0]['img_name'][8:-4] not in self._collected_victims:
-                    self._collected_victims.append(info['is_carrying'][0]['img_name'][8:-4])
+                self._knowledge.collect(info['is_carrying'][0]['img_name'][8:-4], AGENT)
                 self._carrying_together = True
             if 'is_human_agent' in info and self._human_name in info['name'] and len(info['is_carrying']) == 0:
                 self._carrying_together = False
@@ -169,7 +189,7 @@ class BaselineAgent(ArtificialBrain):
                 zones = self._get_drop_zones(state)
                 # Identification of which victims still need to be rescued and on which location they should be dropped
                 for info in zones:
-                    if str(info['img_name'])[8:-4] not in self._collected_victims:
+                    if not self._knowledge.is_collected(str(info['img_name'])[8:-4]):
                         remaining_zones.append(info)
                         remaining_vics.append(str(info['img_name'])[8:-4])
                         remaining[str(info['img_name'])[8:-4]] = info['location']
@@ -183,24 +203,24 @@ class BaselineAgent(ArtificialBrain):
                 # Check which victims can be rescued next because human or agent already found them
                 for vic in remaining_vics:
                     # Define a previously found victim as target victim because all areas have been searched
-                    if vic in self._found_victims and vic in self._todo and len(self._searched_rooms) == 0:
+                    if self._knowledge.is_found(vic) and self._knowledge.in_todo(vic) \
+                            and self._knowledge.nr_searched_rooms == 0:
                         self._goal_vic = vic
                         self._goal_loc = remaining[vic]
                         # Move to target victim
                         self._rescue = 'together'
-                        self._send_message('Moving to ' + self._found_victim_logs[vic][
-                            'room'] + ' to pick up ' + self._goal_vic + '. Please come there as well to help me carry ' + self._goal_vic + ' to the drop zone.',
+                        self._send_message('Moving to ' + self._knowledge.victim(vic).room + ' to pick up ' + self._goal_vic + '. Please come there as well to help me carry ' + self._goal_vic + ' to the drop zone.',
                                           'RescueBot')
                         # Plan path to victim because the exact location is known (i.e., the agent found this victim)
-                        if 'location' in self._found_victim_logs[vic].keys():
+                        if self._knowledge.knows_location(vic):
                             self._phase = Phase.PLAN_PATH_TO_VICTIM
                             return Idle.__name__, {'duration_in_ticks': 25}
                         # Plan path to area because the exact victim location is not known, only the area (i.e., human found this  victim)
-                        if 'location' not in self._found_victim_logs[vic].keys():
+                        if not self._knowledge.knows_location(vic):
                             self._phase = Phase.PLAN_PATH_TO_ROOM
                             return Idle.__name__, {'duration_in_ticks': 25}
                     # Define a previously found victim as target victim
-                    if vic in self._found_victims and vic not in self._todo:
+                    if self._knowledge.is_found(vic) and not self._knowledge.in_todo(vic):
                         self._goal_vic = vic
                         self._goal_loc = remaining[vic]
                         # Rescue together when victim is critical or when the human is weak and the victim is mildly injured
@@ -210,59 +230,43 @@ class BaselineAgent(ArtificialBrain):
                         if 'mild' in vic and self._condition != 'weak':
                             self._rescue = 'alone'
                         # Plan path to victim because the exact location is known (i.e., the agent found this victim)
-                        if 'location' in self._found_victim_logs[vic].keys():
+                        if self._knowledge.knows_location(vic):
                             self._phase = Phase.PLAN_PATH_TO_VICTIM
                             return Idle.__name__, {'duration_in_ticks': 25}
                         # Plan path to area because the exact victim location is not known, only the area (i.e., human found this  victim)
-                        if 'location' not in self._found_victim_logs[vic].keys():
+                        if not self._knowledge.knows_location(vic):
                             self._phase = Phase.PLAN_PATH_TO_ROOM
                             return Idle.__name__, {'duration_in_ticks': 25}
                     # If there are no target victims found, visit an unsearched area to search for victims
-                    if vic not in self._found_victims or vic in self._found_victims and vic in self._todo and len(
-                            self._searched_rooms) > 0:
+                    if not self._knowledge.is_found(vic) or self._knowledge.is_found(vic) and self._knowledge.in_todo(
+                            vic) and self._knowledge.nr_searched_rooms > 0:
                         self._phase = Phase.PICK_UNSEARCHED_ROOM
 
             if Phase.PICK_UNSEARCHED_ROOM == self._phase:
                 agent_location = state[self.agent_id]['location']
                 # Identify which areas are not explored yet
-                unsearched_rooms = [room['room_name'] for room in state.values()
+                unsearched_rooms = [room['room_name'] for room in state.get_objects_of_type('Door')
                                    if 'class_inheritance' in room
                                    and 'Door' in room['class_inheritance']
-                                   and room['room_name'] not in self._searched_rooms
+                                   and not self._knowledge.is_searched(room['room_name'])
                                    and room['room_name'] not in self._to_search]
                 # If all areas have been searched but the task is not finished, start searching areas again
                 if self._remainingZones and len(unsearched_rooms) == 0:
                     self._to_search = []
-                    self._searched_rooms = []
+                    self._knowledge.clear_searched()
                     self._send_messages = []
-                    self.received_messages = []
-                    self.received_messages_content = []
+                    self._clear_received_messages()
                     self._send_message('Going to re-search all areas.', 'RescueBot')
                     self._phase = Phase.FIND_NEXT_GOAL
                 # If there are still areas to search, define which one to search next
                 else:
-                    # Identify the closest door when the agent did not search any areas yet
-                    if self._current_door == None:
-                        # Find all area entrance locations
-                        self._door = state.get_room_doors(self._getClosestRoom(state, unsearched_rooms, agent_location))[
-                            0]
-                        self._doormat = \
-                            state.get_room(self._getClosestRoom(state, unsearched_rooms, agent_location))[-1]['doormat']
-                        # Workaround for one area because of some bug
-                        if self._door['room_name'] == 'area 1':
-                            self._doormat = (3, 5)
-                        # Plan path to area
-                        self._phase = Phase.PLAN_PATH_TO_ROOM
-                    # Identify the closest door when the agent just searched another area
-                    if self._current_door != None:
-                        self._door = \
-                            state.get_room_doors(self._getClosestRoom(state, unsearched_rooms, self._current_door))[0]
-                        self._doormat = \
-                            state.get_room(self._getClosestRoom(state, unsearched_rooms, self._current_door))[-1][
-                                'doormat']
-                        if self._door['room_name'] == 'area 1':
-                            self._doormat = (3, 5)
-                        self._phase = Phase.PLAN_PATH_TO_ROOM
+                    # Identify the closest door, from the agent's location when the agent did not search any areas yet
+                    # or from the door of the area the agent just searched
+                    closest_room = self._getClosestRoom(state, unsearched_rooms, self._current_door)
+                    self._door = state.get_room_doors(closest_room)[0]
+                    self._doormat = self._navigation.doormat(closest_room)
+                    # Plan path to area
+                    self._phase = Phase.PLAN_PATH_TO_ROOM
 
             if Phase.PLAN_PATH_TO_ROOM == self._phase:
                 # Reset the navigator for a new path planning
@@ -270,24 +274,18 @@ class BaselineAgent(ArtificialBrain):
 
                 # Check if there is a goal victim, and it has been found, but its location is not known
                 if self._goal_vic \
-                        and self._goal_vic in self._found_victims \
-                        and 'location' not in self._found_victim_logs[self._goal_vic].keys():
+                        and self._knowledge.is_found(self._goal_vic) \
+                        and not self._knowledge.knows_location(self._goal_vic):
                     # Retrieve the victim's room location and related information
-                    victim_location = self._found_victim_logs[self._goal_vic]['room']
+                    victim_location = self._knowledge.victim(self._goal_vic).room
                     self._door = state.get_room_doors(victim_location)[0]
-                    self._doormat = state.get_room(victim_location)[-1]['doormat']
-
-                    # Handle special case for 'area 1'
-                    if self._door['room_name'] == 'area 1':
-                        self._doormat = (3, 5)
+                    self._doormat = self._navigation.doormat(victim_location)
 
                     # Set the door location based on the doormat
                     doorLoc = self._doormat
 
                 # If the goal victim's location is known, plan the route to the identified area
                 else:
-                    if self._door['room_name'] == 'area 1':
-                        self._doormat = (3, 5)
                     doorLoc = self._doormat
 
                 # Add the door location as a waypoint for navigation
@@ -297,20 +295,20 @@ class BaselineAgent(ArtificialBrain):
 
             if Phase.FOLLOW_PATH_TO_ROOM == self._phase:
                 # Check if the previously identified target victim was rescued by the human
-                if self._goal_vic and self._goal_vic in self._collected_victims:
+                if self._goal_vic and self._knowledge.is_collected(self._goal_vic):
                     # Reset current door and switch to finding the next goal
                     self._current_door = None
                     self._phase = Phase.FIND_NEXT_GOAL
 
                 # Check if the human found the previously identified target victim in a different room
                 if self._goal_vic \
-                        and self._goal_vic in self._found_victims \
-                        and self._door['room_name'] != self._found_victim_logs[self._goal_vic]['room']:
+                        and self._knowledge.is_found(self._goal_vic) \
+                        and self._door['room_name'] != self._knowledge.victim(self._goal_vic).room:
                     self._current_door = None
                     self._phase = Phase.FIND_NEXT_GOAL
 
                 # Check if the human already searched the previously identified area without finding the target victim
-                if self._door['room_name'] in self._searched_rooms and self._goal_vic not in self._found_victims:
+                if self._knowledge.is_searched(self._door['room_name']) and not self._knowledge.is_found(self._goal_vic):
                     self._current_door = None
                     self._phase = Phase.FIND_NEXT_GOAL
 
@@ -322,8 +320,8 @@ class BaselineAgent(ArtificialBrain):
                     # Explain why the agent is moving to the specific area, either:
                     # [-] it contains the current target victim
                     # [-] it is the closest un-searched area
-                    if self._goal_vic in self._found_victims \
-                            and str(self._door['room_name']) == self._found_victim_logs[self._goal_vic]['room'] \
+                    if self._knowledge.is_found(self._goal_vic) \
+                            and str(self._door['room_name']) == self._knowledge.victim(self._goal_vic).room \
                             and not self._remove:
                         if self._condition == 'weak':
                             self._send_message('Moving to ' + str(
@@ -334,7 +332,7 @@ class BaselineAgent(ArtificialBrain):
                                 'Moving to ' + str(self._door['room_name']) + ' to pick up ' + self._goal_vic + '.',
                                 'RescueBot')
 
-                    if self._goal_vic not in self._found_victims and not self._remove or not self._goal_vic and not self._remove:
+                    if not self._knowledge.is_found(self._goal_vic) and not self._remove or not self._goal_vic and not self._remove:
                         self._send_message(
                             'Moving to ' + str(self._door['room_name']) + ' because it is the closest unsearched area.',
                             'RescueBot')
@@ -347,7 +345,7 @@ class BaselineAgent(ArtificialBrain):
                     # Check for obstacles blocking the path to the area and handle them if needed
                     if action is not None:
                         # Remove obstacles blocking the path to the area 
-                        for info in state.values():
+                        for info in state.get_objects_of_type('ObstacleObject'):
                             if 'class_inheritance' in info and 'ObstacleObject' in info[
                                 'class_inheritance'] and 'stone' in info['obj_id'] and info['location'] not in [(9, 4),
                                                                                                                 (9, 7),
@@ -366,7 +364,9 @@ class BaselineAgent(ArtificialBrain):
                 objects = []
                 agent_location = state[self.agent_id]['location']
                 # Identify which obstacle is blocking the entrance
-                for info in state.values():
+                for info in state.get_objects_of_type('ObstacleObject'):
+                    if 'class_inheritance' in info and 'ObstacleObject' in info['class_inheritance']:
+                        self._knowledge.add_obstacle(info['obj_id'], self._door['room_name'], AGENT, info['location'])
                     if 'class_inheritance' in info and 'ObstacleObject' in info['class_inheritance'] and 'rock' in info[
                         'obj_id']:
                         objects.append(info)
@@ -374,22 +374,20 @@ class BaselineAgent(ArtificialBrain):
                         if self._answered == False and not self._remove and not self._waiting:
                             self._send_message('Found rock blocking ' + str(self._door['room_name']) + '. Please decide whether to "Remove" or "Continue" searching. \n \n \
                                 Important features to consider are: \n safe - victims rescued: ' + str(
-                                self._collected_victims) + ' \n explore - areas searched: area ' + str(
-                                self._searched_rooms).replace('area ', '') + ' \
+                                self._knowledge.collected_victims) + ' \n explore - areas searched: area ' + str(
+                                self._knowledge.searched_rooms).replace('area ', '') + ' \
                                 \n clock - removal time: 5 seconds \n afstand - distance between us: ' + self._distance_human,
                                               'RescueBot')
                             self._waiting = True
                             # Determine the next area to explore if the human tells the agent not to remove the obstacle
-                        if self.received_messages_content and self.received_messages_content[
-                            -1] == 'Continue' and not self._remove:
+                        if self.last_received_kind() == MessageKind.CONTINUE and not self._remove:
                             self._answered = True
                             self._waiting = False
                             # Add area to the to do list
                             self._to_search.append(self._door['room_name'])
                             self._phase = Phase.FIND_NEXT_GOAL
                         # Wait for the human to help removing the obstacle and remove the obstacle together
-                        if self.received_messages_content and self.received_messages_content[
-                            -1] == 'Remove' or self._remove:
+                        if self.last_received_kind() == MessageKind.REMOVE or self._remove:
                             if not self._remove:
                                 self._answered = True
                             # Tell the human to come over and be idle untill human arrives
@@ -413,21 +411,19 @@ class BaselineAgent(ArtificialBrain):
                         if self._answered == False and not self._remove and not self._waiting:
                             self._send_message('Found tree blocking  ' + str(self._door['room_name']) + '. Please decide whether to "Remove" or "Continue" searching. \n \n \
                                 Important features to consider are: \n safe - victims rescued: ' + str(
-                                self._collected_victims) + '\n explore - areas searched: area ' + str(
-                                self._searched_rooms).replace('area ', '') + ' \
+                                self._knowledge.collected_victims) + '\n explore - areas searched: area ' + str(
+                                self._knowledge.searched_rooms).replace('area ', '') + ' \
                                 \n clock - removal time: 10 seconds', 'RescueBot')
                             self._waiting = True
                         # Determine the next area to explore if the human tells the agent not to remove the obstacle
-                        if self.received_messages_content and self.received_messages_content[
-                            -1] == 'Continue' and not self._remove:
+                        if self.last_received_kind() == MessageKind.CONTINUE and not self._remove:
                             self._answered = True
                             self._waiting = False
                             # Add area to the to do list
                             self._to_search.append(self._door['room_name'])
                             self._phase = Phase.FIND_NEXT_GOAL
                         # Remove the obstacle if the human tells the agent to do so
-                        if self.received_messages_content and self.received_messages_content[
-                            -1] == 'Remove' or self._remove:
+                        if self.last_received_kind() == MessageKind.REMOVE or self._remove:
                             if not self._remove:
                                 self._answered = True
                                 self._waiting = False
@@ -438,6 +434,7 @@ class BaselineAgent(ArtificialBrain):
                                     self._door['room_name']) + ' because you asked me to.', 'RescueBot')
                             self._phase = Phase.ENTER_ROOM
                             self._remove = False
+                            self._knowledge.clear_obstacles(self._door['room_name'])
                             return RemoveObject.__name__, {'object_id': info['obj_id']}
                         # Remain idle untill the human communicates what to do with the identified obstacle
                         else:
@@ -450,32 +447,30 @@ class BaselineAgent(ArtificialBrain):
                         if self._answered == False and not self._remove and not self._waiting:
                             self._send_message('Found stones blocking  ' + str(self._door['room_name']) + '. Please decide whether to "Remove together", "Remove alone", or "Continue" searching. \n \n \
                                 Important features to consider are: \n safe - victims rescued: ' + str(
-                                self._collected_victims) + ' \n explore - areas searched: area ' + str(
-                                self._searched_rooms).replace('area', '') + ' \
+                                self._knowledge.collected_victims) + ' \n explore - areas searched: area ' + str(
+                                self._knowledge.searched_rooms).replace('area', '') + ' \
                                 \n clock - removal time together: 3 seconds \n afstand - distance between us: ' + self._distance_human + '\n clock - removal time alone: 20 seconds',
                                               'RescueBot')
                             self._waiting = True
                         # Determine the next area to explore if the human tells the agent not to remove the obstacle          
-                        if self.received_messages_content and self.received_messages_content[
-                            -1] == 'Continue' and not self._remove:
+                        if self.last_received_kind() == MessageKind.CONTINUE and not self._remove:
                             self._answered = True
                             self._waiting = False
                             # Add area to the to do list
                             self._to_search.append(self._door['room_name'])
                             self._phase = Phase.FIND_NEXT_GOAL
                         # Remove the obstacle alone if the human decides so
-                        if self.received_messages_content and self.received_messages_content[
-                            -1] == 'Remove alone' and not self._remove:
+                        if self.last_received_kind() == MessageKind.REMOVE_ALONE and not self._remove:
                             self._answered = True
                             self._waiting = False
                             self._send_message('Removing stones blocking ' + str(self._door['room_name']) + '.',
                                               'RescueBot')
                             self._phase = Phase.ENTER_ROOM
                             self._remove = False
+                            self._knowledge.clear_obstacles(self._door['room_name'])
                             return RemoveObject.__name__, {'object_id': info['obj_id']}
                         # Remove the obstacle together if the human decides so
-                        if self.received_messages_content and self.received_messages_content[
-                            -1] == 'Remove together' or self._remove:
+                        if self.last_received_kind() == MessageKind.REMOVE_TOGETHER or self._remove:
                             if not self._remove:
                                 self._answered = True
                             # Tell the human to come over and be idle untill human arrives
@@ -494,6 +489,7 @@ class BaselineAgent(ArtificialBrain):
                             return None, {}
                 # If no obstacles are blocking the entrance, enter the area
                 if len(objects) == 0:
+                    self._knowledge.clear_obstacles(self._door['room_name'])
                     self._answered = False
                     self._remove = False
                     self._waiting = False
@@ -503,18 +499,18 @@ class BaselineAgent(ArtificialBrain):
                 self._answered = False
 
                 # Check if the target victim has been rescued by the human, and switch to finding the next goal
-                if self._goal_vic in self._collected_victims:
+                if self._knowledge.is_collected(self._goal_vic):
                     self._current_door = None
                     self._phase = Phase.FIND_NEXT_GOAL
 
                 # Check if the target victim is found in a different area, and start moving there
-                if self._goal_vic in self._found_victims \
-                        and self._door['room_name'] != self._found_victim_logs[self._goal_vic]['room']:
+                if self._knowledge.is_found(self._goal_vic) \
+                        and self._door['room_name'] != self._knowledge.victim(self._goal_vic).room:
                     self._current_door = None
                     self._phase = Phase.FIND_NEXT_GOAL
 
                 # Check if area already searched without finding the target victim, and plan to search another area
-                if self._door['room_name'] in self._searched_rooms and self._goal_vic not in self._found_victims:
+                if self._knowledge.is_searched(self._door['room_name']) and not self._knowledge.is_found(self._goal_vic):
                     self._current_door = None
                     self._phase = Phase.FIND_NEXT_GOAL
 
@@ -533,11 +529,7 @@ class BaselineAgent(ArtificialBrain):
                 self._agent_loc = int(self._door['room_name'].split()[-1])
 
                 # Store the locations of all area tiles in the current room
-                room_tiles = [info['location'] for info in state.values()
-                             if 'class_inheritance' in info
-                             and 'AreaTile' in info['class_inheritance']
-                             and 'room_name' in info
-                             and info['room_name'] == self._door['room_name']]
+                room_tiles = [info['location'] for info in state.get_room_tiles(self._door['room_name'])]
                 self._roomtiles = room_tiles
 
                 # Make the plan for searching the area
@@ -545,7 +537,7 @@ class BaselineAgent(ArtificialBrain):
                 self._navigator.add_waypoints(self._efficientSearch(room_tiles))
 
                 # Initialize variables for storing room victims and switch to following the room search path
-                self._room_vics = []
+                self._room_vics = set()
                 self._phase = Phase.FOLLOW_ROOM_SEARCH_PATH
 
             if Phase.FOLLOW_ROOM_SEARCH_PATH == self._phase:
@@ -554,45 +546,40 @@ class BaselineAgent(ArtificialBrain):
                 action = self._navigator.get_move_action(self._state_tracker)
                 if action != None:
                     # Identify victims present in the area
-                    for info in state.values():
+                    for info in state.get_objects_of_type('CollectableBlock'):
                         if 'class_inheritance' in info and 'CollectableBlock' in info['class_inheritance']:
                             vic = str(info['img_name'][8:-4])
                             # Remember which victim the agent found in this area
-                            if vic not in self._room_vics:
-                                self._room_vics.append(vic)
+                            self._room_vics.add(vic)
 
                             # Identify the exact location of the victim that was found by the human earlier
-                            if vic in self._found_victims and 'location' not in self._found_victim_logs[vic].keys():
+                            if self._knowledge.is_found(vic) and not self._knowledge.knows_location(vic):
                                 self._recent_vic = vic
-                                # Add the exact victim location to the corresponding dictionary
-                                self._found_victim_logs[vic] = {'location': info['location'],
-                                                                'room': self._door['room_name'],
-                                                                'obj_id': info['obj_id']}
+                                # Add the exact victim location to the knowledge base
+                                self._knowledge.add_victim(vic, self._door['room_name'], AGENT, info['location'],
+                                                           info['obj_id'])
                                 if vic == self._goal_vic:
                                     # Communicate which victim was found
                                     self._send_message('Found ' + vic + ' in ' + self._door[
                                         'room_name'] + ' because you told me ' + vic + ' was located here.',
                                                       'RescueBot')
                                     # Add the area to the list with searched areas
-                                    if self._door['room_name'] not in self._searched_rooms:
-                                        self._searched_rooms.append(self._door['room_name'])
+                                    self._knowledge.search(self._door['room_name'], AGENT)
                                     # Do not continue searching the rest of the area but start planning to rescue the victim
                                     self._phase = Phase.FIND_NEXT_GOAL
 
                             # Identify injured victim in the area
-                            if 'healthy' not in vic and vic not in self._found_victims:
+                            if 'healthy' not in vic and not self._knowledge.is_found(vic):
                                 self._recent_vic = vic
-                                # Add the victim and the location to the corresponding dictionary
-                                self._found_victims.append(vic)
-                                self._found_victim_logs[vic] = {'location': info['location'],
-                                                                'room': self._door['room_name'],
-                                                                'obj_id': info['obj_id']}
+                                # Add the victim and the location to the knowledge base
+                                self._knowledge.add_victim(vic, self._door['room_name'], AGENT, info['location'],
+                                                           info['obj_id'])
                                 # Communicate which victim the agent found and ask the human whether to rescue the victim now or at a later stage
                                 if 'mild' in vic and self._answered == False and not self._waiting:
                                     self._send_message('Found ' + vic + ' in ' + self._door['room_name'] + '. Please decide whether to "Rescue together", "Rescue alone", or "Continue" searching. \n \n \
                                         Important features to consider are: \n safe - victims rescued: ' + str(
-                                        self._collected_victims) + '\n explore - areas searched: area ' + str(
-                                        self._searched_rooms).replace('area ', '') + '\n \
+                                        self._knowledge.collected_victims) + '\n explore - areas searched: area ' + str(
+                                        self._knowledge.searched_rooms).replace('area ', '') + '\n \
                                         clock - extra time when rescuing alone: 15 seconds \n afstand - distance between us: ' + self._distance_human,
                                                       'RescueBot')
                                     self._waiting = True
@@ -600,33 +587,29 @@ class BaselineAgent(ArtificialBrain):
                                 if 'critical' in vic and self._answered == False and not self._waiting:
                                     self._send_message('Found ' + vic + ' in ' + self._door['room_name'] + '. Please decide whether to "Rescue" or "Continue" searching. \n\n \
                                         Important features to consider are: \n explore - areas searched: area ' + str(
-                                        self._searched_rooms).replace('area',
+                                        self._knowledge.searched_rooms).replace('area',
                                                                       '') + ' \n safe - victims rescued: ' + str(
-                                        self._collected_victims) + '\n \
+                                        self._knowledge.collected_victims) + '\n \
                                         afstand - distance between us: ' + self._distance_human, 'RescueBot')
                                     self._waiting = True
                                     # Execute move actions to explore the area
                     return action, {}
 
                 # Communicate that the agent did not find the target victim in the area while the human previously communicated the victim was located here
-                if self._goal_vic in self._found_victims and self._goal_vic not in self._room_vics and \
-                        self._found_victim_logs[self._goal_vic]['room'] == self._door['room_name']:
+                if self._knowledge.is_found(self._goal_vic) and self._goal_vic not in self._room_vics and \
+                        self._knowledge.victim(self._goal_vic).room == self._door['room_name']:
                     self._send_message(self._goal_vic + ' not present in ' + str(self._door[
                                                                                     'room_name']) + ' because I searched the whole area without finding ' + self._goal_vic + '.',
                                       'RescueBot')
                     # Remove the victim location from memory
-                    self._found_victim_logs.pop(self._goal_vic, None)
-                    self._found_victims.remove(self._goal_vic)
-                    self._room_vics = []
+                    self._knowledge.forget_victim(self._goal_vic)
+                    self._room_vics = set()
                     # Reset received messages (bug fix)
-                    self.received_messages = []
-                    self.received_messages_content = []
+                    self._clear_received_messages()
                 # Add the area to the list of searched areas
-                if self._door['room_name'] not in self._searched_rooms:
-                    self._searched_rooms.append(self._door['room_name'])
+                self._knowledge.search(self._door['room_name'], AGENT)
                 # Make a plan to rescue a found critically injured victim if the human decides so
-                if self.received_messages_content and self.received_messages_content[
-                    -1] == 'Rescue' and 'critical' in self._recent_vic:
+                if self.last_received_kind() == MessageKind.RESCUE and 'critical' in self._recent_vic:
                     self._rescue = 'together'
                     self._answered = True
                     self._waiting = False
@@ -643,8 +626,7 @@ class BaselineAgent(ArtificialBrain):
                     self._recent_vic = None
                     self._phase = Phase.PLAN_PATH_TO_VICTIM
                 # Make a plan to rescue a found mildly injured victim together if the human decides so
-                if self.received_messages_content and self.received_messages_content[
-                    -1] == 'Rescue together' and 'mild' in self._recent_vic:
+                if self.last_received_kind() == MessageKind.RESCUE_TOGETHER and 'mild' in self._recent_vic:
                     self._rescue = 'together'
                     self._answered = True
                     self._waiting = False
@@ -661,8 +643,7 @@ class BaselineAgent(ArtificialBrain):
                     self._recent_vic = None
                     self._phase = Phase.PLAN_PATH_TO_VICTIM
                 # Make a plan to rescue the mildly injured victim alone if the human decides so, and communicate this to the human
-                if self.received_messages_content and self.received_messages_content[
-                    -1] == 'Rescue alone' and 'mild' in self._recent_vic:
+                if self.last_received_kind() == MessageKind.RESCUE_ALONE and 'mild' in self._recent_vic:
                     self._send_message('Picking up ' + self._recent_vic + ' in ' + self._door['room_name'] + '.',
                                       'RescueBot')
                     self._rescue = 'alone'
@@ -673,15 +654,15 @@ class BaselineAgent(ArtificialBrain):
                     self._recent_vic = None
                     self._phase = Phase.PLAN_PATH_TO_VICTIM
                 # Continue searching other areas if the human decides so
-                if self.received_messages_content and self.received_messages_content[-1] == 'Continue':
+                if self.last_received_kind() == MessageKind.CONTINUE:
                     self._answered = True
                     self._waiting = False
-                    self._todo.append(self._recent_vic)
+                    self._knowledge.add_todo(self._recent_vic)
                     self._recent_vic = None
                     self._phase = Phase.FIND_NEXT_GOAL
                 # Remain idle untill the human communicates to the agent what to do with the found victim
-                if self.received_messages_content and self._waiting and self.received_messages_content[
-                    -1] != 'Rescue' and self.received_messages_content[-1] != 'Continue':
+                if self.received_messages_content and self._waiting and self.last_received_kind() not in (
+                        MessageKind.RESCUE, MessageKind.CONTINUE):
                     return None, {}
                 # Find the next area to search when the agent is not waiting for an answer from the human or occupied with rescuing a victim
                 if not self._waiting and not self._rescue:
@@ -692,13 +673,13 @@ class BaselineAgent(ArtificialBrain):
             if Phase.PLAN_PATH_TO_VICTIM == self._phase:
                 # Plan the path to a found victim using its location
                 self._navigator.reset_full()
-                self._navigator.add_waypoints([self._found_victim_logs[self._goal_vic]['location']])
+                self._navigator.add_waypoints([self._knowledge.victim(self._goal_vic).location])
                 # Follow the path to the found victim
                 self._phase = Phase.FOLLOW_PATH_TO_VICTIM
 
             if Phase.FOLLOW_PATH_TO_VICTIM == self._phase:
                 # Start searching for other victims if the human already rescued the target victim
-                if self._goal_vic and self._goal_vic in self._collected_victims:
+                if self._goal_vic and self._knowledge.is_collected(self._goal_vic):
                     self._phase = Phase.FIND_NEXT_GOAL
 
                 # Move towards the location of the found victim
@@ -713,26 +694,22 @@ class BaselineAgent(ArtificialBrain):
 
             if Phase.TAKE_VICTIM == self._phase:
                 # Store all area tiles in a list
-                room_tiles = [info['location'] for info in state.values()
-                             if 'class_inheritance' in info
-                             and 'AreaTile' in info['class_inheritance']
-                             and 'room_name' in info
-                             and info['room_name'] == self._found_victim_logs[self._goal_vic]['room']]
+                room_tiles = [info['location'] for info in state.get_room_tiles(self._knowledge.victim(self._goal_vic).room)]
                 self._roomtiles = room_tiles
                 objects = []
                 # When the victim has to be carried by human and agent together, check whether human has arrived at the victim's location
-                for info in state.values():
+                for info in state.get_objects_of_type('CollectableBlock'):
                     # When the victim has to be carried by human and agent together, check whether human has arrived at the victim's location
                     if 'class_inheritance' in info and 'CollectableBlock' in info['class_inheritance'] and 'critical' in \
                             info['obj_id'] and info['location'] in self._roomtiles or \
                             'class_inheritance' in info and 'CollectableBlock' in info[
                         'class_inheritance'] and 'mild' in info['obj_id'] and info[
                         'location'] in self._roomtiles and self._rescue == 'together' or \
-                            self._goal_vic in self._found_victims and self._goal_vic in self._todo and len(
-                        self._searched_rooms) == 0 and 'class_inheritance' in info and 'CollectableBlock' in info[
+                            self._knowledge.is_found(self._goal_vic) and self._knowledge.in_todo(self._goal_vic) and \
+                            self._knowledge.nr_searched_rooms == 0 and 'class_inheritance' in info and 'CollectableBlock' in info[
                         'class_inheritance'] and 'critical' in info['obj_id'] and info['location'] in self._roomtiles or \
-                            self._goal_vic in self._found_victims and self._goal_vic in self._todo and len(
-                        self._searched_rooms) == 0 and 'class_inheritance' in info and 'CollectableBlock' in info[
+                            self._knowledge.is_found(self._goal_vic) and self._knowledge.in_todo(self._goal_vic) and \
+                            self._knowledge.nr_searched_rooms == 0 and 'class_inheritance' in info and 'CollectableBlock' in info[
                         'class_inheritance'] and 'mild' in info['obj_id'] and info['location'] in self._roomtiles:
                         objects.append(info)
                         # Remain idle when the human has not arrived at the location
@@ -744,18 +721,16 @@ class BaselineAgent(ArtificialBrain):
                 if len(objects) == 0 and 'critical' in self._goal_vic or len(
                         objects) == 0 and 'mild' in self._goal_vic and self._rescue == 'together':
                     self._waiting = False
-                    if self._goal_vic not in self._collected_victims:
-                        self._collected_victims.append(self._goal_vic)
+                    self._knowledge.collect(self._goal_vic, AGENT)
                     self._carrying_together = True
                     # Determine the next victim to rescue or search
                     self._phase = Phase.FIND_NEXT_GOAL
                 # When rescuing mildly injured victims alone, pick the victim up and plan the path to the drop zone
                 if 'mild' in self._goal_vic and self._rescue == 'alone':
                     self._phase = Phase.PLAN_PATH_TO_DROPPOINT
-                    if self._goal_vic not in self._collected_victims:
-                        self._collected_victims.append(self._goal_vic)
+                    self._knowledge.collect(self._goal_vic, AGENT)
                     self._carrying = True
-                    return CarryObject.__name__, {'object_id': self._found_victim_logs[self._goal_vic]['obj_id'],
+                    return CarryObject.__name__, {'object_id': self._knowledge.victim(self._goal_vic).obj_id,
                                                   'human_name': self._human_name}
 
             if Phase.PLAN_PATH_TO_DROPPOINT == self._phase:
@@ -806,132 +781,125 @@ class BaselineAgent(ArtificialBrain):
     def _process_messages(self, state, teamMembers, condition):
         '''
         process incoming messages received from the team members
+        only the messages received since the previous tick are parsed and processed
+        @return list with the TeamMessages of the newly received unique messages
         '''
-
-        receivedMessages = {}
-        # Create a dictionary with a list of received messages from each team member
-        for member in teamMembers:
-            receivedMessages[member] = []
-        for mssg in self.received_messages:
-            for member in teamMembers:
-                if mssg.from_id == member:
-                    receivedMessages[member].append(mssg.content)
-        # Check the content of the received messages
-        for mssgs in receivedMessages.values():
-            for msg in mssgs:
-                # If a received message involves team members searching areas, add these areas to the memory of areas that have been explored
-                if msg.startswith("Search:"):
-                    area = 'area ' + msg.split()[-1]
-                    if area not in self._searched_rooms:
-                        self._searched_rooms.append(area)
-                # If a received message involves team members finding victims, add these victims and their locations to memory
-                if msg.startswith("Found:"):
-                    # Identify which victim and area it concerns
-                    if len(msg.split()) == 6:
-                        foundVic = ' '.join(msg.split()[1:4])
-                    else:
-                        foundVic = ' '.join(msg.split()[1:5])
-                    loc = 'area ' + msg.split()[-1]
-                    # Add the area to the memory of searched areas
-                    if loc not in self._searched_rooms:
-                        self._searched_rooms.append(loc)
-                    # Add the victim and its location to memory
-                    if foundVic not in self._found_victims:
-                        self._found_victims.append(foundVic)
-                        self._found_victim_logs[foundVic] = {'room': loc}
-                    if foundVic in self._found_victims and self._found_victim_logs[foundVic]['room'] != loc:
-                        self._found_victim_logs[foundVic] = {'room': loc}
-                    # Decide to help the human carry a found victim when the human's condition is 'weak'
-                    if condition == 'weak':
-                        self._rescue = 'together'
-                    # Add the found victim to the to do list when the human's condition is not 'weak'
-                    if 'mild' in foundVic and condition != 'weak':
-                        self._todo.append(foundVic)
-                # If a received message involves team members rescuing victims, add these victims and their locations to memory
-                if msg.startswith('Collect:'):
-                    # Identify which victim and area it concerns
-                    if len(msg.split()) == 6:
-                        collectVic = ' '.join(msg.split()[1:4])
-                    else:
-                        collectVic = ' '.join(msg.split()[1:5])
-                    loc = 'area ' + msg.split()[-1]
-                    # Add the area to the memory of searched areas
-                    if loc not in self._searched_rooms:
-                        self._searched_rooms.append(loc)
-                    # Add the victim and location to the memory of found victims
-                    if collectVic not in self._found_victims:
-                        self._found_victims.append(collectVic)
-                        self._found_victim_logs[collectVic] = {'room': loc}
-                    if collectVic in self._found_victims and self._found_victim_logs[collectVic]['room'] != loc:
-                        self._found_victim_logs[collectVic] = {'room': loc}
-                    # Add the victim to the memory of rescued victims when the human's condition is not weak
-                    if condition != 'weak' and collectVic not in self._collected_victims:
-                        self._collected_victims.append(collectVic)
-                    # Decide to help the human carry the victim together when the human's condition is weak
-                    if condition == 'weak':
-                        self._rescue = 'together'
-                # If a received message involves team members asking for help with removing obstacles, add their location to memory and come over
-                if msg.startswith('Remove:'):
-                    # Come over immediately when the agent is not carrying a victim
-                    if not self._carrying:
-                        # Identify at which location the human needs help
-                        area = 'area ' + msg.split()[-1]
-                        self._door = state.get_room_doors(area)[0]
-                        self._doormat = state.get_room(area)[-1]['doormat']
-                        if area in self._searched_rooms:
-                            self._searched_rooms.remove(area)
-                        # Clear received messages (bug fix)
-                        self.received_messages = []
-                        self.received_messages_content = []
-                        self._moving = True
-                        self._remove = True
-                        if self._waiting and self._recent_vic:
-                            self._todo.append(self._recent_vic)
-                        self._waiting = False
-                        # Let the human know that the agent is coming over to help
-                        self._send_message(
-                            'Moving to ' + str(self._door['room_name']) + ' to help you remove an obstacle.',
-                            'RescueBot')
-                        # Plan the path to the relevant area
-                        self._phase = Phase.PLAN_PATH_TO_ROOM
-                    # Come over to help after dropping a victim that is currently being carried by the agent
-                    else:
-                        area = 'area ' + msg.split()[-1]
-                        self._send_message('Will come to ' + area + ' after dropping ' + self._goal_vic + '.',
-                                          'RescueBot')
-            # Store the current location of the human in memory
-            if mssgs and mssgs[-1].split()[-1] in ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12', '13',
-                                                   '14']:
-                self._human_loc = int(mssgs[-1].split()[-1])
+        # Start again from the first message when the received messages have been cleared
+        if self._message_cursor > len(self.received_messages):
+            self._message_cursor = 0
+        new_mssgs = self.received_messages[self._message_cursor:]
+        self._message_cursor = len(self.received_messages)
+        # Come over to help removing an obstacle once the victim the agent was carrying has been dropped
+        if self._pending_remove and not self._carrying:
+            self._help_remove_obstacle(state, self._pending_remove)
+        # Create a list of received messages from the human team member
+        new_messages = []
+        last_human_loc = {}
+        members = set(teamMembers)
+        for mssg in new_mssgs:
+            if mssg.from_id not in members:
+                continue
+            record = read_message(mssg.content)
+            # The same message sent at another tick is not new
+            key = record._replace(tick=None)
+            if key not in self._received_messages_set:
+                self._received_messages_set.add(key)
+                self._received_messages.append(record)
+                new_messages.append(record)
+            # Messages about an area tell where the human currently is
+            last_human_loc[mssg.from_id] = record.area if record.area in AREA_NUMBERS else None
+            # If a received message involves team members searching areas, add these areas to the memory of areas that have been explored
+            if record.kind == MessageKind.SEARCH:
+                self._knowledge.search(record.room, HUMAN)
+            # If a received message involves team members finding victims, add these victims and their locations to memory
+            elif record.kind == MessageKind.FOUND:
+                foundVic = record.victim
+                loc = record.room
+                # Add the area to the memory of searched areas
+                self._knowledge.search(loc, HUMAN)
+                # Add the victim and its location to memory
+                self._knowledge.report_victim(foundVic, loc)
+                # Decide to help the human carry a found victim when the human's condition is 'weak'
+                if condition == 'weak':
+                    self._rescue_together_requested = True
+                # Add the found victim to the to do list when the human's condition is not 'weak'
+                if 'mild' in foundVic and condition != 'weak':
+                    self._knowledge.add_todo(foundVic)
+            # If a received message involves team members rescuing victims, add these victims and their locations to memory
+            elif record.kind == MessageKind.COLLECT:
+                collectVic = record.victim
+                loc = record.room
+                # Add the area to the memory of searched areas
+                self._knowledge.search(loc, HUMAN)
+                # Add the victim and location to the memory of found victims
+                self._knowledge.report_victim(collectVic, loc)
+                # Add the victim to the memory of rescued victims when the human's condition is not weak
+                if condition != 'weak':
+                    self._knowledge.collect(collectVic, HUMAN)
+                # Decide to help the human carry the victim together when the human's condition is weak
+                if condition == 'weak':
+                    self._rescue_together_requested = True
+            # If a received message involves team members asking for help with removing obstacles, add their location to memory and come over
+            elif record.kind == MessageKind.REMOVE_AT:
+                # Come over immediately when the agent is not carrying a victim
+                if not self._carrying:
+                    self._help_remove_obstacle(state, record.room)
+                # Come over to help after dropping a victim that is currently being carried by the agent
+                else:
+                    self._pending_remove = record.room
+                    self._send_message('Will come to ' + record.room + ' after dropping ' + self._goal_vic + '.',
+                                      'RescueBot')
+        # Store the current location of the human in memory
+        for human_loc in last_human_loc.values():
+            if human_loc is not None:
+                self._human_loc = human_loc
+        # Keep helping the weak human carry victims as long as the found or collected victim messages are remembered
+        if self._rescue_together_requested:
+            self._rescue = 'together'
+        return new_messages
+
+    def _help_remove_obstacle(self, state, area):
+        '''
+        move to the area where a team member asked for help with removing an obstacle
+        '''
+        # Identify at which location the human needs help
+        self._door = state.get_room_doors(area)[0]
+        self._doormat = self._navigation.doormat(area)
+        self._knowledge.unsearch(area)
+        # The human reported an obstacle blocking the area
+        self._knowledge.add_obstacle(None, area, HUMAN)
+        # Clear received messages (bug fix)
+        self._clear_received_messages()
+        self._moving = True
+        self._remove = True
+        if self._waiting and self._recent_vic:
+            self._knowledge.add_todo(self._recent_vic)
+        self._waiting = False
+        # Let the human know that the agent is coming over to help
+        self._send_message(
+            'Moving to ' + str(self._door['room_name']) + ' to help you remove an obstacle.',
+            'RescueBot')
+        # Plan the path to the relevant area
+        self._phase = Phase.PLAN_PATH_TO_ROOM
+
+    def _clear_received_messages(self):
+        '''
+        forget the received messages, so messages are not processed again
+        '''
+        self.received_messages = []
+        self.received_messages_content = []
+        self._message_cursor = 0
+        self._rescue_together_requested = False
 
     def _loadBelief(self, members, folder):
         '''
         Loads trust belief values if agent already collaborated with human before, otherwise trust belief values are initialized using default values.
+        The values are retrieved from the in-memory trust belief store, which read the beliefs file once during initialization.
         '''
         # Create a dictionary with trust values for all team members
         trustBeliefs = {}
-        # Set a default starting trust value
-        default = 0.5
-        trustfile_header = []
-        trustfile_contents = []
         # Check if agent already collaborated with this human before, if yes: load the corresponding trust values, if no: initialize using default trust values
-        with open(folder + '/beliefs/allTrustBeliefs.csv') as csvfile:
-            reader = csv.reader(csvfile, delimiter=';', quotechar="'")
-            for row in reader:
-                if trustfile_header == []:
-                    trustfile_header = row
-                    continue
-                # Retrieve trust values 
-                if row and row[0] == self._human_name:
-                    name = row[0]
-                    competence = float(row[1])
-                    willingness = float(row[2])
-                    trustBeliefs[name] = {'competence': competence, 'willingness': willingness}
-                # Initialize default trust values
-                if row and row[0] != self._human_name:
-                    competence = default
-                    willingness = default
-                    trustBeliefs[self._human_name] = {'competence': competence, 'willingness': willingness}
+        trustBeliefs[self._human_name] = self._trust_beliefs.initial(self._human_name)
         return trustBeliefs
 
     def _trustBelief(self, members, trustBeliefs, folder, receivedMessages):
@@ -941,17 +909,14 @@ class BaselineAgent(ArtificialBrain):
         # Update the trust value based on for example the received messages
         for message in receivedMessages:
             # Increase agent trust in a team member that rescued a victim
-            if 'Collect' in message:
+            if message.kind == MessageKind.COLLECT:
                 trustBeliefs[self._human_name]['competence'] += 0.10
                 # Restrict the competence belief to a range of -1 to 1
                 trustBeliefs[self._human_name]['competence'] = np.clip(trustBeliefs[self._human_name]['competence'], -1,
                                                                        1)
         # Save current trust belief values so we can later use and retrieve them to add to a csv file with all the logged trust belief values
-        with open(folder + '/beliefs/currentTrustBelief.csv', mode='w') as csv_file:
-            csv_writer = csv.writer(csv_file, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-            csv_writer.writerow(['name', 'competence', 'willingness'])
-            csv_writer.writerow([self._human_name, trustBeliefs[self._human_name]['competence'],
-                                 trustBeliefs[self._human_name]['willingness']])
+        # The store only writes the current trust belief file when the values changed
+        self._trust_beliefs.update(self._human_name, trustBeliefs[self._human_name])
 
         return trustBeliefs
 
@@ -960,7 +925,7 @@ class BaselineAgent(ArtificialBrain):
         send messages from agent to other team members
         '''
         msg = Message(content=mssg, from_id=sender)
-        if msg.content not in self.received_messages_content and 'Our score is' not in msg.content:
+        if not self.has_received(msg.content) and 'Our score is' not in msg.content:
             self.send_message(msg)
             self._send_messages.append(msg.content)
         # Sending the hidden score message (DO NOT REMOVE)
@@ -969,20 +934,11 @@ class BaselineAgent(ArtificialBrain):
 
     def _getClosestRoom(self, state, objs, currentDoor):
         '''
-        calculate which area is closest to the agent's location
+        calculate which area is closest to the agent's location, or to currentDoor if given, by path length to its doormat
         '''
-        agent_location = state[self.agent_id]['location']
-        locs = {}
-        for obj in objs:
-            locs[obj] = state.get_room_doors(obj)[0]['location']
-        dists = {}
-        for room, loc in locs.items():
-            if currentDoor != None:
-                dists[room] = utils.get_distance(currentDoor, loc)
-            if currentDoor == None:
-                dists[room] = utils.get_distance(agent_location, loc)
-
-        return min(dists, key=dists.get)
+        if currentDoor != None:
+            return self._navigation.closest_room(currentDoor, objs)
+        return self._navigation.closest_room(state[self.agent_id]['location'], objs)
 
     def _efficientSearch(self, tiles):
         '''
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+import numpy as np
+from matrx.agents.agent_utils.navigator import Navigator, AStarPlanner
+
+
+class PathCache:
+    '''
+    Least recently used cache of the paths planned by the navigator of an agent, keyed by (start, goal). All cached paths
+    are dropped whenever a location that was blocked in the occupation map of the agent is free, because a shorter path
+    might be possible now. That happens when an obstacle is removed with RemoveObject or RemoveObjectTogether, but also
+    when the StateTracker of the agent forgets an obstacle it no longer sees (after knowledge_decay ticks, 10 by
+    default). Obstacles that the agent discovers keep the cache, instead a cached path that runs through a known obstacle
+    is planned again.
+    '''
+    def __init__(self, max_size=2048):
+        self._max_size = max_size
+        self._paths = OrderedDict()
+        self._blocked = None
+        self.hits = 0
+        self.misses = 0
+
+    def obstacle_removed(self):
+        '''
+        Invalidates all cached paths, because a shorter path might be possible now.
+        '''
+        self._paths.clear()
+
+    def plan(self, start, goal, occupation_map, planner):
+        '''
+        @return the cached path from start to goal, or the path planned by planner(start, goal, occupation_map)
+        '''
+        blocked = np.asarray(occupation_map) != 0
+        if self._blocked is not None and (self._blocked.shape != blocked.shape or np.any(self._blocked & ~blocked)):
+            self.obstacle_removed()
+        self._blocked = blocked
+        start, goal = tuple(start), tuple(goal)
+        key = (start, goal)
+        path = self._paths.get(key)
+        if path is not None and not any(blocked[loc[0], loc[1]] for loc in path):
+            self._paths.move_to_end(key)
+            self.hits += 1
+            return list(path)
+        self.misses += 1
+        path = planner(start, goal, occupation_map)
+        # Without a path the planner stays put, which is not worth caching
+        if start != goal and path == [start]:
+            return path
+        # Every part of a shortest path is a shortest path as well, so cache the rest of the path from every location on it
+        loc = start
+        for idx in range(len(path)):
+            self._paths[(loc, goal)] = tuple(path[idx:])
+            self._paths.move_to_end((loc, goal))
+            loc = tuple(path[idx])
+        while len(self._paths) > self._max_size:
+            self._paths.popitem(last=False)
+        return path
+
+
+class CachedAStarPlanner(AStarPlanner):
+    '''
+    A* planner that consults the path cache given in its settings before planning.
+    '''
+    def __init__(self, action_set, settings):
+        super().__init__(action_set, settings)
+        self._path_cache = settings['path_cache']
+
+    def plan(self, start, goal, occupation_map):
+        return self._path_cache.plan(start, goal, occupation_map, super().plan)
+
+    def __getstate__(self):
+        # The heuristic is a lambda, which cannot be pickled, it is set again from the metric in the settings
+        state = dict(self.__dict__)
+        del state['heuristic']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.heuristic = AStarPlanner([], {'metric': self.settings.get('metric', AStarPlanner.EUCLIDEAN_METRIC)}).heuristic
+
+
+class CachedNavigator(Navigator):
+    '''
+    Navigator that plans its routes with A* through a path cache, which is kept when the navigator is reset.
+    '''
+    CACHED_A_STAR_ALGORITHM = "cached_a_star"
+
+    def __init__(self, agent_id, action_set, path_cache=None, is_circular=False):
+        self.path_cache = PathCache() if path_cache is None else path_cache
+        self._cached_agent_id = agent_id
+        self._cached_action_set = action_set
+        super().__init__(agent_id=agent_id, action_set=action_set, algorithm=self.CACHED_A_STAR_ALGORITHM,
+                         custom_algorithm_class=CachedAStarPlanner,
+                         algorithm_settings={"metric": "euclidean", "path_cache": self.path_cache},
+                         is_circular=is_circular)
+
+    def reset_full(self):
+        # Clears all waypoints, but keeps the path cache
+        self.__init__(self._cached_agent_id, self._cached_action_set, self.path_cache, self.is_circular)
@@ -0,0 +1,112 @@
+import os, csv, atexit
+
+# Default starting trust value for humans the agent did not collaborate with before
+default_trust = 0.5
+
+# One store per beliefs folder, so the agent and the output logger share the same in-memory values
+_stores = {}
+
+
+class TrustBeliefStore:
+    '''
+    In-memory store for the trust belief values of RescueBot, keyed by human name.
+    The logged trust beliefs are read once from 'beliefs/allTrustBeliefs.csv' when the store is loaded, and the current
+    trust beliefs are only written to 'beliefs/currentTrustBelief.csv' when their values change, when flushed, or at shutdown.
+    '''
+    def __init__(self, folder, default=default_trust):
+        self._folder = folder
+        self._default = default
+        # Last logged trust beliefs of every human in allTrustBeliefs.csv
+        self._logged = {}
+        # Current trust beliefs of the humans the agent collaborates with
+        self._current = {}
+        self._dirty = False
+
+    @classmethod
+    def for_folder(cls, folder):
+        '''
+        @return the shared trust belief store of the given folder
+        '''
+        key = os.path.abspath(folder)
+        if key not in _stores:
+            _stores[key] = cls(folder)
+        return _stores[key]
+
+    def load(self):
+        '''
+        Loads all logged trust belief values into memory, the most recent row of a human is used.
+        '''
+        self._logged = {}
+        self._current = {}
+        self._dirty = False
+        trustfile_header = []
+        with open(os.path.join(self._folder, 'beliefs', 'allTrustBeliefs.csv')) as csvfile:
+            reader = csv.reader(csvfile, delimiter=';', quotechar="'")
+            for row in reader:
+                if trustfile_header == []:
+                    trustfile_header = row
+                    continue
+                # Skip empty rows and rows without a human name or values
+                if not row or not row[0] or len(row) < 3:
+                    continue
+                try:
+                    self._logged[row[0]] = {'competence': float(row[1]), 'willingness': float(row[2])}
+                except ValueError:
+                    continue
+        return self
+
+    def initial(self, name):
+        '''
+        @return a copy of the logged trust beliefs of the human, or the default values if the agent did not collaborate with the human before
+        '''
+        if name in self._logged:
+            return dict(self._logged[name])
+        return {'competence': self._default, 'willingness': self._default}
+
+    def get(self, name):
+        '''
+        @return a copy of the current trust beliefs of the human
+        '''
+        if name not in self._current:
+            return self.initial(name)
+        return dict(self._current[name])
+
+    def update(self, name, beliefs):
+        '''
+        Sets the current trust beliefs of the human, and persists them only if the values changed.
+        '''
+        beliefs = {'competence': beliefs['competence'], 'willingness': beliefs['willingness']}
+        if self._current.get(name) == beliefs:
+            return False
+        self._current[name] = beliefs
+        self._dirty = True
+        self.flush()
+        return True
+
+    def flush(self):
+        '''
+        Writes the current trust beliefs to 'beliefs/currentTrustBelief.csv' if they changed since the last write.
+        '''
+        if not self._dirty:
+            return False
+        with open(os.path.join(self._folder, 'beliefs', 'currentTrustBelief.csv'), mode='w') as csv_file:
+            csv_writer = csv.writer(csv_file, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            csv_writer.writerow(['name', 'competence', 'willingness'])
+            for name, beliefs in self._current.items():
+                csv_writer.writerow([name, beliefs['competence'], beliefs['willingness']])
+        self._dirty = False
+        return True
+
+
+def flush_trust_beliefs(folder=None):
+    '''
+    Flushes the trust belief store of the given folder, or all stores when no folder is given.
+    '''
+    if folder is not None:
+        store = _stores.get(os.path.abspath(folder))
+        return [store.flush()] if store else []
+    return [store.flush() for store in _stores.values()]
+
+
+# Persist any unsaved trust beliefs when the process shuts down
+atexit.register(flush_trust_beliefs)
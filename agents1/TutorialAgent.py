@@ -13,6 +13,9 @@ from matrx.actions.move_actions import MoveNorth
 from matrx.messages.message import Message
 from matrx.messages.message_manager import MessageManager
 from actions1.CustomActions import RemoveObjectTogether, CarryObjectTogether, DropObjectTogether, CarryObject, Drop
+from agents1.PathCache import CachedNavigator
+from agents1.KnowledgeBase import KnowledgeBase, AGENT, HUMAN
+from brains1.MessageProtocol import MessageKind, read_message
 
 class Phase(enum.Enum):
     INTRO0=0,
@@ -54,11 +57,9 @@ class TutorialAgent(ArtificialBrain):
         self._humanName = name
         self._folder = folder
         self._phase=Phase.INTRO0
-        self._roomVics = []
-        self._searchedRooms = []
-        self._foundVictims = []
-        self._collectedVictims = []
-        self._foundVictimLocs = {}
+        self._roomVics = set()
+        # What the agent knows about the victims, obstacles and areas, seen itself or reported by the human
+        self._knowledge = KnowledgeBase()
         self._maxTicks = 9600
         self._sendMessages = []
         self._currentDoor=None 
@@ -73,7 +74,6 @@ class TutorialAgent(ArtificialBrain):
         self._distanceHuman = None
         self._distanceDrop = None
         self._agentLoc = None
-        self._todo = []
         self._answered = False
         self._tosearch = []
         self._tutorial = True
@@ -82,7 +82,7 @@ class TutorialAgent(ArtificialBrain):
     def initialize(self):
         # Initialization of the state tracker and navigation algorithm
         self._state_tracker = StateTracker(agent_id=self.agent_id)
-        self._navigator = Navigator(agent_id=self.agent_id, action_set=self.action_set, algorithm=Navigator.A_STAR_ALGORITHM)
+        self._navigator = CachedNavigator(agent_id=self.agent_id, action_set=self.action_set)
 
     def filter_observations(self, state):
         # Filtering of the world state before deciding on an action 
@@ -94,6 +94,8 @@ class TutorialAgent(ArtificialBrain):
         for member in state['World']['team_members']:
             if member!=agent_name and member not in self._teamMembers:
                 self._teamMembers.append(member)       
+        # Stamp what the agent learns during this tick with the tick
+        self._knowledge.tick = state['World']['nr_ticks']
         # Process messages from team members
         self._processMessages(state, self._teamMembers)
         
@@ -118,10 +120,10 @@ class TutorialAgent(ArtificialBrain):
             self._distanceDrop = 'close'
 
         # Check whether victims are currently being carried together by human and agent
-        for info in state.values():
+        for info in state.get_objects_with_property('is_human_agent'):
             if 'is_human_agent' in info and self._humanName in info['name'] and len(info['is_carrying'])>0 and 'critical' in info['is_carrying'][0]['obj_id']:
                 # Add victim to colleced victims memory
-                self._collectedVictims.append(info['is_carrying'][0]['img_name'][8:-4])
+                self._knowledge.collect(info['is_carrying'][0]['img_name'][8:-4], AGENT)
                 self._carryingTogether = True
             if 'is_human_agent' in info and self._humanName in info['name'] and len(info['is_carrying'])==0:
                 self._carryingTogether = False
@@ -146,7 +148,7 @@ class TutorialAgent(ArtificialBrain):
                 and a cat (critically injured cat/mildly injured cat/healthy cat). The environment will also contain different obstacle types with varying removal times. \
                 At the top of the world you can find the keyboard controls, for moving you can use the arrow keys. \
                 Press the "Continue" button to start the tutorial explaining everything.', 'RescueBot')
-                if self.received_messages_content and self.received_messages_content[-1]=='Continue':
+                if self.last_received_kind()==MessageKind.CONTINUE:
                     self._phase=Phase.INTRO1
                     self.received_messages_content=[]
                     self.received_messages=[]
@@ -156,7 +158,7 @@ class TutorialAgent(ArtificialBrain):
             if Phase.INTRO1==self._phase:
                 self._sendMessage('Lets try out the controls first. You can move with the arrow keys. If you move down twice, you will notice that you can now no longer see me. \
                 So you can only see as far as 2 grid cells. Therefore, it is important to search the areas well. If you moved down twice, press the "Continue" button.','RescueBot')
-                if self.received_messages_content and self.received_messages_content[-1]=='Continue':
+                if self.last_received_kind()==MessageKind.CONTINUE:
                     self._phase=Phase.INTRO2
                     self.received_messages_content=[]
                     self.received_messages=[]
@@ -167,7 +169,7 @@ class TutorialAgent(ArtificialBrain):
                 self._sendMessage('Lets move to area 3 now. When you are going to search an area, it is recommended to inform me about this.  \
                 You can do this using the button "03". This way, we can collaborate more efficiently. \
                 If you pressed the button "03" and moved to the area entrance, press the "Continue" button.', 'RescueBot')
-                if self.received_messages_content and self.received_messages_content[-1]=='Continue':
+                if self.last_received_kind()==MessageKind.CONTINUE:
                     self._phase=Phase.INTRO3
                     self.received_messages_content=[]
                     self.received_messages=[]
@@ -180,7 +182,7 @@ class TutorialAgent(ArtificialBrain):
                 However, in all conditions the critically injured victims have to be carried together. \
                 So, let us carry critically injured elderly woman together! To do so, inform me that you found this victim by using the buttons below "I have found:" and selecting "critically injured elderly woman in 03". \
                 If you found critically injured elderly woman and informed me about it, press the "Continue" button. I will then come over to help.','RescueBot')
-                if self.received_messages_content and self.received_messages_content[-1]=='Continue':
+                if self.last_received_kind()==MessageKind.CONTINUE:
                     self._phase=Phase.FIND_NEXT_GOAL
                     self.received_messages_content=[]
                     self.received_messages=[]
@@ -193,7 +195,7 @@ class TutorialAgent(ArtificialBrain):
                 Transport ' + self._goalVic + ' to the drop zone and move yourself on top of the image of '+ self._goalVic + '. \
                 Next, press "S" on your keyboard to drop '+ self._goalVic + '. \
                 If you completed these steps, press the "Continue" button.','RescueBot')
-                if self.received_messages_content and self.received_messages_content[-1]=='Continue':
+                if self.last_received_kind()==MessageKind.CONTINUE:
                     self._phase=Phase.INTRO5
                     self.received_messages_content=[]
                     self.received_messages=[]
@@ -205,7 +207,7 @@ class TutorialAgent(ArtificialBrain):
                 If you are in front of area 5, you see that it is blocked by rock. This is one of the three obstacle types, and can only be removed together. \
                 So, let us remove rock together! To do so, inform me that you found this obstacle by using the button "Help remove" and selecting "at 05". \
                 I will then come over to help. If you informed me and I arrived at area 5 to help, press the "Continue" button.','RescueBot')
-                if self.received_messages_content and self.received_messages_content[-1]=='Continue':
+                if self.last_received_kind()==MessageKind.CONTINUE:
                     self._phase=Phase.INTRO6
                     self.received_messages_content=[]
                     self.received_messages=[]
@@ -215,7 +217,7 @@ class TutorialAgent(ArtificialBrain):
             if Phase.INTRO6==self._phase:
                 self._sendMessage('Let us remove rock together now! To do so, remain in front of rock and press "D" on your keyboard. \
                 Now, you will see a small busy icon untill rock is successfully removed. If the entrance is cleared, press the "Continue" button.','RescueBot')
-                if self.received_messages_content and self.received_messages_content[-1]=='Continue':
+                if self.last_received_kind()==MessageKind.CONTINUE:
                     self._phase=Phase.INTRO7
                     self.received_messages_content=[]
                     self.received_messages=[]
@@ -227,7 +229,7 @@ class TutorialAgent(ArtificialBrain):
                 If you are in front of area 4, you see that it is blocked by tree. This is another obstacle type, and tree can only be removed by me. \
                 So, let me remove tree for you! To do so, inform me that you need help with removing by using the button "Help remove" and selecting "at 04". \
                 I will then come over to remove tree for you.','RescueBot')
-                if self.received_messages_content and self.received_messages_content[-1]=='Continue':
+                if self.last_received_kind()==MessageKind.CONTINUE:
                     self._phase=Phase.INTRO8
                     self.received_messages_content=[]
                     self.received_messages=[]
@@ -244,7 +246,7 @@ class TutorialAgent(ArtificialBrain):
                 Now, press "Q" on your keyboard and transport mildly injured elderly man to the drop zone. \
                 Drop mildly injured elderly man by moving on top of the image and pressing "W" on your keyboard. \
                 If you completed these steps, press the "Continue" button.','RescueBot')
-                if self.received_messages_content and self.received_messages_content[-1]=='Continue':
+                if self.last_received_kind()==MessageKind.CONTINUE:
                     self._phase=Phase.INTRO9
                     self.received_messages_content=[]
                     self.received_messages=[]
@@ -259,7 +261,7 @@ class TutorialAgent(ArtificialBrain):
                 You can remove stones by pressing "E" on your keyboard. Now, you will see a small busy icon untill stones is successfully removed. \
                 When you are busy removing, you can send messages but they will only appear once the action is finished. \
                 So, no need to keep clicking buttons! If the entrance is cleared, press the "Continue" button.','RescueBot')
-                if self.received_messages_content and self.received_messages_content[-1]=='Continue':
+                if self.last_received_kind()==MessageKind.CONTINUE:
                     self._phase=Phase.INTRO10
                     self.received_messages_content=[]
                     self.received_messages=[]
@@ -268,7 +270,8 @@ class TutorialAgent(ArtificialBrain):
 
             if Phase.INTRO10==self._phase:
                 self._sendMessage('This concludes the tutorial! You can now start the real task.','RescueBot')
-                if self.received_messages_content and self.received_messages_content[-1]=='Found: critically injured girl in 5':
+                found = self.last_received()
+                if found and (found.kind, found.victim, found.area)==(MessageKind.FOUND, 'critically injured girl', 5):
                     self._phase=Phase.FIND_NEXT_GOAL
                     self.received_messages_content=[]
                     self.received_messages=[]
@@ -287,7 +290,7 @@ class TutorialAgent(ArtificialBrain):
                 zones = self._getDropZones(state)
                 # Identification of which victims still need to be rescued and on which location they should be dropped
                 for info in zones:
-                    if str(info['img_name'])[8:-4] not in self._collectedVictims:
+                    if not self._knowledge.is_collected(str(info['img_name'])[8:-4]):
                         remainingZones.append(info)
                         remainingVics.append(str(info['img_name'])[8:-4])
                         remaining[str(info['img_name'])[8:-4]] = info['location']
@@ -301,15 +304,15 @@ class TutorialAgent(ArtificialBrain):
                 # Check which victims can be rescued next because human or agent already found them
                 for vic in remainingVics:
                     # Define a previously found victim as target victim
-                    if vic in self._foundVictims and vic not in self._todo:
+                    if self._knowledge.is_found(vic) and not self._knowledge.in_todo(vic):
                         self._goalVic = vic
                         self._goalLoc = remaining[vic]
                         # Plan path to victim because the exact location is known (i.e., the agent found this victim)
-                        if 'location' in self._foundVictimLocs[vic].keys():
+                        if self._knowledge.knows_location(vic):
                             self._phase=Phase.PLAN_PATH_TO_VICTIM
                             return Idle.__name__,{'duration_in_ticks':25}  
                         # Plan path to area because the exact victim location is not known, only the area (i.e., human found this victim)
-                        if 'location' not in self._foundVictimLocs[vic].keys():
+                        if not self._knowledge.knows_location(vic):
                             self._phase=Phase.PLAN_PATH_TO_ROOM
                             return Idle.__name__,{'duration_in_ticks':25}     
                 # If there are no target victims found, visit an unsearched area to search for victims         
@@ -318,20 +321,20 @@ class TutorialAgent(ArtificialBrain):
             if Phase.PICK_UNSEARCHED_ROOM==self._phase:
                 agent_location = state[self.agent_id]['location']
                 # Identify which areas are not explored yet
-                unsearchedRooms=[room['room_name'] for room in state.values()
+                unsearchedRooms=[room['room_name'] for room in state.get_objects_of_type('Door')
                 if 'class_inheritance' in room
                 and 'Door' in room['class_inheritance']
-                and room['room_name'] not in self._searchedRooms
+                and not self._knowledge.is_searched(room['room_name'])
                 and room['room_name'] not in self._tosearch]
                 # If all areas have been searched but the task is not finished, start searching areas again
                 if self._remainingZones and len(unsearchedRooms) == 0:
                     self._tosearch = []
-                    self._todo = []
-                    self._searchedRooms = []
+                    self._knowledge.clear_todo()
+                    self._knowledge.clear_searched()
                     self._sendMessages = []
                     self.received_messages = []
                     self.received_messages_content = []
-                    self._searchedRooms.append(self._door['room_name'])
+                    self._knowledge.search(self._door['room_name'], AGENT)
                     self._sendMessage('Going to re-search all areas.','RescueBot')
                     self._phase = Phase.FIND_NEXT_GOAL
                 # If there are still areas to search, define which one to search next
@@ -357,9 +360,9 @@ class TutorialAgent(ArtificialBrain):
             if Phase.PLAN_PATH_TO_ROOM==self._phase:
                 self._navigator.reset_full()
                 # Switch to a different area when the human found a victim
-                if self._goalVic and self._goalVic in self._foundVictims and 'location' not in self._foundVictimLocs[self._goalVic].keys():
-                    self._door = state.get_room_doors(self._foundVictimLocs[self._goalVic]['room'])[0]
-                    self._doormat = state.get_room(self._foundVictimLocs[self._goalVic]['room'])[-1]['doormat']
+                if self._goalVic and self._knowledge.is_found(self._goalVic) and not self._knowledge.knows_location(self._goalVic):
+                    self._door = state.get_room_doors(self._knowledge.victim(self._goalVic).room)[0]
+                    self._doormat = state.get_room(self._knowledge.victim(self._goalVic).room)[-1]['doormat']
                     if self._door['room_name'] == 'area 1':
                         self._doormat = (3,5)
                     doorLoc = self._doormat
@@ -374,31 +377,31 @@ class TutorialAgent(ArtificialBrain):
 
             if Phase.FOLLOW_PATH_TO_ROOM==self._phase:
                 # Find the next victim to rescue if the previously identified target victim was rescued by the human
-                if self._goalVic and self._goalVic in self._collectedVictims:
+                if self._goalVic and self._knowledge.is_collected(self._goalVic):
                     self._currentDoor=None
                     self._phase=Phase.FIND_NEXT_GOAL
                 # Identify which area to move to because the human found the previously identified target victim
-                if self._goalVic and self._goalVic in self._foundVictims and self._door['room_name']!=self._foundVictimLocs[self._goalVic]['room']:
+                if self._goalVic and self._knowledge.is_found(self._goalVic) and self._door['room_name']!=self._knowledge.victim(self._goalVic).room:
                     self._currentDoor=None
                     self._phase=Phase.FIND_NEXT_GOAL
                 # Identify the next area to search if the human already searched the previously identified area
-                if self._door['room_name'] in self._searchedRooms and self._goalVic not in self._foundVictims:
+                if self._knowledge.is_searched(self._door['room_name']) and not self._knowledge.is_found(self._goalVic):
                     self._currentDoor=None
                     self._phase=Phase.FIND_NEXT_GOAL
                 # Otherwise move to the next area to search 
                 else:
                     self._state_tracker.update(state)
                     # Explain why the agent is moving to the specific area, either because it contains the current target victim or because it is the closest unsearched area
-                    if self._goalVic in self._foundVictims and str(self._door['room_name']) == self._foundVictimLocs[self._goalVic]['room'] and not self._remove:
+                    if self._knowledge.is_found(self._goalVic) and str(self._door['room_name']) == self._knowledge.victim(self._goalVic).room and not self._remove:
                         self._sendMessage('Moving to ' + str(self._door['room_name']) + ' to pick up ' + self._goalVic+'.', 'RescueBot')                 
-                    if self._goalVic not in self._foundVictims and not self._remove or not self._goalVic and not self._remove:
+                    if not self._knowledge.is_found(self._goalVic) and not self._remove or not self._goalVic and not self._remove:
                         self._sendMessage('Moving to ' + str(self._door['room_name']) + ' because it is the closest unsearched area.', 'RescueBot')                   
                     self._currentDoor=self._door['location']
                     # Retrieve move actions to execute
                     action = self._navigator.get_move_action(self._state_tracker)
                     if action!=None:
                         # Remove obstacles blocking the path to the area
-                        for info in state.values():
+                        for info in state.get_objects_of_type('ObstacleObject'):
                             if 'class_inheritance' in info and 'ObstacleObject' in info['class_inheritance'] and 'stone' in info['obj_id'] and info['location'] not in [(9,7),(9,19),(21,19)]:
                                 return RemoveObject.__name__,{'object_id':info['obj_id']}
                         return action,{}
@@ -409,11 +412,13 @@ class TutorialAgent(ArtificialBrain):
                 objects = []
                 agent_location = state[self.agent_id]['location']
                 # Identify which obstacle is blocking the entrance
-                for info in state.values():
+                for info in state.get_objects_of_type('ObstacleObject'):
+                    if 'class_inheritance' in info and 'ObstacleObject' in info['class_inheritance']:
+                        self._knowledge.add_obstacle(info['obj_id'], self._door['room_name'], AGENT, info['location'])
                     if 'class_inheritance' in info and 'ObstacleObject' in info['class_inheritance'] and 'rock' in info['obj_id']:
                         objects.append(info)
                         # Proceed when human is ready to continue
-                        if self._tutorial and self.received_messages_content and self.received_messages_content[-1]=='Continue':
+                        if self._tutorial and self.last_received_kind()==MessageKind.CONTINUE:
                             self._phase=Phase.INTRO6
                             self.received_messages_content=[]
                             self.received_messages=[]
@@ -427,6 +432,7 @@ class TutorialAgent(ArtificialBrain):
                         self.received_messages=[]
                         self._remove = False
                         self._phase=Phase.INTRO8
+                        self._knowledge.clear_obstacles(self._door['room_name'])
                         # Remove the obstacle when it is a tree
                         return RemoveObject.__name__,{'object_id':info['obj_id']}
 
@@ -435,7 +441,8 @@ class TutorialAgent(ArtificialBrain):
                         # Remain idle when the obstacle is a stone                    
                         return None, {}
                 # If no obstacles are blocking the entrance, enter the area
-                if len(objects)==0:                    
+                if len(objects)==0:
+                    self._knowledge.clear_obstacles(self._door['room_name'])
                     self._answered = False
                     self._remove = False
                     self._phase = Phase.ENTER_ROOM
@@ -443,15 +450,15 @@ class TutorialAgent(ArtificialBrain):
             if Phase.ENTER_ROOM==self._phase:
                 self._answered = False
                 # If the target victim is rescued by the human, identify the next victim to rescue
-                if self._goalVic in self._collectedVictims:
+                if self._knowledge.is_collected(self._goalVic):
                     self._currentDoor=None
                     self._phase=Phase.FIND_NEXT_GOAL
                 # If the target victim is found in a different area, start moving there
-                if self._goalVic in self._foundVictims and self._door['room_name']!=self._foundVictimLocs[self._goalVic]['room']:
+                if self._knowledge.is_found(self._goalVic) and self._door['room_name']!=self._knowledge.victim(self._goalVic).room:
                     self._currentDoor=None
                     self._phase=Phase.FIND_NEXT_GOAL
                 # If the human searched the same area, plan searching another area instead
-                if self._door['room_name'] in self._searchedRooms and self._goalVic not in self._foundVictims:
+                if self._knowledge.is_searched(self._door['room_name']) and not self._knowledge.is_found(self._goalVic):
                     self._currentDoor=None
                     self._phase=Phase.FIND_NEXT_GOAL
                 # Otherwise, enter the area and plan to search it
@@ -465,16 +472,12 @@ class TutorialAgent(ArtificialBrain):
             if Phase.PLAN_ROOM_SEARCH_PATH==self._phase:
                 self._agentLoc = int(self._door['room_name'].split()[-1])
                 # Store the locations of all area tiles 
-                roomTiles = [info['location'] for info in state.values()
-                    if 'class_inheritance' in info 
-                    and 'AreaTile' in info['class_inheritance']
-                    and 'room_name' in info
-                    and info['room_name'] == self._door['room_name']]
+                roomTiles = [info['location'] for info in state.get_room_tiles(self._door['room_name'])]
                 self._roomtiles=roomTiles   
                 # Make the plan for searching the area            
                 self._navigator.reset_full()
                 self._navigator.add_waypoints(self._efficientSearch(roomTiles))
-                self._roomVics=[]
+                self._roomVics=set()
                 self._phase=Phase.FOLLOW_ROOM_SEARCH_PATH
 
             if Phase.FOLLOW_ROOM_SEARCH_PATH==self._phase:
@@ -483,46 +486,43 @@ class TutorialAgent(ArtificialBrain):
                 action = self._navigator.get_move_action(self._state_tracker)
                 if action!=None:               
                     # Identify victims present in the area    
-                    for info in state.values():
+                    for info in state.get_objects_of_type('CollectableBlock'):
                         if 'class_inheritance' in info and 'CollectableBlock' in info['class_inheritance']:
                             vic = str(info['img_name'][8:-4])
                             # Remember which victim the agent found in this area
-                            if vic not in self._roomVics:
-                                self._roomVics.append(vic)
+                            self._roomVics.add(vic)
 
                             # Identify the exact location of the victim that was found by the human earlier
-                            if vic in self._foundVictims and 'location' not in self._foundVictimLocs[vic].keys():
-                                # Add the exact location to the corresponding dictionary
-                                self._foundVictimLocs[vic] = {'location':info['location'],'room':self._door['room_name'],'obj_id':info['obj_id']}
+                            if self._knowledge.is_found(vic) and not self._knowledge.knows_location(vic):
+                                # Add the exact location to the knowledge base
+                                self._knowledge.add_victim(vic, self._door['room_name'], AGENT, info['location'], info['obj_id'])
                                 if vic == self._goalVic:
                                     # Communicate which victim was found
                                     self._sendMessage('Found '+ vic + ' in ' + self._door['room_name'] + ' because you told me '+vic+ ' was located here.', 'RescueBot')
                                     # Add the area to the list with searched areas
-                                    self._searchedRooms.append(self._door['room_name'])
+                                    self._knowledge.search(self._door['room_name'], AGENT)
                                     # Do not continue searching the rest of the area but start planning to rescue the victim 
                                     self._phase=Phase.FIND_NEXT_GOAL
 
                             # Identify injured victims in the area
-                            if 'healthy' not in vic and vic not in self._foundVictims:
+                            if 'healthy' not in vic and not self._knowledge.is_found(vic):
                                 self._recentVic = vic
-                                # Add the victim and the location to the corresponding dictionary
-                                self._foundVictims.append(vic)
-                                self._foundVictimLocs[vic] = {'location':info['location'],'room':self._door['room_name'],'obj_id':info['obj_id']}
+                                # Add the victim and the location to the knowledge base
+                                self._knowledge.add_victim(vic, self._door['room_name'], AGENT, info['location'], info['obj_id'])
                     # Execute move actions to explore the area
                     return action,{}
 
                 # Communicate that the agent did not find the target victim in the area despite the human previously communicating that the victim was located here
-                if self._goalVic in self._foundVictims and self._goalVic not in self._roomVics and self._foundVictimLocs[self._goalVic]['room']==self._door['room_name']:
+                if self._knowledge.is_found(self._goalVic) and self._goalVic not in self._roomVics and self._knowledge.victim(self._goalVic).room==self._door['room_name']:
                     self._sendMessage(self._goalVic + ' not present in ' + str(self._door['room_name']) + ' because I searched the whole area without finding ' + self._goalVic+'.', 'RescueBot')
                     # Remove the victim location from memory
-                    self._foundVictimLocs.pop(self._goalVic, None)
-                    self._foundVictims.remove(self._goalVic)
-                    self._roomVics = []
+                    self._knowledge.forget_victim(self._goalVic)
+                    self._roomVics = set()
                     # Reset received messages (bug fix)
                     self.received_messages = []
                     self.received_messages_content = []
                 # Add the area to the list of searched areas and make a plan what to do next
-                self._searchedRooms.append(self._door['room_name'])
+                self._knowledge.search(self._door['room_name'], AGENT)
                 self._recentVic = None
                 self._phase=Phase.FIND_NEXT_GOAL
                 return Idle.__name__,{'duration_in_ticks':25}
@@ -530,15 +530,15 @@ class TutorialAgent(ArtificialBrain):
             if Phase.PLAN_PATH_TO_VICTIM==self._phase:
                 # Communicate which vctim the agent is going to pick up
                 if 'mild' in self._goalVic:
-                    self._sendMessage('Picking up ' + self._goalVic + ' in ' + self._foundVictimLocs[self._goalVic]['room'] + '.', 'RescueBot')
+                    self._sendMessage('Picking up ' + self._goalVic + ' in ' + self._knowledge.victim(self._goalVic).room + '.', 'RescueBot')
                 # Plan the path to the victim using its location
                 self._navigator.reset_full()
-                self._navigator.add_waypoints([self._foundVictimLocs[self._goalVic]['location']])
+                self._navigator.add_waypoints([self._knowledge.victim(self._goalVic).location])
                 self._phase=Phase.FOLLOW_PATH_TO_VICTIM
                     
             if Phase.FOLLOW_PATH_TO_VICTIM==self._phase:
                 # Start searching for other victims if the human already rescued the target victim
-                if self._goalVic and self._goalVic in self._collectedVictims:
+                if self._goalVic and self._knowledge.is_collected(self._goalVic):
                     self._phase=Phase.FIND_NEXT_GOAL
                 # Otherwise, move towards the location of the found victim
                 else:
@@ -551,23 +551,23 @@ class TutorialAgent(ArtificialBrain):
             if Phase.TAKE_VICTIM==self._phase:
                 objects=[]
                 # Notify the human when a critically injured victim needs to be carried together
-                for info in state.values():
+                for info in state.get_objects_of_type('CollectableBlock'):
                     if 'class_inheritance' in info and 'CollectableBlock' in info['class_inheritance'] and 'critical' in info['obj_id'] and info['location'] in self._roomtiles:
                         objects.append(info)
-                        self._collectedVictims.append(self._goalVic)
+                        self._knowledge.collect(self._goalVic, AGENT)
                         self._phase=Phase.INTRO4
                         # Remain idle until the human arrives
                         if not self._humanName in info['name']:
                             return None, {} 
                 # When a critically injured victim is picked up, start planning the path to the drop zone and add the victim to the list of rescued victims
                 if len(objects)==0 and 'critical' in self._goalVic:
-                    self._collectedVictims.append(self._goalVic)
+                    self._knowledge.collect(self._goalVic, AGENT)
                     self._phase = Phase.PLAN_PATH_TO_DROPPOINT
                 # When rescuing mildly injured victims, pick the victim up and plan the path to the drop zone
                 if 'mild' in self._goalVic:
                     self._phase=Phase.PLAN_PATH_TO_DROPPOINT
-                    self._collectedVictims.append(self._goalVic)
-                    return CarryObject.__name__,{'object_id':self._foundVictimLocs[self._goalVic]['obj_id'], 'human_name': self._humanName}                
+                    self._knowledge.collect(self._goalVic, AGENT)
+                    return CarryObject.__name__,{'object_id':self._knowledge.victim(self._goalVic).obj_id, 'human_name': self._humanName}                
 
             if Phase.PLAN_PATH_TO_DROPPOINT==self._phase:
                 self._navigator.reset_full()
@@ -616,69 +616,44 @@ class TutorialAgent(ArtificialBrain):
         process incoming messages received from the team members
         '''
         receivedMessages = {}
-        # Create a dictionary with a list of received messages from each team member
+        # Create a dictionary with a list of the received messages of each team member, read into TeamMessages
         for member in teamMembers:
             receivedMessages[member] = []
         for mssg in self.received_messages:
-            for member in teamMembers:
-                if mssg.from_id == member:
-                    receivedMessages[member].append(mssg.content) 
-        # Check the content of the received messages
+            if mssg.from_id in receivedMessages:
+                receivedMessages[mssg.from_id].append(read_message(mssg.content))
+        # Check the kind of the received messages
         for mssgs in receivedMessages.values():
             for msg in mssgs:
                 # If a received message involves team members searching areas, add these areas to the memory of areas that have been explored
-                if msg.startswith("Search:"):
-                    area = 'area '+ msg.split()[-1]
-                    if area not in self._searchedRooms:
-                        self._searchedRooms.append(area)
+                if msg.kind == MessageKind.SEARCH:
+                    self._knowledge.search(msg.room, HUMAN)
                 # If a received message involves team members finding victims, add these victims and their locations to memory
-                if msg.startswith("Found:"):
-                    # Identify which victim and area it concerns
-                    if len(msg.split()) == 6:
-                        foundVic = ' '.join(msg.split()[1:4])
-                    else:
-                        foundVic = ' '.join(msg.split()[1:5]) 
-                    loc = 'area '+ msg.split()[-1]
+                elif msg.kind == MessageKind.FOUND:
                     # Add the area to the memory of searched areas
-                    if loc not in self._searchedRooms:
-                        self._searchedRooms.append(loc)
+                    self._knowledge.search(msg.room, HUMAN)
                     # Add the victim and its location to memory
-                    if foundVic not in self._foundVictims:
-                        self._foundVictims.append(foundVic)
-                        self._foundVictimLocs[foundVic] = {'room':loc}
-                    if foundVic in self._foundVictims and self._foundVictimLocs[foundVic]['room'] != loc:
-                        self._foundVictimLocs[foundVic] = {'room':loc}
+                    self._knowledge.report_victim(msg.victim, msg.room)
                     # Add the found mildly injured victim to the to do list
-                    if 'mild' in foundVic:
-                        self._todo.append(foundVic)
+                    if 'mild' in msg.victim:
+                        self._knowledge.add_todo(msg.victim)
                 # If a received message involves team members rescuing victims, add these victims and their locations to memory
-                if msg.startswith('Collect:'):
-                    # Identify which victim and area it concerns
-                    if len(msg.split()) == 6:
-                        collectVic = ' '.join(msg.split()[1:4])
-                    else:
-                        collectVic = ' '.join(msg.split()[1:5]) 
-                    loc = 'area ' + msg.split()[-1]
+                elif msg.kind == MessageKind.COLLECT:
                     # Add the area to the memory of searched areas 
-                    if loc not in self._searchedRooms:
-                        self._searchedRooms.append(loc)
+                    self._knowledge.search(msg.room, HUMAN)
                     # Add the victim and location to the memory of found victims
-                    if collectVic not in self._foundVictims:
-                        self._foundVictims.append(collectVic)
-                        self._foundVictimLocs[collectVic] = {'room':loc}
-                    if collectVic in self._foundVictims and self._foundVictimLocs[collectVic]['room'] != loc:
-                        self._foundVictimLocs[collectVic] = {'room':loc}
+                    self._knowledge.report_victim(msg.victim, msg.room)
                     # Add the victim to the memory of rescued victims 
-                    if collectVic not in self._collectedVictims:
-                        self._collectedVictims.append(collectVic)
+                    self._knowledge.collect(msg.victim, HUMAN)
                 # If a received message involves team members asking for help with removing obstacles, add their location to memory and come over
-                if msg.startswith('Remove:'):
+                elif msg.kind == MessageKind.REMOVE_AT:
                     # Identify at which location the human needs help
-                    area = 'area ' + msg.split()[-1]
+                    area = msg.room
                     self._door = state.get_room_doors(area)[0]
                     self._doormat = state.get_room(area)[-1]['doormat']
-                    if area in self._searchedRooms:
-                        self._searchedRooms.remove(area)
+                    self._knowledge.unsearch(area)
+                    # The human reported an obstacle blocking the area
+                    self._knowledge.add_obstacle(None, area, HUMAN)
                     # Clear received messages (bug fix)
                     self.received_messages = []
                     self.received_messages_content = []
@@ -688,15 +663,15 @@ class TutorialAgent(ArtificialBrain):
                     # Plan the path to the relevant area
                     self._phase = Phase.PLAN_PATH_TO_ROOM
             # Store the current location of the human in memory
-            if mssgs and mssgs[-1].split()[-1] in ['1','2','3','4','5','6','7','8','9','10','11','12','13','14']:
-                self._humanLoc = int(mssgs[-1].split()[-1])
+            if mssgs and mssgs[-1].area in range(1, 15):
+                self._humanLoc = mssgs[-1].area
 
     def _sendMessage(self, mssg, sender):
         '''
         send messages from agent to other team members
         '''
         msg = Message(content=mssg, from_id=sender)
-        if msg.content not in self.received_messages_content and 'score' not in msg.content:
+        if not self.has_received(msg.content) and 'score' not in msg.content:
             self.send_message(msg)
             self._sendMessages.append(msg.content)
         # Sending the hidden score message (DO NOT REMOVE)
@@ -0,0 +1,122 @@
+import os, sys
+import csv
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from loggers.OutputLogger import summarize_action_log
+
+'''
+Computes the metrics of every run in a logs folder, including the runs of headless sessions and sweeps, and writes them
+to one table. The table also serves as a cache: runs of which the action log did not change since the previous analysis
+(same modification time and size) are not read again, so re-running after new sessions only processes the new runs.
+
+Example: python analyze_logs.py --logs logs --workers 8
+'''
+
+results_header = ['run_folder', 'condition', 'action_file', 'mtime', 'size', 'completeness', 'score', 'no_ticks',
+                  'agent_actions', 'human_actions', 'agent_idle_ratio', 'human_idle_ratio', 'rescue_ticks']
+
+
+def find_action_logs(log_folder):
+    '''
+    @return the action log of every run in the log folder, for chunked '.npz' logs the first chunk
+    '''
+    action_files = []
+    for path, folders, files in os.walk(log_folder):
+        if os.path.basename(path) != 'world_1':
+            continue
+        logs = sorted(file for file in files if file.startswith('actions_'))
+        if logs:
+            action_files.append(os.path.join(path, logs[0]))
+    return sorted(action_files)
+
+
+def _log_files(action_file):
+    # A chunked '.npz' log consists of all chunks with the same prefix
+    if action_file.endswith('.npz'):
+        prefix = action_file[:-len('_00000.npz')]
+        folder = os.path.dirname(action_file)
+        return [os.path.join(folder, file) for file in os.listdir(folder)
+                if os.path.join(folder, file).startswith(prefix) and file.endswith('.npz')]
+    return [action_file]
+
+
+def log_version(action_file):
+    '''
+    @return the modification time and size of an action log, used to find out if it changed since the last analysis
+    '''
+    stats = [os.stat(file) for file in _log_files(action_file)]
+    return str(max(stat.st_mtime_ns for stat in stats)), str(sum(stat.st_size for stat in stats))
+
+
+def analyze_run(action_file):
+    '''
+    @return dictionary with the metrics of the run of the action log
+    '''
+    run_folder = os.path.dirname(os.path.dirname(action_file))
+    name = os.path.basename(run_folder)
+    mtime, size = log_version(action_file)
+    result = {'run_folder': run_folder, 'action_file': action_file, 'mtime': mtime, 'size': size,
+              'condition': name.split('_')[1] if name.startswith('exp_') else ''}
+    summary = summarize_action_log(action_file)
+    if summary is None:
+        return result
+    result.update({'completeness': summary['last']['completeness'], 'score': summary['last']['score'],
+                   'no_ticks': summary['last']['tick_nr'], 'agent_actions': len(summary['agent_actions']),
+                   'human_actions': len(summary['human_actions']),
+                   'agent_idle_ratio': summary['agent_idle'] / summary['rows'],
+                   'human_idle_ratio': summary['human_idle'] / summary['rows'],
+                   'rescue_ticks': ' '.join(str(tick) for tick in summary['rescue_ticks'])})
+    return result
+
+
+def _read_results(results_file):
+    results = {}
+    if os.path.isfile(results_file):
+        with open(results_file, newline='') as csv_file:
+            reader = csv.DictReader(csv_file, delimiter=';', quotechar='"')
+            if reader.fieldnames == results_header:
+                for row in reader:
+                    results[row['action_file']] = row
+    return results
+
+
+def analyze_logs(log_folder='logs', results_file=None, workers=None):
+    '''
+    Computes the metrics of all runs in the log folder over a pool of workers, and reuses the metrics of unchanged runs.
+    @param results_file the table with the metrics, by default 'analytics.csv' in the log folder
+    @return the path of the results table, the list of results and the number of runs that were analyzed
+    '''
+    results_file = os.path.join(log_folder, 'analytics.csv') if results_file is None else results_file
+    cached = _read_results(results_file)
+    results = {}
+    new_files = []
+    for action_file in find_action_logs(log_folder):
+        previous = cached.get(action_file)
+        if previous is not None and (previous['mtime'], previous['size']) == log_version(action_file):
+            results[action_file] = previous
+        else:
+            new_files.append(action_file)
+    if new_files:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(analyze_run, new_files, chunksize=max(1, len(new_files) // 64)):
+                results[result['action_file']] = result
+    results = [results[action_file] for action_file in sorted(results)]
+    with open(results_file, mode='w', newline='') as csv_file:
+        csv_writer = csv.writer(csv_file, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        csv_writer.writerow(results_header)
+        for result in results:
+            csv_writer.writerow([result.get(key, '') for key in results_header])
+    return results_file, results, len(new_files)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute the metrics of all runs in a logs folder.")
+    parser.add_argument('--logs', default='logs', help="folder with the logs of the runs")
+    parser.add_argument('--results', default=None, help="table with the metrics, by default analytics.csv in the logs folder")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes, by default the number of cores")
+    args = parser.parse_args()
+
+    results_file, results, analyzed = analyze_logs(log_folder=args.logs, results_file=args.results, workers=args.workers)
+    print("Metrics of {} runs ({} analyzed, {} from cache) saved in {}".format(
+        len(results), analyzed, len(results) - analyzed, results_file))
+    sys.exit(0)
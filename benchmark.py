@@ -0,0 +1,307 @@
+import os, sys
+import copy
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import warnings
+import numpy as np
+
+'''
+Benchmarks the parts of the task that determine how fast it runs: building the tutorial and official worlds, the
+decisions of RescueBot in each phase, the completion check of the goal, the grab and drop checks of the custom
+actions, and the ticks per second of a full headless session with a scripted human. All benchmarks use a fixed seed
+and run in a temporary folder with a copy of the beliefs, so they do not change the beliefs or logs of this repository.
+The results are saved as JSON and compared against a baseline, a benchmark that got slower than the threshold
+(a fraction of the baseline value) is reported as a regression and makes the script exit with status 1.
+
+With --scaling the same is measured on maps generated with worlds1/MapGenerator.py with the given numbers of rooms, to
+see how building, the agent, the goal and the logging scale with the size of the world.
+
+No baseline is stored in the repository, because the timings depend on the machine: store one with --save-baseline
+on the machine that runs the benchmarks, before the first comparison. Without a baseline the script stops with status 2
+instead of passing without comparing.
+
+Example: python benchmark.py --save-baseline (once), then python benchmark.py after a change
+Example: python benchmark.py --scaling 14 56 140 --output scaling.json
+'''
+
+# Default location of the stored baseline and of new results
+benchmark_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+default_baseline = os.path.join(benchmark_folder, 'baseline.json')
+# Phases of the BaselineAgent that it never enters, so there are no decisions in them to benchmark
+unused_phases = ['WAIT_FOR_HUMAN', 'WAIT_AT_ZONE', 'FIX_ORDER_GRAB', 'FIX_ORDER_DROP']
+
+
+def _timings(func, repeats, setup=None):
+    # Wall time of each call of func, the optional setup is called before every call and not timed
+    times = []
+    for _ in range(repeats):
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _result(times, unit='s', higher_is_better=False):
+    times = np.asarray(times, dtype=float)
+    return {'value': float(np.median(times)), 'min': float(times.min()), 'p95': float(np.percentile(times, 95)),
+            'samples': int(len(times)), 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def _official_world(folder, max_ticks, seed, agent_class=None):
+    from worlds1.WorldBuilder import create_builder
+    from brains1.ScriptedHumanBrain import ScriptedHumanBrain, ResponsivePolicy
+    builder = create_builder(task_type='official', condition='normal', name='scripted', folder=folder, headless=True,
+                             max_nr_ticks=max_ticks, agent_class=agent_class, human_class=ScriptedHumanBrain,
+                             human_kwargs={'policy': ResponsivePolicy()}, log_folder=os.path.join(folder, 'logs'),
+                             seed=seed)
+    return builder, builder.get_world()
+
+
+def bench_build(folder, repeats, seed):
+    '''
+    @return the time of create_builder and get_world for the tutorial and the official world
+    '''
+    from worlds1.WorldBuilder import create_builder
+    results = {}
+    for task_type, condition in [('tutorial', 'tutorial'), ('official', 'normal')]:
+        def build():
+            builder = create_builder(task_type=task_type, condition=condition, name='scripted', folder=folder,
+                                     headless=True, log_folder=os.path.join(folder, 'logs'), seed=seed)
+            builder.get_world()
+        results['build.' + task_type] = _result(_timings(build, repeats))
+    return results
+
+
+def bench_decide_on_actions(folder, record_ticks, states_per_phase, repeats, seed):
+    '''
+    Records the agent and its state at decisions in every phase of a headless session, and times decide_on_actions on
+    copies of those recordings. A decision often passes through several phases (e.g. FIND_NEXT_GOAL, PLAN_PATH_TO_ROOM
+    and FOLLOW_PATH_TO_ROOM), it is recorded for every phase it passes through. The session stops when every phase has
+    states_per_phase recordings, or after record_ticks ticks.
+    @return the time per call of decide_on_actions per phase
+    @raise RuntimeError when a phase that the agent enters was not recorded, except the unused_phases
+    '''
+    from agents1.OfficialAgent import BaselineAgent, Phase
+    phases = [phase.name for phase in Phase if phase.name not in unused_phases]
+    recordings = {phase: [] for phase in phases}
+    shared = {}
+
+    class PhaseRecordingAgent(BaselineAgent):
+        # The BaselineAgent, which records the phases its decisions pass through
+        @property
+        def _phase(self):
+            return self.__dict__['_phase']
+
+        @_phase.setter
+        def _phase(self, phase):
+            self.__dict__['_phase'] = phase
+            self.__dict__.setdefault('_recorded_phases', set()).add(phase.name)
+
+        def decide_on_actions(self, state):
+            if self._navigation is None or all(len(recordings[phase]) >= states_per_phase for phase in phases):
+                return super().decide_on_actions(state)
+            # The world, the navigation graph and the trust belief store are shared by the copies instead of copied
+            for obj in [world, self._navigation, self._trust_beliefs]:
+                shared[id(obj)] = obj
+            brain, state_copy = copy.deepcopy((self, state), dict(shared))
+            brain.__class__ = BaselineAgent
+            del brain.__dict__['_recorded_phases']
+            self._recorded_phases = {self._phase.name}
+            action = super().decide_on_actions(state)
+            for phase in self._recorded_phases:
+                if phase in recordings and len(recordings[phase]) < states_per_phase:
+                    recordings[phase].append((brain, state_copy))
+            return action
+
+    builder, world = _official_world(folder, record_ticks, seed, agent_class=PhaseRecordingAgent)
+    world.initialize(builder.api_info)
+    is_done = False
+    while not is_done and any(len(recordings[phase]) < states_per_phase for phase in phases):
+        is_done, _ = world._GridWorld__step()
+    missing = [phase for phase in phases if not recordings[phase]]
+    if missing:
+        raise RuntimeError("No decisions in the phases {} in {} ticks".format(missing, world.current_nr_ticks))
+    results = {}
+    for phase in phases:
+        times = []
+        for recording_copy in recordings[phase]:
+            times += _timings(lambda brain, state: brain.decide_on_actions(state), repeats,
+                              setup=lambda: copy.deepcopy(recording_copy, dict(shared)))
+        results['decide_on_actions.' + phase] = _result(times)
+    return results
+
+
+def bench_goal_and_actions(folder, repeats, seed):
+    '''
+    @return the time of a first (full) and a repeated CollectionGoal.progress, and of _is_possible_grab and
+    _find_drop_loc for RescueBot standing on a victim
+    '''
+    from worlds1.WorldBuilder import CollectionGoal
+    from actions1.CustomActions import _is_possible_grab, _find_drop_loc
+    builder, world = _official_world(folder, 1, seed)
+    world.initialize(builder.api_info)
+    results = {'goal.progress_full': _result(_timings(lambda goal: goal.progress(world), repeats,
+                                                      setup=lambda: (CollectionGoal(max_nr_ticks=np.inf),))),
+               'goal.progress_repeated': _result(_timings(lambda: world.simulation_goal.progress(world), repeats))}
+    victim = next(obj for obj in world.environment_objects.values()
+                  if 'CollectableBlock' in obj.class_inheritance and not obj.properties.get('is_goal_block'))
+    agent = world.registered_agents['rescuebot']
+    agent.location = victim.location
+    world._GridWorld__update_grid()
+    results['actions.is_possible_grab'] = _result(_timings(
+        lambda: _is_possible_grab(world, agent.obj_id, victim.obj_id, grab_range=1, max_objects=1), repeats))
+    results['actions.find_drop_loc'] = _result(_timings(
+        lambda: _find_drop_loc(world, agent, victim, drop_range=np.inf, start_loc=tuple(agent.location)), repeats))
+    return results
+
+
+def bench_episode(folder, ticks, repeats, seed):
+    '''
+    @return the ticks per second of a headless session with a scripted human
+    '''
+    from headless import run_headless
+    rates = [run_headless(folder=folder, max_ticks=ticks, log_folder=os.path.join(folder, 'logs'),
+                          seed=seed)['ticks_per_second'] for _ in range(repeats)]
+    return {'episode.ticks_per_second': _result(rates, unit='ticks/s', higher_is_better=True)}
+
+
+def bench_scaling(folder, room_counts, ticks, seed):
+    '''
+    Generates a map for every number of rooms, with two victims per room, and runs a profiled headless session on it.
+    @return per number of rooms the time of create_builder and get_world, the ticks per second of the session and the
+    median time per tick of every profiled stage
+    '''
+    from worlds1.WorldBuilder import create_builder
+    from worlds1.MapGenerator import generate_scenario_file
+    from headless import run_headless
+    results = {}
+    for nr_rooms in room_counts:
+        scenario = generate_scenario_file(os.path.join(folder, 'map_{}.json'.format(nr_rooms)), nr_rooms=nr_rooms,
+                                          nr_victims=max(2 * nr_rooms, 8), seed=seed)
+        name = 'scaling.rooms_{}.'.format(nr_rooms)
+
+        def build():
+            builder = create_builder(task_type='official', condition='normal', name='scripted', folder=folder,
+                                     headless=True, log_folder=os.path.join(folder, 'logs'), seed=seed,
+                                     scenario=scenario)
+            builder.get_world()
+        results[name + 'build'] = _result(_timings(build, 1))
+        summary = run_headless(folder=folder, max_ticks=ticks, log_folder=os.path.join(folder, 'logs'), seed=seed,
+                               scenario=scenario, profile=os.path.join(folder, 'profile_{}.csv'.format(nr_rooms)))
+        results[name + 'ticks_per_second'] = _result([summary['ticks_per_second']], unit='ticks/s',
+                                                     higher_is_better=True)
+        for stage, values in summary['profile'].items():
+            results[name + stage] = _result([values['p50'] / 1000])
+    return results
+
+
+def run_benchmarks(repeats=20, episode_ticks=500, episode_repeats=3, record_ticks=3000, states_per_phase=5, seed=1,
+                   scaling=None):
+    '''
+    Runs all benchmarks in a temporary folder with a copy of the beliefs of this repository.
+    @param scaling list of numbers of rooms of the generated maps to run the scaling benchmark on, instead of the other
+    benchmarks
+    @return dictionary with information about the machine and the results per benchmark
+    '''
+    root = os.path.dirname(os.path.abspath(__file__))
+    folder = tempfile.mkdtemp(prefix='benchmark_')
+    shutil.copytree(os.path.join(root, 'beliefs'), os.path.join(folder, 'beliefs'))
+    cwd = os.getcwd()
+    os.chdir(folder)
+    results = {}
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            if scaling:
+                results.update(bench_scaling(folder, scaling, episode_ticks, seed))
+            else:
+                results.update(bench_build(folder, max(1, repeats // 4), seed))
+                results.update(bench_goal_and_actions(folder, repeats * 50, seed))
+                results.update(bench_decide_on_actions(folder, record_ticks, states_per_phase, repeats, seed))
+                results.update(bench_episode(folder, episode_ticks, episode_repeats, seed))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(folder, ignore_errors=True)
+    return {'date': time.strftime("%Y-%m-%d %H:%M:%S"), 'python': platform.python_version(),
+            'machine': platform.platform(), 'processor': platform.processor(), 'seed': seed, 'results': results}
+
+
+def compare(results, baseline, threshold=0.2):
+    '''
+    @param threshold the fraction a benchmark may get slower than its baseline value before it counts as a regression
+    @return list of (name, baseline value, value, relative change) of all benchmarks in both, and the list of names of
+    the regressions; a positive relative change means slower
+    '''
+    comparisons = []
+    regressions = []
+    for name, result in sorted(results['results'].items()):
+        base = baseline['results'].get(name)
+        if base is None or base['value'] == 0:
+            continue
+        change = (result['value'] - base['value']) / base['value']
+        if result['higher_is_better']:
+            change = -change
+        comparisons.append((name, base['value'], result['value'], change))
+        if change > threshold:
+            regressions.append(name)
+    return comparisons, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark world building, agent decisions, goal checks and sessions.")
+    parser.add_argument('--repeats', type=int, default=20, help="number of timed calls per recorded state and benchmark")
+    parser.add_argument('--episode-ticks', type=int, default=500, help="ticks of each headless session")
+    parser.add_argument('--episode-repeats', type=int, default=3, help="number of headless sessions")
+    parser.add_argument('--record-ticks', type=int, default=3000,
+                        help="maximum ticks of the session that records agent states in every phase")
+    parser.add_argument('--seed', type=int, default=1, help="random seed of the worlds")
+    parser.add_argument('--output', default=None, help="results file, by default a new file in the benchmarks folder")
+    parser.add_argument('--baseline', default=None,
+                        help="baseline to compare the results against, by default benchmarks/baseline.json (not with "
+                             "--scaling)")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="fraction a benchmark may get slower than the baseline before it counts as a regression")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as the new baseline")
+    parser.add_argument('--scaling', nargs='+', type=int, default=None,
+                        help="instead of the other benchmarks, profile sessions of --episode-ticks ticks on generated "
+                             "maps with these numbers of rooms")
+    args = parser.parse_args()
+    baseline_file = args.baseline or (None if args.scaling else default_baseline)
+    if args.save_baseline:
+        baseline_file = baseline_file or default_baseline
+    elif baseline_file is not None and not os.path.isfile(baseline_file):
+        # Without a baseline nothing is compared, which must not pass as a run without regressions
+        parser.error("there is no baseline " + baseline_file + ", store one on this machine first with --save-baseline")
+
+    results = run_benchmarks(repeats=args.repeats, episode_ticks=args.episode_ticks,
+                             episode_repeats=args.episode_repeats, record_ticks=args.record_ticks, seed=args.seed,
+                             scaling=args.scaling)
+    output = args.output or os.path.join(benchmark_folder, 'results_' + time.strftime("%Y-%m-%d_%H%M%S") + '.json')
+    for file_name in [output] + ([baseline_file] if args.save_baseline else []):
+        if os.path.dirname(file_name):
+            os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        with open(file_name, mode='w') as json_file:
+            json.dump(results, json_file, indent=2)
+    print("Results saved in " + output)
+
+    regressions = []
+    if not args.save_baseline and baseline_file is not None:
+        with open(baseline_file) as json_file:
+            baseline = json.load(json_file)
+        comparisons, regressions = compare(results, baseline, args.threshold)
+        if not comparisons:
+            print("None of the benchmarks are in the baseline " + baseline_file, file=sys.stderr)
+            sys.exit(1)
+        print('{:<48}{:>14}{:>14}{:>10}'.format('benchmark', 'baseline', 'now', 'change'))
+        for name, base_value, value, change in comparisons:
+            print('{:<48}{:>14.6g}{:>14.6g}{:>+9.1f}%{}'.format(name, base_value, value, change * 100,
+                                                             '  REGRESSION' if name in regressions else ''))
+    else:
+        for name, result in sorted(results['results'].items()):
+            print('{:<48}{:>14.6g} {}'.format(name, result['value'], result['unit']))
+    sys.exit(1 if regressions else 0)
@@ -3,6 +3,9 @@ import warnings
 import numpy as np
 from abc import  ABC, abstractmethod
 from actions1.CustomActions import RemoveObjectTogether
+from brains1.WaterTiles import water_locations, slowed_by_water
+from brains1.IndexedState import IndexedState
+from brains1.MessageProtocol import read_message
 from matrx.agents.agent_utils.state import State
 from matrx.agents.agent_brain import AgentBrain
 from matrx.agents.agent_brain import AgentBrain
@@ -599,8 +602,8 @@ class ArtificialAgentBrain(AgentBrain):
 
 
     def _init_state(self):
-        self._state = State(memorize_for_ticks=self.memorize_for_ticks,
-                            own_id=self.agent_id)
+        self._state = IndexedState(memorize_for_ticks=self.memorize_for_ticks,
+                                   own_id=self.agent_id)
 
     @staticmethod
     def __check_message(mssg, this_agent_id):
@@ -626,6 +629,9 @@ class ArtificialBrain(ArtificialAgentBrain, ABC):
         self.__condition = condition
         self.__name = name
         self.__folder = folder
+        self.__water = None
+        # Set of the received text messages, with the list of received contents it was built from and its length then
+        self.__received_texts = None
         super().__init__()
     
     def decide_on_action(self, state:State):
@@ -635,14 +641,11 @@ class ArtificialBrain(ArtificialAgentBrain, ABC):
         act,params = self.decide_on_actions(state)
         params['grab_range']=1
         params['max_objects']=1
-        # find state locations with water
-        water_locs = []
-        if state[{"name": "water"}]:
-            for water in state[{"name": "water"}]:
-                if water['location'] not in water_locs:
-                    water_locs.append(water['location'])
-        # remove doormat from water_locs
-        if state[{"name": "RescueBot"}]['location'] in water_locs and state[{"name": "RescueBot"}]['location'] not in [(3,5),(9,5),(15,5),(21,5),(3,6),(9,6),(15,6),(3,17),(9,17),(15,17),(3,18),(9,18),(15,18),(21,18)]:
+        # water tiles never move, so find their locations only once
+        if self.__water is None:
+            self.__water = water_locations(state)
+        # moving through water is slower, except on the doormats
+        if slowed_by_water(state[self.agent_id]['location'], self.__water):
             params['action_duration'] = 13
         else:
             params['action_duration'] = self.__slowdown
@@ -684,4 +687,34 @@ class ArtificialBrain(ArtificialAgentBrain, ABC):
         is used if you provide a value <1.
         '''
         pass
+
+    def has_received(self, content):
+        '''
+        @return whether a text message with this content is among the received messages, in constant time. The set of
+        received texts is extended with the newly received contents, and built again when received_messages_content was
+        replaced by another (e.g. emptied) list.
+        '''
+        contents = self.received_messages_content
+        if self.__received_texts is None or self.__received_texts[0] is not contents \
+                or self.__received_texts[1] > len(contents):
+            self.__received_texts = (contents, 0, set())
+        _, nr_indexed, texts = self.__received_texts
+        texts.update(text for text in contents[nr_indexed:] if isinstance(text, str))
+        self.__received_texts = (contents, len(contents), texts)
+        return content in texts
+
+    def last_received(self):
+        '''
+        @return the TeamMessage (see brains1/MessageProtocol.py) of the last received message, or None
+        '''
+        if not self.received_messages_content:
+            return None
+        return read_message(self.received_messages_content[-1])
+
+    def last_received_kind(self):
+        '''
+        @return the MessageKind of the last received message, or None when no messages were received
+        '''
+        message = self.last_received()
+        return None if message is None else message.kind
     
\ No newline at end of file
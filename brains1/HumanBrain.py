@@ -9,6 +9,7 @@ from matrx.agents import HumanAgentBrain
 from matrx.messages import Message
 from matrx.actions.move_actions import MoveNorth, MoveNorthEast, MoveEast, MoveSouthEast, MoveSouth, MoveSouthWest, MoveWest, MoveNorthWest
 from actions1.CustomActions import RemoveObjectTogether, Idle, CarryObject, CarryObjectTogether, DropObjectTogether, Drop, RemoveObject
+from brains1.WaterTiles import water_locations, slowed_by_water
 
 class HumanBrain(HumanAgentBrain):
     """ Creates an Human Agent which is an agent that can be controlled by a human.
@@ -27,6 +28,7 @@ class HumanBrain(HumanAgentBrain):
         self.__remove_range = remove_range
         self.__strength = strength
         self.__name = name
+        self.__water = None
 
     def _factory_initialise(self, agent_name, agent_id, action_set,
                             sense_capability, agent_properties,
@@ -342,12 +344,10 @@ class HumanBrain(HumanAgentBrain):
                     self.rnd_gen.choice(doors_in_range)
 
         elif action in [MoveNorth.__name__, MoveNorthEast.__name__, MoveEast.__name__, MoveSouthEast.__name__, MoveSouth.__name__, MoveSouthWest.__name__, MoveWest.__name__, MoveNorthWest.__name__]:
-            water_locs = []
-            if state[{"name": "water"}]:
-                for water in state[{"name": "water"}]:
-                    if water['location'] not in water_locs:
-                        water_locs.append(water['location'])
-            if state[{"name": self.__name}]['location'] in water_locs and state[{"name": self.__name}]['location'] not in [(3,5),(9,5),(15,5),(21,5),(3,6),(9,6),(15,6),(3,17),(9,17),(15,17),(3,18),(9,18),(15,18),(21,18)]:
+            # water tiles never move, so find their locations only once
+            if self.__water is None:
+                self.__water = water_locations(state)
+            if slowed_by_water(state[self.agent_id]['location'], self.__water):
                 action == Idle.__name__
                 action_kwargs['duration_in_ticks'] = 5
 
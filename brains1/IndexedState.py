@@ -0,0 +1,125 @@
+from collections.abc import Iterable
+from matrx.agents.agent_utils.state import State
+
+
+class IndexedState(State):
+    '''
+    State of an agent with secondary indexes on the perceived objects: by class, by room and by property. The indexes
+    are built on the first query after each state update, with one pass over the objects per index, after which the
+    queries of the agents only visit the objects they ask for instead of all objects in the state.
+    Queries return the same objects in the same order as the State, so an agent gets the same answers with both.
+    '''
+    def __init__(self, own_id, memorize_for_ticks=None):
+        super().__init__(own_id=own_id, memorize_for_ticks=memorize_for_ticks)
+        self._clear_indexes()
+
+    def _clear_indexes(self):
+        # Objects per class in their 'class_inheritance', objects per room name, and objects per property name
+        self._classes = None
+        self._rooms = None
+        self._properties = {}
+        self._property_values = {}
+
+    def state_update(self, state_dict):
+        super().state_update(state_dict)
+        self._clear_indexes()
+        return self
+
+    def __delitem__(self, key):
+        self._clear_indexes()
+        super().__delitem__(key)
+
+    def pop(self, obj_id):
+        self._clear_indexes()
+        return super().pop(obj_id)
+
+    def remove(self, obj_id):
+        self._clear_indexes()
+        super().remove(obj_id)
+
+    def _add_world_info(self, world_info_dict):
+        self._clear_indexes()
+        super()._add_world_info(world_info_dict)
+
+    def __getitem__(self, key):
+        # Object IDs and queries for one boolean property value, e.g. {'is_human_agent': True}, use the indexes
+        if isinstance(key, str) and key in self.as_dict():
+            return self.as_dict()[key]
+        if isinstance(key, dict) and len(key) == 1:
+            prop_name, prop_value = next(iter(key.items()))
+            if isinstance(prop_value, bool):
+                found = self._with_property_value(prop_name, prop_value)
+                if not found:
+                    return None
+                return found[0] if len(found) == 1 else list(found)
+        return super().__getitem__(key)
+
+    def keys(self):
+        return self.as_dict().keys()
+
+    def values(self):
+        return self.as_dict().values()
+
+    def items(self):
+        return self.as_dict().items()
+
+    def get_objects_of_type(self, class_name):
+        '''
+        @return new list of all objects with the class in their 'class_inheritance', empty when there are none
+        '''
+        if self._classes is None:
+            self._classes = {}
+            for obj in self.as_dict().values():
+                for name in obj.get('class_inheritance', ()):
+                    self._classes.setdefault(name, []).append(obj)
+        return list(self._classes.get(class_name, ()))
+
+    def get_objects_with_property(self, prop_name):
+        '''
+        @return new list of all objects that have the property, empty when there are none
+        '''
+        if prop_name not in self._properties:
+            self._properties[prop_name] = [obj for obj in self.as_dict().values() if prop_name in obj]
+        return list(self._properties[prop_name])
+
+    def get_of_type(self, obj_type):
+        return self.get_objects_of_type(obj_type) or None
+
+    def get_room(self, room_name):
+        # Like the State, objects of which the room name contains room_name match as well (e.g. 'area 1' and 'area 10')
+        rooms = self._room_index()
+        names = [name for name in rooms if room_name == name or isinstance(name, Iterable) and room_name in name]
+        if not names:
+            return None
+        if len(names) == 1:
+            return [obj for _, obj in rooms[names[0]]]
+        return [obj for _, obj in sorted((entry for name in names for entry in rooms[name]), key=lambda entry: entry[0])]
+
+    def get_room_doors(self, room_name):
+        rooms = self._room_index()
+        if not any(room_name == name or isinstance(name, Iterable) and room_name in name for name in rooms):
+            return None
+        return [obj for _, obj in rooms.get(room_name, []) if 'Door' in obj.get('class_inheritance', ())]
+
+    def get_room_tiles(self, room_name):
+        '''
+        @return list of the area tiles of the room with exactly this name, empty when there are none
+        '''
+        return [obj for _, obj in self._room_index().get(room_name, []) if 'AreaTile' in obj.get('class_inheritance', ())]
+
+    def _room_index(self):
+        # Objects per room name, with their position in the state to merge rooms in state order
+        if self._rooms is None:
+            self._rooms = {}
+            for position, obj in enumerate(self.as_dict().values()):
+                if 'room_name' in obj:
+                    self._rooms.setdefault(obj['room_name'], []).append((position, obj))
+        return self._rooms
+
+    def _with_property_value(self, prop_name, prop_value):
+        key = (prop_name, prop_value)
+        if key not in self._property_values:
+            self._property_values[key] = [obj for obj in self.get_objects_with_property(prop_name)
+                                          if prop_value == obj[prop_name]
+                                          or isinstance(obj[prop_name], Iterable) and prop_value in obj[prop_name]]
+        return self._property_values[key]
@@ -0,0 +1,150 @@
+import re, enum, functools
+from collections import namedtuple
+
+'''
+Typed messages from the human to the agents. The chat buttons of the human agent view and the scripted human send a
+compact payload as the content of a MATRX Message: {"kind": 2, "victim": 0, "area": 5, "tick": 120} for "Found:
+critically injured girl in 5", with the kind and victim as numbers from the tables below and the keys that do not apply
+left out. The agents read every payload into a TeamMessage record and act on its kind, the text of a message is only
+generated to display it. Free text typed in the chat, and the text messages of sessions recorded before the payloads
+were introduced, are read into the same records, the text of the chat buttons is understood as the typed message.
+'''
+
+
+class MessageKind(enum.IntEnum):
+    TEXT = 0
+    SEARCH = 1
+    FOUND = 2
+    COLLECT = 3
+    REMOVE_AT = 4
+    CONTINUE = 5
+    RESCUE = 6
+    RESCUE_ALONE = 7
+    RESCUE_TOGETHER = 8
+    REMOVE = 9
+    REMOVE_ALONE = 10
+    REMOVE_TOGETHER = 11
+
+
+# Display text of the kinds of messages, the same text as the chat buttons show
+message_texts = {MessageKind.SEARCH: 'Search: {area}',
+                 MessageKind.FOUND: 'Found: {victim} in {area}',
+                 MessageKind.COLLECT: 'Collect: {victim} in {area}',
+                 MessageKind.REMOVE_AT: 'Remove: at {area}',
+                 MessageKind.CONTINUE: 'Continue',
+                 MessageKind.RESCUE: 'Rescue',
+                 MessageKind.RESCUE_ALONE: 'Rescue alone',
+                 MessageKind.RESCUE_TOGETHER: 'Rescue together',
+                 MessageKind.REMOVE: 'Remove',
+                 MessageKind.REMOVE_ALONE: 'Remove alone',
+                 MessageKind.REMOVE_TOGETHER: 'Remove together'}
+
+# Victims that messages can be about, the id of a victim is its index in this list
+victim_kinds = ['girl', 'boy', 'woman', 'man', 'elderly woman', 'elderly man', 'dog', 'cat']
+victims = [injury + ' ' + kind for injury in ['critically injured', 'mildly injured', 'healthy'] for kind in victim_kinds]
+_victim_ids = {victim: nr for nr, victim in enumerate(victims)}
+
+# Kinds of the messages of which the text is a single answer to a question of RescueBot
+_answers = {text: kind for kind, text in message_texts.items() if '{' not in text}
+# Text prefixes of the kinds of messages about an area
+_prefixes = {'Search:': MessageKind.SEARCH, 'Found:': MessageKind.FOUND, 'Collect:': MessageKind.COLLECT,
+             'Remove:': MessageKind.REMOVE_AT}
+
+
+class TeamMessage(namedtuple('TeamMessage', ['kind', 'victim', 'area', 'tick', 'text'])):
+    '''
+    A message from the human: its MessageKind, the name of the victim and the number of the area it is about, the tick
+    at which it was sent, and for free text messages the text.
+    '''
+    __slots__ = ()
+
+    @property
+    def room(self):
+        '''
+        @return the name of the area the message is about, or None
+        '''
+        return None if self.area is None else 'area ' + str(self.area)
+
+    def content(self):
+        '''
+        @return the payload to send as the content of a MATRX Message, free text is sent as text
+        '''
+        if self.kind == MessageKind.TEXT:
+            return self.text
+        content = {'kind': int(self.kind)}
+        if self.victim is not None:
+            content['victim'] = _victim_ids[self.victim]
+        if self.area is not None:
+            content['area'] = self.area
+        if self.tick is not None:
+            content['tick'] = self.tick
+        return content
+
+    def __str__(self):
+        if self.kind == MessageKind.TEXT:
+            return self.text
+        return message_texts[self.kind].format(victim=self.victim, area=self.area)
+
+
+def team_message(kind, victim=None, area=None, tick=None):
+    '''
+    @return the payload of a typed message, to send as the content of a MATRX Message
+    '''
+    return TeamMessage(MessageKind(kind), victim, area, tick, None).content()
+
+
+def read_message(content):
+    '''
+    @return the TeamMessage of the content of a received message: a payload, a TeamMessage or text. Payloads of an
+    unknown kind, or without the victim or area their kind is about, are read as free text
+    '''
+    if isinstance(content, dict) and 'kind' in content:
+        message = _read_payload(content)
+        return message if message is not None else TeamMessage(MessageKind.TEXT, None, None, None, str(content))
+    if isinstance(content, TeamMessage):
+        return content
+    return _read_text(content if isinstance(content, str) else str(content))
+
+
+def _read_payload(content):
+    # The TeamMessage of a payload, or None when it is not a valid payload: any client of the api can send one
+    kind, victim, area = content['kind'], content.get('victim'), content.get('area')
+    if type(kind) is not int or kind not in message_texts:
+        return None
+    kind = MessageKind(kind)
+    if victim is not None or '{victim}' in message_texts[kind]:
+        if type(victim) is not int or victim not in range(len(victims)):
+            return None
+        victim = victims[victim]
+    if (area is not None or '{area}' in message_texts[kind]) and type(area) is not int:
+        return None
+    return TeamMessage(kind, victim, area, content.get('tick'), None)
+
+
+@functools.lru_cache(maxsize=4096)
+def _read_text(text):
+    # Text is read once, the agents and the chat send the same texts over and over
+    words = text.split()
+    # The last word of a message about an area is the area number, which free text can end with as well
+    area = int(words[-1]) if words and re.fullmatch(r'[0-9]+', words[-1]) else None
+    if text in _answers:
+        return TeamMessage(_answers[text], None, None, None, None)
+    kind = _prefixes.get(words[0]) if words else None
+    if kind is None or area is None:
+        return TeamMessage(MessageKind.TEXT, None, area, None, text)
+    victim = None
+    if kind in (MessageKind.FOUND, MessageKind.COLLECT):
+        # Between the prefix and "in <area>" is the name of the victim
+        victim = ' '.join(words[1:-2])
+        if victim not in _victim_ids:
+            return TeamMessage(MessageKind.TEXT, None, area, None, text)
+    return TeamMessage(kind, victim, area, None, None)
+
+
+def protocol_tables():
+    '''
+    @return the kinds (by lower case name), display texts (by kind) and victims of the messages, for the visualizer
+    '''
+    return {'kinds': {kind.name.lower(): int(kind) for kind in MessageKind},
+            'texts': {int(kind): text for kind, text in message_texts.items()},
+            'victims': victims}
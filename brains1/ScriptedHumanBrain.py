@@ -0,0 +1,108 @@
+from matrx.messages import Message
+from brains1.HumanBrain import HumanBrain
+from brains1.MessageProtocol import read_message
+
+
+class ScriptedHumanBrain(HumanBrain):
+    """ A human agent that is not controlled by a keyboard, but replays a script or follows a policy.
+    Used for running the task headless, without a visualizer and a human at the keyboard.
+    """
+    def __init__(self, keys=None, messages=None, policy=None, **kwargs):
+        '''
+        @param keys a dictionary from tick number to the key that is pressed at that tick, e.g. {5: 'ArrowLeft'}
+        @param messages a dictionary from tick number to a list of message contents sent at that tick
+        @param policy a callable policy(brain, state, received) returning the key to press or None, where
+        received is the list of messages received since the previous call of the policy. The policy can send messages
+        through brain.say(content).
+        Keys and messages that are due while the human is busy are pressed and sent at the next decision.
+        All other arguments are passed on to the HumanBrain.
+        '''
+        super().__init__(**kwargs)
+        self.__keys = dict(keys) if keys else {}
+        self.__messages = dict(messages) if messages else {}
+        self.__policy = policy
+        self.__tick = None
+        self.__unread = []
+
+    def say(self, content):
+        '''
+        Sends a message with the given content to all agents, like the chat of the human agent view does: the text of a
+        chat button (e.g. 'Found: mildly injured cat in 11') is sent as the typed message of that button (see
+        brains1/MessageProtocol.py), stamped with the current tick, and other text as text.
+        '''
+        content = read_message(content)._replace(tick=self.__tick).content()
+        self.send_message(Message(content=content, from_id=self.agent_id))
+
+    def _get_action(self, state, agent_properties, agent_id, user_input):
+        tick = state['World']['nr_ticks']
+        self.__tick = tick
+        # The HumanBrain empties received_messages at every decision, the policy gets all messages since its last call
+        if self.__policy is not None:
+            self.__unread.extend(self.received_messages)
+        # Send all scripted messages that are due
+        for due in sorted(t for t in self.__messages if t <= tick):
+            for content in self.__messages.pop(due):
+                self.say(content)
+        # Press the latest scripted key that is due, otherwise ask the policy which key to press
+        pressed = None
+        due_keys = sorted(t for t in self.__keys if t <= tick)
+        if due_keys:
+            pressed = self.__keys[due_keys[-1]]
+            for due in due_keys:
+                self.__keys.pop(due)
+        elif self.__policy is not None:
+            received, self.__unread = self.__unread, []
+            pressed = self.__policy(self, state, received)
+        user_input = [pressed] if pressed else None
+        return super()._get_action(state, agent_properties, agent_id, user_input)
+
+
+class ResponsivePolicy:
+    '''
+    A simple scripted human for the official task. The human first walks away from RescueBot so that the task starts,
+    and then answers the questions of RescueBot: obstacles that RescueBot can remove alone are removed, rocks are
+    skipped, mildly injured victims are rescued by RescueBot alone and critically injured victims are skipped.
+    RescueBot only reads the last message it received when it is ready for an answer, so like a human clicking the chat
+    button again, the answer is sent again every repeat_interval ticks until RescueBot sends any message other than its
+    score after the question.
+    '''
+    def __init__(self, start_keys=('ArrowLeft', 'ArrowLeft', 'ArrowLeft', 'ArrowUp', 'ArrowUp'), repeat_interval=1):
+        self._start_keys = list(start_keys)
+        self._repeat_interval = repeat_interval
+        # The answer to the question that is still open, and the tick at which it was sent last
+        self._answer = None
+        self._sent_at = None
+
+    def __call__(self, brain, state, received):
+        for mssg in received:
+            content = mssg.content if isinstance(mssg, Message) else mssg
+            if isinstance(mssg, Message) and mssg.from_id == brain.agent_id or not isinstance(content, str):
+                continue
+            if 'Please decide whether to' in content:
+                self._answer = self.answer(content)
+                self._sent_at = None
+            elif not content.startswith('Our score is'):
+                # RescueBot went on with something else, so it has read the answer
+                self._answer = None
+        tick = state['World']['nr_ticks']
+        if self._answer and (self._sent_at is None or tick - self._sent_at >= self._repeat_interval):
+            brain.say(self._answer)
+            self._sent_at = tick
+        # Walk away from RescueBot at the start of the task
+        if self._start_keys:
+            return self._start_keys.pop(0)
+        return None
+
+    def answer(self, question):
+        '''
+        @return the answer to a question of RescueBot
+        '''
+        if '"Remove alone"' in question:
+            return 'Remove alone'
+        if question.startswith('Found tree'):
+            return 'Remove'
+        if question.startswith('Found rock'):
+            return 'Continue'
+        if '"Rescue alone"' in question:
+            return 'Rescue alone'
+        return 'Continue'
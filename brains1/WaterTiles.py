@@ -0,0 +1,35 @@
+'''
+Water slows down the agent and the human when they move through it, except on the doormats of the areas. Water tiles
+and doormats never move, so their locations are read once from the tile layers and area tiles of the first state of a
+world, after which checking whether a location slows down movement is a set lookup. Both the agent and the human brains
+use this module.
+'''
+
+
+def doormat_locations(state):
+    '''
+    @param state the (first) state of a brain, which contains the area tiles of the rooms with their 'doormat' property
+    @return frozen set of the locations of the doormats of the areas in the state
+    '''
+    return frozenset(tuple(obj['doormat']) for obj in state.as_dict().values() if obj.get('doormat') is not None)
+
+
+def water_locations(state):
+    '''
+    @param state the (first) state of a brain, which contains the water layers and the areas of the world
+    @return frozen set of the locations of the water tiles in the state that slow down movement, which are all water
+    tiles except the doormats
+    '''
+    waters = state[{"name": "water"}] or []
+    # The state returns a single object instead of a list when there is only one match
+    if isinstance(waters, dict):
+        waters = [waters]
+    return frozenset(tuple(tile) for water in waters for tile in water['tiles']) - doormat_locations(state)
+
+
+def slowed_by_water(location, water):
+    '''
+    @param water frozen set of water locations as returned by water_locations
+    @return whether moving from the location is slowed down by water
+    '''
+    return location in water
@@ -0,0 +1,126 @@
+import os, sys
+import glob
+import time
+import argparse
+import tempfile
+from worlds1.WorldBuilder import create_builder
+from loggers.ActionLogger import flush_action_loggers
+from loggers.OutputLogger import run_directory
+from loggers.TickProfiler import TickProfiler
+from worlds1.WorldSnapshot import wait_for_snapshots
+from worlds1.MapGenerator import generate_scenario_file
+from brains1.ScriptedHumanBrain import ScriptedHumanBrain, ResponsivePolicy
+
+'''
+Runs the task without a visualizer, without the MATRX api and without a human at the keyboard. The human agent is
+replaced by a scripted human brain, and the world runs as fast as possible. The actions are logged by the same
+ActionLogger as in main.py, so the logs can be processed in the same way.
+
+Example: python headless.py --condition normal --max-ticks 3000 --runs 10
+Example on a generated map with 140 rooms: python headless.py --rooms 140 --victims 260 --profile large.csv
+'''
+
+
+def run_headless(task_type='official', condition='normal', name='scripted', folder=None, max_ticks=3000,
+                 keys=None, messages=None, policy=None, agent_class=None, log_folder=None, seed=None, slowdown=8,
+                 buffered_log=False, log_extension='.csv', profile=None, snapshot_interval=None, scenario=None):
+    '''
+    Runs one headless session with a scripted human.
+    @param keys, messages, policy the script of the human, see ScriptedHumanBrain. Without a script the human follows
+    the ResponsivePolicy.
+    @param log_folder the folder in which a new folder is created for the logs of this session
+    @param buffered_log, log_extension log the actions with the BufferedActionLogger to a '.csv' or '.npz' log
+    @param profile file to save the per tick profile of the session to, as a Chrome trace ('.json') or a table ('.csv'),
+    no profiling when None
+    @param snapshot_interval save a snapshot of the whole world every snapshot_interval ticks, see SnapshotLogger
+    @param scenario the scenario file of the world, for example one generated with worlds1/MapGenerator.py, by default
+    the scenario of the task type
+    @return dictionary with a summary of the session
+    '''
+    fld = os.getcwd() if folder is None else folder
+    if keys is None and messages is None and policy is None:
+        policy = ResponsivePolicy()
+    # Every session logs to its own folder, so sessions that start in the same second do not share a log file
+    log_folder = os.path.join(fld, 'logs') if log_folder is None else log_folder
+    os.makedirs(log_folder, exist_ok=True)
+    run_folder = tempfile.mkdtemp(prefix='headless_' + condition + '_', dir=log_folder)
+    builder = create_builder(task_type=task_type, condition=condition, name=name, folder=fld, headless=True,
+                             max_nr_ticks=max_ticks, agent_class=agent_class, human_class=ScriptedHumanBrain,
+                             human_kwargs={'keys': keys, 'messages': messages, 'policy': policy},
+                             log_folder=run_folder, seed=seed, slowdown=slowdown,
+                             buffered_log=buffered_log, log_extension=log_extension,
+                             snapshot_interval=snapshot_interval, scenario=scenario)
+    world = builder.get_world()
+    profiler = TickProfiler().enable() if profile is not None else None
+    start = time.perf_counter()
+    try:
+        world.run(builder.api_info)
+    finally:
+        duration = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+    flush_action_loggers()
+    wait_for_snapshots()
+    goal = world.simulation_goal
+    action_files = sorted(glob.glob(os.path.join(run_folder, '*', 'world_1', 'actions_*')))
+    return {'task_type': task_type,
+            'scenario': scenario,
+            'condition': condition,
+            'ticks': world.current_nr_ticks,
+            'seconds': duration,
+            'ticks_per_second': world.current_nr_ticks / duration if duration > 0 else float('inf'),
+            'score': goal.score(world),
+            'completeness': goal.progress(world),
+            'run_folder': run_folder,
+            'exp_folder': run_directory(world),
+            'action_file': action_files[0] if action_files else None,
+            'profile': profiler.summary() if profiler is not None else None,
+            'profile_file': profiler.save_trace(profile) if profiler is not None else None,
+            'profile_table': profiler.format_summary() if profiler is not None else None}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the search and rescue task headless with a scripted human.")
+    parser.add_argument('--task', default='official', choices=['official', 'tutorial'])
+    parser.add_argument('--condition', default='normal', choices=['normal', 'strong', 'weak'])
+    parser.add_argument('--name', default='scripted', help="name of the scripted human agent")
+    parser.add_argument('--max-ticks', type=int, default=3000, help="stop each session after this many ticks")
+    parser.add_argument('--runs', type=int, default=1, help="number of sessions to run")
+    parser.add_argument('--buffered-log', choices=['csv', 'npz'], default=None,
+                        help="log the actions on a background thread to a csv file or to compressed npz chunks")
+    parser.add_argument('--profile', default=None,
+                        help="profile the stages of every tick and save the trace to this '.json' (Chrome trace) or '.csv' file")
+    parser.add_argument('--snapshot-interval', type=int, default=None,
+                        help="save a snapshot of the whole world every this many ticks, to continue from with load_world")
+    parser.add_argument('--scenario', default=None, help="scenario file of the world, by default that of the task")
+    parser.add_argument('--rooms', type=int, default=None,
+                        help="run on a map generated with this many rooms (see worlds1/MapGenerator.py)")
+    parser.add_argument('--victims', type=int, default=None, help="number of victims of the generated map")
+    parser.add_argument('--obstacle-density', type=float, default=0.7,
+                        help="fraction of the doors of the generated map that is blocked by an obstacle")
+    parser.add_argument('--map-seed', type=int, default=1, help="random seed of the generated map")
+    args = parser.parse_args()
+
+    condition = 'tutorial' if args.task == 'tutorial' else args.condition
+    scenario = args.scenario
+    if args.rooms is not None:
+        # Generated maps are played as official task, with about two victims per room like the official map
+        nr_victims = max(2 * args.rooms, 8) if args.victims is None else args.victims
+        scenario = generate_scenario_file(os.path.join('logs', 'map_{}_rooms_{}_victims_seed_{}.json'.format(
+            args.rooms, nr_victims, args.map_seed)), nr_rooms=args.rooms, nr_victims=nr_victims,
+            obstacle_density=args.obstacle_density, seed=args.map_seed)
+        print("Generated map saved in " + scenario)
+    for run in range(args.runs):
+        profile = args.profile
+        if profile is not None and args.runs > 1:
+            profile = '{}_{}{}'.format(os.path.splitext(profile)[0], run, os.path.splitext(profile)[1])
+        summary = run_headless(task_type=args.task, condition=condition, name=args.name, max_ticks=args.max_ticks,
+                               buffered_log=args.buffered_log is not None, log_extension='.' + (args.buffered_log or 'csv'),
+                               profile=profile, snapshot_interval=args.snapshot_interval, scenario=scenario)
+        print("Run {}: {} ticks in {:.2f}s ({:.1f} ticks/s), score {}, completeness {:.2f}, logs in {}".format(
+            run, summary['ticks'], summary['seconds'], summary['ticks_per_second'], summary['score'],
+            summary['completeness'], summary['run_folder']))
+        if summary['profile_table']:
+            print(summary['profile_table'])
+            print("Profile saved in " + summary['profile_file'])
+    sys.exit(0)
@@ -1,3 +1,5 @@
+import csv, glob, atexit, queue, threading, weakref
+import numpy as np
 from matrx.logger.logger import GridWorldLogger
 from matrx.grid_world import GridWorld
 
@@ -18,5 +20,232 @@ class ActionLogger(GridWorldLogger):
         for agent_id, agent_body in grid_world.registered_agents.items():
             log_data[agent_id + '_action'] = agent_body.current_action
             log_data[agent_id + '_location'] = agent_body.location
-                
-        return log_data
\ No newline at end of file
+
+        return log_data
+
+
+# Buffered action loggers that still have to write their rows, flushed when the process shuts down
+_buffered_loggers = weakref.WeakSet()
+
+
+class BufferedActionLogger(ActionLogger):
+    '''
+    Logger for saving the same data as the ActionLogger, without writing to disk on the simulation thread.
+    Every tick is appended to preallocated column buffers, with the actions stored as numbers of an action vocabulary and
+    the locations as pairs of small integers. Full buffers are written in chunks by a background thread, either to one
+    CSV file in the same format as the ActionLogger (file_extension=".csv"), or to compressed numpy files with one file
+    per chunk (file_extension=".npz"). Use read_action_log to read the rows of both formats.
+    '''
+    def __init__(self, save_path="", file_name_prefix="", file_extension=".csv", delimiter=";", chunk_size=1024):
+        if file_extension not in ['.csv', '.npz']:
+            raise ValueError("The buffered action logger writes '.csv' or '.npz' files, not " + str(file_extension))
+        super().__init__(save_path=save_path, file_name_prefix=file_name_prefix, file_extension=file_extension, delimiter=delimiter)
+        self._delimiter = delimiter
+        self._chunk_size = chunk_size
+        self._world_nr = None
+        self._agent_ids = None
+        # Action vocabulary, the number of an action is its index and None (no action) is number 0
+        self._actions = [None]
+        self._action_nrs = {None: 0}
+        self._buffers = None
+        self._rows = 0
+        self._chunk_nr = 0
+        self._queue = queue.Queue()
+        # The first error of the writer thread, raised by the next flush
+        self._error = None
+        self._writer = threading.Thread(target=self._write_chunks, name="BufferedActionLogger", daemon=True)
+        self._writer.start()
+        _buffered_loggers.add(self)
+
+    def __getstate__(self):
+        # The queue and writer thread cannot be pickled, a logger restored from a world snapshot starts its own
+        state = dict(self.__dict__)
+        del state['_queue'], state['_writer']
+        state['_error'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_chunks, name="BufferedActionLogger", daemon=True)
+        self._writer.start()
+        _buffered_loggers.add(self)
+
+    def _set_world_nr(self, world_nr):
+        self._world_nr = world_nr
+        super()._set_world_nr(world_nr)
+
+    def _grid_world_log(self, grid_world, agent_data, last_tick=False, goal_status=None):
+        if not self._needs_to_log(grid_world, last_tick, goal_status):
+            return
+        agents = grid_world.registered_agents
+        if self._agent_ids is None:
+            self._agent_ids = list(agents.keys())
+            self._buffers = self._new_buffers()
+        elif len(agents) != len(self._agent_ids) or any(agent_id not in agents for agent_id in self._agent_ids):
+            raise Exception(f"Cannot append columns to the log file when we already logged with different agents "
+                            f"{self._agent_ids}.")
+        row = self._rows
+        buffers = self._buffers
+        buffers['score'][row] = grid_world.simulation_goal.score(grid_world)
+        buffers['completeness'][row] = grid_world.simulation_goal.progress(grid_world)
+        for agent_id in self._agent_ids:
+            agent_body = agents[agent_id]
+            action = agent_body.current_action
+            if action not in self._action_nrs:
+                self._action_nrs[action] = len(self._actions)
+                self._actions.append(action)
+            buffers[agent_id + '_action'][row] = self._action_nrs[action]
+            buffers[agent_id + '_location'][row] = agent_body.location
+        buffers['world_nr'][row] = self._world_nr
+        buffers['tick_nr'][row] = grid_world.current_nr_ticks
+        self._rows += 1
+        if self._rows == self._chunk_size or last_tick:
+            self._submit_chunk()
+
+    def flush(self):
+        '''
+        Hands the buffered rows to the writer thread and waits until all rows are written.
+        Raises the first error the writer thread had writing rows since the last flush.
+        '''
+        if self._rows > 0:
+            self._submit_chunk()
+        self._queue.join()
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def columns(self):
+        '''
+        @return the columns of the log, in the same order as the ActionLogger
+        '''
+        columns = ['score', 'completeness']
+        for agent_id in self._agent_ids or []:
+            columns += [agent_id + '_action', agent_id + '_location']
+        return columns + ['world_nr', 'tick_nr']
+
+    def _new_buffers(self):
+        buffers = {'score': np.zeros(self._chunk_size, dtype=np.int32),
+                   'completeness': np.zeros(self._chunk_size, dtype=np.float64),
+                   'world_nr': np.zeros(self._chunk_size, dtype=np.int16),
+                   'tick_nr': np.zeros(self._chunk_size, dtype=np.int32)}
+        for agent_id in self._agent_ids:
+            buffers[agent_id + '_action'] = np.zeros(self._chunk_size, dtype=np.int16)
+            buffers[agent_id + '_location'] = np.zeros((self._chunk_size, 2), dtype=np.int16)
+        return buffers
+
+    def _submit_chunk(self):
+        chunk = {column: values[:self._rows] for column, values in self._buffers.items()}
+        # The vocabulary only grows, so a copy of it can translate every action number of this chunk
+        self._queue.put((self._chunk_nr, chunk, list(self._actions), self.columns()))
+        self._chunk_nr += 1
+        self._buffers = self._new_buffers()
+        self._rows = 0
+
+    def _write_chunks(self):
+        while True:
+            chunk_nr, chunk, actions, columns = self._queue.get()
+            try:
+                if self.file_name.endswith('.npz'):
+                    self._write_npz(chunk_nr, chunk, actions, columns)
+                else:
+                    self._write_csv(chunk_nr, chunk, actions, columns)
+            except Exception as error:
+                # Keep taking the chunks off the queue, so flush does not wait forever, and let flush raise the error
+                if self._error is None:
+                    self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _write_csv(self, chunk_nr, chunk, actions, columns):
+        with open(self.file_name, mode="w+" if chunk_nr == 0 else "a", newline='') as data_file:
+            csv_writer = csv.writer(data_file, delimiter=self._delimiter, quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            if chunk_nr == 0:
+                csv_writer.writerow(columns)
+            csv_writer.writerows(_chunk_rows(chunk, actions, columns))
+
+    def _write_npz(self, chunk_nr, chunk, actions, columns):
+        file_name = self.file_name[:-len('.npz')] + '_{:05d}.npz'.format(chunk_nr)
+        actions = np.array(['' if action is None else action for action in actions])
+        np.savez_compressed(file_name, columns=np.array(columns), actions=actions, **chunk)
+
+
+def _chunk_rows(chunk, actions, columns):
+    '''
+    @return the rows of a chunk as lists of strings, formatted like the ActionLogger does
+    '''
+    formatted = []
+    for column in columns:
+        values = chunk[column]
+        if column.endswith('_action'):
+            formatted.append(['' if actions[nr] is None else actions[nr] for nr in values.tolist()])
+        elif column.endswith('_location'):
+            formatted.append([str((x, y)) for x, y in values.tolist()])
+        else:
+            formatted.append([str(value) for value in values.tolist()])
+    return map(list, zip(*formatted))
+
+
+def read_action_log(action_file, delimiter=';'):
+    '''
+    Reads an action log written by the ActionLogger or the BufferedActionLogger. For chunked '.npz' logs, action_file
+    is the name of any chunk or the name without chunk number.
+    @return the header and an iterator over the rows, with all values as strings like in the CSV file
+    '''
+    if not action_file.endswith('.npz'):
+        csvfile = open(action_file, newline='')
+        reader = csv.reader(csvfile, delimiter=delimiter, quotechar="'")
+        header = next(reader, [])
+
+        def csv_rows():
+            with csvfile:
+                yield from reader
+        return header, csv_rows()
+    prefix = action_file[:-len('.npz')]
+    if prefix[-6:-5] == '_' and prefix[-5:].isdigit():
+        prefix = prefix[:-6]
+    chunk_files = sorted(glob.glob(prefix + '_[0-9][0-9][0-9][0-9][0-9].npz'))
+    if not chunk_files:
+        return [], iter([])
+    with np.load(chunk_files[0]) as chunk:
+        header = chunk['columns'].tolist()
+
+    def npz_rows():
+        for chunk_file in chunk_files:
+            with np.load(chunk_file) as chunk:
+                actions = chunk['actions'].tolist()
+                yield from _chunk_rows({column: chunk[column] for column in header}, actions, header)
+    return header, npz_rows()
+
+
+def flush_action_loggers():
+    '''
+    Writes the buffered rows of all buffered action loggers, and waits until they are written. Raises the first error
+    of the loggers after all of them are flushed.
+    '''
+    errors = []
+    for logger in list(_buffered_loggers):
+        try:
+            logger.flush()
+        except Exception as error:
+            errors.append(error)
+    if errors:
+        raise errors[0]
+
+
+def idle_action_logger_threads():
+    '''
+    Waits until the writer threads of all buffered action loggers have written the chunks handed to them, without handing
+    them the rows that are still buffered. Until the next chunk is handed to them, the writer threads only wait on the
+    queues of their loggers.
+    @return the writer threads
+    '''
+    writers = []
+    for logger in list(_buffered_loggers):
+        logger._queue.join()
+        writers.append(logger._writer)
+    return writers
+
+
+# Write any buffered rows when the process shuts down
+atexit.register(flush_action_loggers)
@@ -3,39 +3,92 @@ import sys
 import csv
 import glob
 import pathlib
+from agents1.TrustBeliefStore import flush_trust_beliefs
+from loggers.ActionLogger import ActionLogger, read_action_log, flush_action_loggers
 
-def output_logger(fld):
-    recent_dir = max(glob.glob(os.path.join(fld, '*/')), key=os.path.getmtime)
-    recent_dir = max(glob.glob(os.path.join(recent_dir, '*/')), key=os.path.getmtime)
-    action_files = glob.glob(os.path.join(recent_dir, 'world_1/action*'))
+def run_directory(world):
+    '''
+    @return the experiment folder of the world, which contains the 'world_1' folder with the action log
+    '''
+    for logger in world.loggers:
+        if isinstance(logger, ActionLogger):
+            return os.path.dirname(os.path.dirname(logger.file_name))
+    return None
+
+def summarize_action_log(action_file):
+    '''
+    Reads an action log once as a stream, so only the last row and the unique actions are kept in memory.
+    @return dictionary with the last row, the unique (action, location) pairs of the agent and the human, the number of
+    rows, the number of rows in which the agent and the human were idle, and the ticks at which the completeness
+    increased. None when the log has no rows.
+    '''
+    unique_agent_actions = set()
+    unique_human_actions = set()
+    together_actions = {'RemoveObjectTogether', 'CarryObjectTogether', 'DropObjectTogether'}
+    idle_actions = {'', 'Idle'}
+    agent_idle = 0
+    human_idle = 0
+    rescue_ticks = []
+    nr_rows = 0
+    completeness = 0.0
+    action_header, rows = read_action_log(action_file)
+    last_row = None
+    for row in rows:
+        if row[2]!="":
+            unique_agent_actions.add((row[2], row[3]))
+        if row[4]!="":
+            unique_human_actions.add((row[4], row[5]))
+        # Actions that the human and agent perform together also count as agent actions
+        if row[4] in together_actions:
+            unique_agent_actions.add((row[4], row[5]))
+        if row[2] in idle_actions:
+            agent_idle += 1
+        if row[4] in idle_actions:
+            human_idle += 1
+        # A victim was rescued when the completeness increased
+        if float(row[1]) > completeness:
+            rescue_ticks.append(int(row[-1]))
+        completeness = float(row[1])
+        nr_rows += 1
+        last_row = row
+    if last_row is None:
+        return None
+    return {'last': {action_header[i]: last_row[i] for i in range(len(action_header))},
+            'agent_actions': unique_agent_actions, 'human_actions': unique_human_actions, 'rows': nr_rows,
+            'agent_idle': agent_idle, 'human_idle': human_idle, 'rescue_ticks': rescue_ticks}
+
+def output_logger(fld, run_dir=None):
+    '''
+    Creates the output file of a run and adds its trust beliefs to the 'allTrustBeliefs.csv' file in fld.
+    The run directory is the experiment folder containing 'world_1' (see run_directory), when it is not given the most
+    recent one in fld is used.
+    Returns the output of the run as a dictionary.
+    '''
+    if run_dir is None:
+        recent_dir = max(glob.glob(os.path.join(fld, '*/')), key=os.path.getmtime)
+        recent_dir = max(glob.glob(os.path.join(recent_dir, '*/')), key=os.path.getmtime)
+    else:
+        recent_dir = run_dir
+    # Make sure the buffered action logs are completely written
+    flush_action_loggers()
+    action_files = sorted(glob.glob(os.path.join(recent_dir, 'world_1/action*')))
     if action_files:
         action_file = action_files[0]
     else:
         print(f"No action files found in {os.path.join(recent_dir, 'world_1')}")
         return
-    action_header = []
-    action_contents=[]
     trustfile_header = []
-    trustfile_contents = []
-    # Calculate the unique human and agent actions
-    unique_agent_actions = []
-    unique_human_actions = []
-    with open(action_file) as csvfile:
-        reader = csv.reader(csvfile, delimiter=';', quotechar="'")
-        for row in reader:
-            if action_header==[]:
-                action_header=row
-                continue
-            if row[2:4] not in unique_agent_actions and row[2]!="":
-                unique_agent_actions.append(row[2:4])
-            if row[4:6] not in unique_human_actions and row[4]!="":
-                unique_human_actions.append(row[4:6])
-            if row[4] == 'RemoveObjectTogether' or row[4] == 'CarryObjectTogether' or row[4] == 'DropObjectTogether':
-                if row[4:6] not in unique_agent_actions:
-                    unique_agent_actions.append(row[4:6])
-            res = {action_header[i]: row[i] for i in range(len(action_header))}
-            action_contents.append(res)
+    trustfile_last = None
+    summary = summarize_action_log(action_file)
+    if summary is None:
+        print(f"No actions logged in {action_file}")
+        return
+    action_last = summary['last']
+    unique_agent_actions = summary['agent_actions']
+    unique_human_actions = summary['human_actions']
 
+    # Make sure the latest in-memory trust beliefs of the agent are written to disk
+    flush_trust_beliefs(fld)
     with open(fld+'/beliefs/currentTrustBelief.csv') as csvfile:
         reader = csv.reader(csvfile, delimiter=';', quotechar="'")
         for row in reader:
@@ -43,16 +96,15 @@ def output_logger(fld):
                 trustfile_header=row
                 continue
             if row:
-                res = {trustfile_header[i] : row[i] for i in range(len(trustfile_header))}
-                trustfile_contents.append(res)
+                trustfile_last = {trustfile_header[i] : row[i] for i in range(len(trustfile_header))}
     # Retrieve the stored trust belief values
-    name = trustfile_contents[-1]['name']
-    competence = trustfile_contents[-1]['competence']
-    willingness = trustfile_contents[-1]['willingness']
+    name = trustfile_last['name']
+    competence = trustfile_last['competence']
+    willingness = trustfile_last['willingness']
     # Retrieve the number of ticks to finish the task, score, and completeness
-    no_ticks = action_contents[-1]['tick_nr']
-    score = action_contents[-1]['score']
-    completeness = action_contents[-1]['completeness']
+    no_ticks = action_last['tick_nr']
+    score = action_last['score']
+    completeness = action_last['completeness']
     # Save the output as a csv file
     print("Saving output...")
     with open(os.path.join(recent_dir,'world_1/output.csv'),mode='w') as csv_file:
@@ -61,4 +113,6 @@ def output_logger(fld):
         csv_writer.writerow([completeness,score,no_ticks,len(unique_agent_actions),len(unique_human_actions)])
     with open(fld + '/beliefs/allTrustBeliefs.csv', mode='a+') as csv_file:
         csv_writer = csv.writer(csv_file, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        csv_writer.writerow([name,competence,willingness])
\ No newline at end of file
+        csv_writer.writerow([name,competence,willingness])
+    return {'completeness':completeness,'score':score,'no_ticks':no_ticks,'agent_actions':len(unique_agent_actions),
+            'human_actions':len(unique_human_actions),'name':name,'competence':competence,'willingness':willingness}
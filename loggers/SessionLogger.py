@@ -0,0 +1,160 @@
+import os, json, atexit, weakref
+import numpy as np
+from matrx.logger.logger import GridWorldLogger
+
+# Session loggers that still have to write their recorded decisions, flushed when the process shuts down
+_session_loggers = weakref.WeakSet()
+
+
+class SessionLogger(GridWorldLogger):
+    '''
+    Logger for recording a session so it can be replayed: every decision of every agent (the action and its keyword
+    arguments) and every message, per tick. Together with the session info (task type, condition, human name, seed,
+    slowdown) this is all input of the world, so replaying the decisions on a world built with the same settings
+    reproduces the session tick by tick. Decisions without an action or arguments are not written.
+    The recording is a JSON lines file: the first line holds the session info, every other line one decision.
+    '''
+    def __init__(self, save_path="", file_name_prefix="", file_extension=".jsonl", delimiter=";", session_info=None,
+                 chunk_size=256):
+        super().__init__(save_path=save_path, file_name=file_name_prefix, file_extension=file_extension,
+                         delimiter=delimiter, log_strategy=1)
+        self._session_info = dict(session_info or {})
+        self._chunk_size = chunk_size
+        self._attached = False
+        self._tick = None
+        self._agent_id = None
+        self._lines = []
+        self._written = False
+        _session_loggers.add(self)
+
+    def __setstate__(self, state):
+        # A logger restored from a world snapshot also writes its recorded decisions when the process shuts down
+        self.__dict__.update(state)
+        _session_loggers.add(self)
+
+    def _grid_world_log(self, grid_world, agent_data, last_tick=False, goal_status=None):
+        # Loggers are called every tick before the agents decide, so this is the tick of the following decisions
+        self._tick = grid_world.current_nr_ticks
+        if not self._attached:
+            self._attach(grid_world)
+        if last_tick or len(self._lines) >= self._chunk_size:
+            self.flush()
+
+    def _attach(self, grid_world):
+        # Records the decisions of the agents by wrapping their get action functions, and their messages (including the
+        # messages typed in the visualizer) by wrapping the preprocessing of the message manager
+        self._attached = True
+        for agent_id, agent_body in grid_world.registered_agents.items():
+            agent_body.get_action_func = _RecordingActionFunc(self, agent_id, agent_body.get_action_func)
+        message_manager = grid_world.message_manager
+        message_manager.preprocess_messages = _RecordingPreprocessMessages(self, message_manager.preprocess_messages)
+
+    def flush(self):
+        '''
+        Appends the recorded decisions to the session file.
+        '''
+        if not self._attached:
+            return
+        os.makedirs(os.path.dirname(self.file_name) or '.', exist_ok=True)
+        with open(self.file_name, mode='a' if self._written else 'w') as session_file:
+            if not self._written:
+                session_file.write(json.dumps(encode(self._session_info)) + '\n')
+                self._written = True
+            for line in self._lines:
+                session_file.write(json.dumps(line) + '\n')
+        self._lines = []
+
+
+class _RecordingActionFunc:
+    # Get action function of an agent body that records the decisions of the agent, a class instead of a closure so
+    # that a world with a session logger can be pickled (see worlds1/WorldSnapshot.py)
+    def __init__(self, logger, agent_id, get_action_func):
+        self._logger = logger
+        self._agent_id = agent_id
+        self._get_action_func = get_action_func
+
+    def __call__(self, *args, **kwargs):
+        logger = self._logger
+        logger._agent_id = self._agent_id
+        result = self._get_action_func(*args, **kwargs)
+        action_class_name, action_kwargs = result[2], result[3]
+        if action_class_name is not None or action_kwargs:
+            logger._lines.append({'tick': logger._tick, 'agent': self._agent_id, 'action': action_class_name,
+                                  'kwargs': encode(action_kwargs)})
+        return result
+
+
+class _RecordingPreprocessMessages:
+    # Preprocessing of the message manager that records the messages of the agent that decided last
+    def __init__(self, logger, preprocess_messages):
+        self._logger = logger
+        self._preprocess_messages = preprocess_messages
+
+    def __call__(self, tick, messages, *args, **kwargs):
+        if messages:
+            self._logger._lines.append({'tick': tick, 'agent': self._logger._agent_id, 'messages': [
+                [encode(mssg.content), mssg.from_id, encode(mssg.to_id)] for mssg in messages]})
+        return self._preprocess_messages(tick, messages, *args, **kwargs)
+
+
+def encode(value):
+    '''
+    @return the value in a form that JSON can store without losing its type: tuples are stored as {"__tuple__": [...]}
+    and numpy numbers as python numbers
+    '''
+    if isinstance(value, tuple):
+        return {'__tuple__': [encode(item) for item in value]}
+    if isinstance(value, list):
+        return [encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: encode(item) for key, item in value.items()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def decode(value):
+    '''
+    @return the value as it was before encode
+    '''
+    if isinstance(value, dict):
+        if list(value.keys()) == ['__tuple__']:
+            return tuple(decode(item) for item in value['__tuple__'])
+        return {key: decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    return value
+
+
+def read_session(session_file):
+    '''
+    @return the session info, the decisions as a dictionary keyed by (tick, agent id) with the action and its keyword
+    arguments, and the messages as a dictionary keyed by (tick, agent id) with lists of (content, from id, to id)
+    '''
+    decisions = {}
+    messages = {}
+    with open(session_file) as lines:
+        info = decode(json.loads(next(lines, '{}')))
+        for line in lines:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            key = (record['tick'], record['agent'])
+            if 'messages' in record:
+                messages.setdefault(key, []).extend(
+                    (decode(content), from_id, decode(to_id)) for content, from_id, to_id in record['messages'])
+            else:
+                decisions[key] = (record['action'], decode(record['kwargs']))
+    return info, decisions, messages
+
+
+def flush_session_loggers():
+    '''
+    Writes the recorded decisions of all session loggers.
+    '''
+    for logger in list(_session_loggers):
+        logger.flush()
+
+
+# Write any recorded decisions when the process shuts down
+atexit.register(flush_session_loggers)
@@ -0,0 +1,27 @@
+from matrx.logger.logger import GridWorldLogger
+from worlds1.WorldSnapshot import save_world
+
+
+class SnapshotLogger(GridWorldLogger):
+    '''
+    Logger that saves a snapshot of the whole world, including the memory of the agent brains, at every tick that is a
+    multiple of interval, to one compressed file per snapshot named after its tick. Loggers are called before the
+    agents decide, so a world loaded from a snapshot with load_world continues at the start of that tick.
+    With background=True the snapshots are written by a forked child process (see save_world), which costs the world
+    little more than the fork itself.
+    '''
+    def __init__(self, save_path="", file_name_prefix="", file_extension=".pkl.gz", delimiter=";", interval=500,
+                 background=True):
+        super().__init__(save_path=save_path, file_name=file_name_prefix, file_extension=file_extension,
+                         delimiter=delimiter, log_strategy=1)
+        self._file_extension = file_extension
+        self._interval = interval
+        self._background = background
+        self.snapshot_files = []
+
+    def _grid_world_log(self, grid_world, agent_data, last_tick=False, goal_status=None):
+        tick = grid_world.current_nr_ticks
+        if tick == 0 or tick % self._interval != 0 or not self._needs_to_log(grid_world, last_tick, goal_status):
+            return
+        file_name = '{}_tick{:06d}{}'.format(self.file_name[:-len(self._file_extension)], tick, self._file_extension)
+        self.snapshot_files.append(save_world(grid_world, file_name, background=self._background))
@@ -0,0 +1,187 @@
+import os, csv, json, time, functools
+from collections import deque
+import numpy as np
+
+'''
+Opt-in profiler that measures the wall time and number of calls per tick of the stages of a tick: the step of the
+world, the decisions of the agents, the trust belief file I/O, the goal checks, the action logging and the custom
+actions. The stages are measured by wrapping their methods when the profiler is enabled, and the original methods are
+restored when it is disabled, so a run without the profiler runs exactly the same code as before.
+
+Example:
+    profiler = TickProfiler()
+    with profiler:
+        world.run(builder.api_info)
+    print(profiler.format_summary())
+    profiler.save_trace('profile.json')
+'''
+
+# Percentiles of the summary
+percentiles = [50, 95, 99]
+
+
+class TickProfiler:
+    '''
+    Records the start and end time of every call of a profiled stage, together with the tick in which it happened and,
+    for the agent stage, the phase of the agent after its decision. The times of nested stages are inclusive, e.g. the
+    'tick' stage contains all other stages and the 'agent' stage contains the trust belief I/O of the agent.
+    @param window the number of most recent ticks the summary is computed over
+    '''
+    def __init__(self, window=1000):
+        self._window = deque(maxlen=window)
+        self._events = []
+        self._tick = None
+        self._tick_events = []
+        self._patches = []
+
+    def enable(self):
+        '''
+        Wraps the methods of the profiled stages, until disable is called.
+        '''
+        if self._patches:
+            return self
+        # Imported here, so that importing the profiler does not build the agents and world classes
+        from matrx.grid_world import GridWorld
+        from brains1.ArtificialBrain import ArtificialBrain
+        from agents1.TrustBeliefStore import TrustBeliefStore
+        from worlds1.WorldBuilder import CollectionGoal
+        from loggers.ActionLogger import ActionLogger, BufferedActionLogger
+        import actions1.CustomActions as custom_actions
+        self._patch(GridWorld, '_GridWorld__step', 'tick', self._timed_step)
+        self._patch(ArtificialBrain, 'decide_on_action', 'agent', self._timed_decision)
+        self._patch(TrustBeliefStore, 'load', 'trust_io')
+        self._patch(TrustBeliefStore, 'flush', 'trust_io')
+        self._patch(CollectionGoal, '_CollectionGoal__check_completion', 'goal_check')
+        self._patch(ActionLogger, 'log', 'action_log')
+        self._patch(BufferedActionLogger, '_grid_world_log', 'action_log')
+        for name, action_class in sorted(vars(custom_actions).items()):
+            if isinstance(action_class, type) and action_class.__module__ == custom_actions.__name__ \
+                    and 'mutate' in vars(action_class):
+                self._patch(action_class, 'mutate', 'action.' + name)
+        return self
+
+    def disable(self):
+        '''
+        Restores the original methods of the profiled stages.
+        '''
+        for owner, attribute, original in reversed(self._patches):
+            setattr(owner, attribute, original)
+        self._patches = []
+        self._end_tick()
+        return self
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+        return False
+
+    def _patch(self, owner, attribute, stage, wrap=None):
+        original = vars(owner)[attribute]
+        wrapped = (wrap or self._timed)(stage, original)
+        functools.update_wrapper(wrapped, original)
+        self._patches.append((owner, attribute, original))
+        setattr(owner, attribute, wrapped)
+
+    def _timed(self, stage, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._tick_events.append((stage, start, time.perf_counter(), None))
+        return timed
+
+    def _timed_decision(self, stage, func):
+        def timed(brain, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(brain, *args, **kwargs)
+            finally:
+                phase = getattr(brain, '_phase', None)
+                self._tick_events.append((stage, start, time.perf_counter(), None if phase is None else str(phase)))
+        return timed
+
+    def _timed_step(self, stage, func):
+        def timed(grid_world, *args, **kwargs):
+            self._end_tick()
+            self._tick = grid_world.current_nr_ticks
+            start = time.perf_counter()
+            try:
+                return func(grid_world, *args, **kwargs)
+            finally:
+                self._tick_events.append((stage, start, time.perf_counter(), None))
+                self._end_tick()
+        return timed
+
+    def _end_tick(self):
+        # Adds the calls of the current tick to the trace and to the window of the summary
+        if not self._tick_events:
+            return
+        totals = {}
+        for stage, start, end, phase in self._tick_events:
+            seconds, calls = totals.get(stage, (0.0, 0))
+            totals[stage] = (seconds + end - start, calls + 1)
+        self._window.append(totals)
+        self._events.extend((self._tick,) + event for event in self._tick_events)
+        self._tick_events = []
+
+    def summary(self):
+        '''
+        @return dictionary with per stage the number of ticks in which it ran, the mean number of calls per tick and
+        the percentiles of its time per tick in milliseconds, over the most recent ticks of the window
+        '''
+        self._end_tick()
+        stages = {}
+        for totals in self._window:
+            for stage, (seconds, calls) in totals.items():
+                stages.setdefault(stage, []).append((seconds, calls))
+        summary = {}
+        for stage, values in sorted(stages.items()):
+            values = np.array(values)
+            summary[stage] = {'ticks': len(values), 'calls': float(values[:, 1].mean())}
+            for percentile, value in zip(percentiles, np.percentile(values[:, 0] * 1000, percentiles)):
+                summary[stage]['p' + str(percentile)] = float(value)
+        return summary
+
+    def format_summary(self):
+        '''
+        @return the summary as a table
+        '''
+        lines = ['{:<32}{:>8}{:>8}'.format('stage', 'ticks', 'calls') +
+                 ''.join('{:>10}'.format('p' + str(percentile) + ' ms') for percentile in percentiles)]
+        for stage, values in self.summary().items():
+            lines.append('{:<32}{:>8}{:>8.2f}'.format(stage, values['ticks'], values['calls']) +
+                         ''.join('{:>10.3f}'.format(values['p' + str(percentile)]) for percentile in percentiles))
+        return '\n'.join(lines)
+
+    def save_trace(self, file_name):
+        '''
+        Saves all recorded calls, as a Chrome trace (file_name ending with '.json', to open in chrome://tracing or
+        Perfetto) or as a table with per tick and stage the number of calls, the time and the phase of the agent.
+        '''
+        self._end_tick()
+        folder = os.path.dirname(file_name)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        if file_name.endswith('.json'):
+            origin = self._events[0][2] if self._events else 0.0
+            trace_events = []
+            for tick, stage, start, end, phase in self._events:
+                args = {'tick': tick} if phase is None else {'tick': tick, 'phase': phase}
+                trace_events.append({'name': stage, 'cat': stage.split('.')[0], 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+                                     'ts': (start - origin) * 1e6, 'dur': (end - start) * 1e6, 'args': args})
+            with open(file_name, mode='w') as trace_file:
+                json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, trace_file)
+            return file_name
+        rows = {}
+        for tick, stage, start, end, phase in self._events:
+            seconds, calls, last_phase = rows.get((tick, stage), (0.0, 0, None))
+            rows[(tick, stage)] = (seconds + end - start, calls + 1, phase if phase is not None else last_phase)
+        with open(file_name, mode='w', newline='') as csv_file:
+            csv_writer = csv.writer(csv_file, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            csv_writer.writerow(['tick', 'stage', 'calls', 'seconds', 'phase'])
+            for (tick, stage), (seconds, calls, phase) in rows.items():
+                csv_writer.writerow([tick, stage, calls, seconds, '' if phase is None else phase])
+        return file_name
@@ -1,4 +1,4 @@
-import os, requests
+import os
 import sys
 import csv
 import glob
@@ -6,7 +6,7 @@ import pathlib
 from SaR_gui import visualization_server
 from worlds1.WorldBuilder import create_builder
 from pathlib import Path
-from loggers.OutputLogger import output_logger
+from loggers.OutputLogger import output_logger, run_directory
 
 if __name__ == "__main__":
     fld = os.getcwd()
@@ -28,16 +28,15 @@ if __name__ == "__main__":
     media_folder = pathlib.Path().resolve()
     builder.startup(media_folder=media_folder)
     print("Starting custom visualizer")
-    vis_thread = visualization_server.run_matrx_visualizer(verbose=False, media_folder=media_folder)
+    visualization_server.run_matrx_visualizer(verbose=False, media_folder=media_folder, server='gevent')
     world = builder.get_world()
     print("Started world...")
     builder.api_info['matrx_paused'] = False
     world.run(builder.api_info)
     print("DONE!")
     print("Shutting down custom visualizer")
-    r = requests.get("http://localhost:" + str(visualization_server.port) + "/shutdown_visualizer")
-    vis_thread.join()
+    visualization_server.stop_matrx_visualizer()
     if choice1=="official":
         # Generate one final output log file for the official task type
-        output_logger(fld)
+        output_logger(fld, run_dir=run_directory(world))
     builder.stop()
@@ -0,0 +1,108 @@
+import os, sys
+import bisect
+import argparse
+import tempfile
+from matrx.messages import Message
+from worlds1.WorldBuilder import create_builder
+from worlds1.WorldSnapshot import WorldSnapshot
+from loggers.SessionLogger import read_session
+from brains1.ScriptedHumanBrain import ScriptedHumanBrain
+
+'''
+Replays a session recorded by the SessionLogger (the 'session_*.jsonl' file next to the action log of an official run).
+The world is built with the same settings and runs headless with a tick duration of 0, and every agent performs its
+recorded decisions and sends its recorded messages instead of deciding itself, which reproduces the session tick by
+tick. While replaying, a snapshot of the world is kept every few hundred ticks, so seeking to an earlier tick only
+replays the ticks after the closest snapshot.
+
+Example: python replay.py logs/exp_normal_at_time_.../world_1/session_....jsonl --tick 7000
+'''
+
+
+class SessionReplay:
+    '''
+    Replays a recorded session on a new world.
+    @param session_file the recording of the SessionLogger
+    @param folder the folder with the beliefs the agents load, by default the current folder
+    @param log_folder the folder for the logs of the replayed world, by default a temporary folder
+    @param snapshot_interval the number of ticks between snapshots of the world
+    '''
+    def __init__(self, session_file, folder=None, log_folder=None, snapshot_interval=500):
+        self.info, self._decisions, self._messages = read_session(session_file)
+        self.last_tick = max([tick for tick, _ in list(self._decisions) + list(self._messages)], default=0)
+        self._snapshot_interval = snapshot_interval
+        fld = os.getcwd() if folder is None else folder
+        log_folder = tempfile.mkdtemp(prefix='replay_') if log_folder is None else log_folder
+        # The brains of the agents do not decide during a replay, only their bodies are the same as in the session
+        self._builder = create_builder(task_type=self.info.get('task_type', 'official'),
+                                       condition=self.info.get('condition', 'normal'),
+                                       name=self.info.get('name', 'human'), folder=fld, headless=True,
+                                       max_nr_ticks=self.info.get('max_nr_ticks', float('inf')),
+                                       human_class=ScriptedHumanBrain, log_folder=log_folder,
+                                       seed=self.info.get('seed'), slowdown=self.info.get('slowdown', 8),
+                                       record_session=False, scenario=self.info.get('scenario'))
+        self.world = self._builder.get_world()
+        self.world.initialize(self._builder.api_info)
+        for agent_id, agent_body in self.world.registered_agents.items():
+            agent_body.get_action_func = self._replayed_action_func(agent_id)
+            agent_body.get_messages_func = self._replayed_messages_func(agent_id)
+        self._snapshots = [WorldSnapshot.capture(self.world, brains=False)]
+
+    @property
+    def tick(self):
+        return self.world.current_nr_ticks
+
+    def _replayed_action_func(self, agent_id):
+        def replayed_get_action(state, agent_properties, agent_id=agent_id, user_input=None):
+            action_class_name, action_kwargs = self._decisions.get((self.world.current_nr_ticks, agent_id), (None, {}))
+            return state, agent_properties, action_class_name, dict(action_kwargs)
+        return replayed_get_action
+
+    def _replayed_messages_func(self, agent_id):
+        def replayed_get_messages(all_agent_ids):
+            return [Message(content=content, from_id=from_id, to_id=to_id)
+                    for content, from_id, to_id in self._messages.get((self.world.current_nr_ticks, agent_id), [])]
+        return replayed_get_messages
+
+    def step(self):
+        '''
+        Replays one tick, and keeps a snapshot of the world every snapshot_interval ticks.
+        @return whether the world is done
+        '''
+        is_done, _ = self.world._GridWorld__step()
+        if self.tick % self._snapshot_interval == 0 and self.tick > self._snapshots[-1].tick:
+            self._snapshots.append(WorldSnapshot.capture(self.world, brains=False))
+        return is_done
+
+    def seek(self, tick):
+        '''
+        Brings the world to the start of the given tick, by restoring the closest snapshot at or before that tick and
+        replaying the ticks after it.
+        @return the tick the world is at, which is earlier than the given tick when the world was done before it
+        '''
+        if tick < self.tick:
+            ticks = [snapshot.tick for snapshot in self._snapshots]
+            self._snapshots[bisect.bisect_right(ticks, tick) - 1].restore(self.world)
+        while self.tick < tick:
+            if self.step():
+                break
+        return self.tick
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a session recorded by the SessionLogger.")
+    parser.add_argument('session', help="the session_*.jsonl file of the session")
+    parser.add_argument('--tick', type=int, default=None, help="tick to seek to, by default the end of the session")
+    parser.add_argument('--snapshot-interval', type=int, default=500, help="number of ticks between snapshots")
+    args = parser.parse_args()
+
+    replay = SessionReplay(args.session, snapshot_interval=args.snapshot_interval)
+    tick = replay.seek(replay.last_tick + 1 if args.tick is None else args.tick)
+    goal = replay.world.simulation_goal
+    print("Replayed {} to tick {}: score {}, completeness {:.2f}".format(args.session, tick, goal.score(replay.world),
+                                                                        goal.progress(replay.world)))
+    for agent_id, agent_body in replay.world.registered_agents.items():
+        print("{} at {}, carrying {}, action {}".format(agent_id, agent_body.location,
+                                                       [obj.obj_id for obj in agent_body.is_carrying],
+                                                       agent_body.current_action))
+    sys.exit(0)
@@ -0,0 +1,113 @@
+import os, sys
+import csv
+import time
+import shutil
+import argparse
+import itertools
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+'''
+Runs a sweep of headless sessions over a grid of conditions, random seeds, slowdowns and agent classes. The sessions
+are spread over a pool of worker processes, every session builds its own world and uses its own beliefs and logs
+folder, so the sessions do not share any files. The outputs of all sessions are merged into one results table.
+
+Example: python sweep.py --conditions normal weak --seeds 1 2 3 --slowdowns 8 --agents BaselineAgent --max-ticks 3000
+'''
+
+# Agent classes that can be used in a sweep, imported in the worker so the main process does not build any world
+agent_classes = ['BaselineAgent', 'TutorialAgent']
+
+results_header = ['run', 'condition', 'seed', 'slowdown', 'agent', 'ticks', 'seconds', 'ticks_per_second', 'score',
+                  'completeness', 'no_ticks', 'agent_actions', 'human_actions', 'competence', 'willingness',
+                  'run_folder', 'error']
+
+
+def _load_agent_class(agent):
+    if agent == 'BaselineAgent':
+        from agents1.OfficialAgent import BaselineAgent
+        return BaselineAgent
+    if agent == 'TutorialAgent':
+        from agents1.TutorialAgent import TutorialAgent
+        return TutorialAgent
+    raise ValueError("Unknown agent class " + str(agent) + ", choose from " + str(agent_classes))
+
+
+def run_session(run, condition, seed, slowdown, agent, max_ticks, sweep_folder, beliefs_folder):
+    '''
+    Runs one session of the sweep in its own folder, with a copy of the beliefs in beliefs_folder.
+    @return dictionary with the parameters, summary and output of the session
+    '''
+    from headless import run_headless
+    from loggers.OutputLogger import output_logger
+    result = {'run': run, 'condition': condition, 'seed': seed, 'slowdown': slowdown, 'agent': agent}
+    run_folder = os.path.join(sweep_folder, 'run_{}_{}_seed{}_slowdown{}_{}'.format(run, condition, seed, slowdown, agent))
+    result['run_folder'] = run_folder
+    try:
+        os.makedirs(run_folder, exist_ok=True)
+        shutil.copytree(beliefs_folder, os.path.join(run_folder, 'beliefs'), dirs_exist_ok=True)
+        summary = run_headless(task_type='official', condition=condition, name='scripted', folder=run_folder,
+                               max_ticks=max_ticks, agent_class=_load_agent_class(agent),
+                               log_folder=os.path.join(run_folder, 'logs'), seed=seed, slowdown=slowdown)
+        result.update({key: summary[key] for key in ['ticks', 'seconds', 'ticks_per_second', 'score', 'completeness']})
+        output = output_logger(run_folder, run_dir=summary['exp_folder']) if summary['exp_folder'] else None
+        if output:
+            result.update({key: output[key] for key in ['no_ticks', 'agent_actions', 'human_actions', 'competence',
+                                                        'willingness']})
+    except Exception:
+        # A failing session should not stop the rest of the sweep
+        result['error'] = traceback.format_exc(limit=1).strip().splitlines()[-1]
+    return result
+
+
+def run_sweep(conditions=('normal',), seeds=(1,), slowdowns=(8,), agents=('BaselineAgent',), max_ticks=3000,
+              workers=None, folder=None, beliefs_folder=None):
+    '''
+    Runs a session for every combination of condition, seed, slowdown and agent class over a pool of workers.
+    @param folder the folder in which a new folder is created for the sessions and results of this sweep
+    @param beliefs_folder the beliefs every session starts with, by default the beliefs folder of this repository
+    @return the path of the results table and the list of results, ordered by run
+    '''
+    fld = os.getcwd() if folder is None else folder
+    beliefs_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'beliefs') if beliefs_folder is None else beliefs_folder
+    for agent in agents:
+        _load_agent_class(agent)
+    sweep_folder = os.path.join(fld, 'sweeps', 'sweep_' + time.strftime("%Y-%m-%d_%H%M%S"))
+    os.makedirs(sweep_folder, exist_ok=True)
+    grid = list(itertools.product(conditions, seeds, slowdowns, agents))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_session, run, condition, seed, slowdown, agent, max_ticks, sweep_folder,
+                                   beliefs_folder)
+                   for run, (condition, seed, slowdown, agent) in enumerate(grid)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print("Run {} ({}, seed {}, slowdown {}, {}) finished: score {}, completeness {}{}".format(
+                result['run'], result['condition'], result['seed'], result['slowdown'], result['agent'],
+                result.get('score'), result.get('completeness'),
+                ", error: " + result['error'] if result.get('error') else ""))
+    results.sort(key=lambda result: result['run'])
+    results_file = os.path.join(sweep_folder, 'results.csv')
+    with open(results_file, mode='w') as csv_file:
+        csv_writer = csv.writer(csv_file, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        csv_writer.writerow(results_header)
+        for result in results:
+            csv_writer.writerow([result.get(key, '') for key in results_header])
+    return results_file, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a sweep of headless sessions over a pool of worker processes.")
+    parser.add_argument('--conditions', nargs='+', default=['normal'], choices=['normal', 'strong', 'weak'])
+    parser.add_argument('--seeds', nargs='+', type=int, default=[1], help="random seeds of the world")
+    parser.add_argument('--slowdowns', nargs='+', type=int, default=[8], help="slowdowns of the agent")
+    parser.add_argument('--agents', nargs='+', default=['BaselineAgent'], choices=agent_classes)
+    parser.add_argument('--max-ticks', type=int, default=3000, help="stop each session after this many ticks")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes, by default the number of cores")
+    args = parser.parse_args()
+
+    results_file, results = run_sweep(conditions=args.conditions, seeds=args.seeds, slowdowns=args.slowdowns,
+                                      agents=args.agents, max_ticks=args.max_ticks, workers=args.workers)
+    print("Results of {} runs saved in {}".format(len(results), results_file))
+    sys.exit(0)
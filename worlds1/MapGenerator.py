@@ -0,0 +1,112 @@
+import math
+import numpy as np
+from worlds1.Scenario import load_scenario, save_scenario, scenario_file
+
+'''
+Seeded generator of scenario files (see worlds1/Scenario.py) for worlds of any size, to measure how the agents, the
+goal and the visualizer scale with the number of rooms, victims and obstacles. A generated world is laid out like the
+official world: a grid of rooms with one door each, streets between the rooms, obstacles in the doors, victims in the
+rooms, and a drop zone with the goal victims right of the rooms where RescueBot and the human start. The walls, rooms,
+obstacles, victims and roofs look the same as in the official world.
+
+Example:
+    scenario = generate_scenario(nr_rooms=140, nr_victims=260, obstacle_density=0.7, seed=1)
+    save_scenario(scenario, 'large.json')
+    builder = create_builder('official', 'normal', 'tester', folder, scenario='large.json')
+'''
+
+# Kinds of victims that exist as critically injured, mildly injured and healthy victim
+victim_kinds = ['girl', 'boy', 'woman', 'man', 'elderly woman', 'elderly man', 'dog', 'cat']
+# Templates of the obstacles that block doors
+obstacle_templates = ['rock', 'stone', 'tree']
+
+
+def generate_scenario(nr_rooms=14, nr_victims=26, obstacle_density=0.7, nr_goal_victims=8, columns=None,
+                      room_width=5, room_height=4, seed=1):
+    '''
+    Generates the scenario of a world with nr_rooms rooms, in rows of columns rooms (by default a square grid). Every
+    room has its door in the middle of its bottom wall, with the doormat on the street below it. The drop zone has
+    nr_goal_victims places, the first half for critically and the second half for mildly injured victims, and each
+    goal victim is hidden in a random room. The other victims are healthy.
+    @param nr_victims the number of victims in the rooms, including the goal victims
+    @param obstacle_density the fraction of the doors that is blocked by a rock, stone or tree
+    @param seed the seed of the random locations of the victims and obstacles, the same seed gives the same scenario
+    @return the scenario as a dictionary, to save with save_scenario
+    '''
+    if nr_rooms < 1 or room_width < 3 or room_height < 3:
+        raise ValueError("A generated world needs at least one room of at least 3 by 3 tiles.")
+    if not 1 <= nr_goal_victims <= 2 * len(victim_kinds):
+        raise ValueError("The drop zone has between 1 and {} places, not {}.".format(2 * len(victim_kinds),
+                                                                                     nr_goal_victims))
+    if not nr_goal_victims <= nr_victims <= nr_rooms * (room_width - 2) * (room_height - 2):
+        raise ValueError("The {} rooms fit between {} and {} victims, not {}.".format(
+            nr_rooms, nr_goal_victims, nr_rooms * (room_width - 2) * (room_height - 2), nr_victims))
+    if not 0 <= obstacle_density <= 1:
+        raise ValueError("The obstacle density is a fraction of the doors, not " + str(obstacle_density))
+    rnd_gen = np.random.RandomState(seed)
+    columns = int(math.ceil(math.sqrt(nr_rooms))) if columns is None else columns
+    rows = int(math.ceil(nr_rooms / columns))
+    # Rooms are one column of street apart horizontally, and two rows of street (with the doormats) vertically
+    stride_x, stride_y = room_width + 1, room_height + 2
+    # Right of the rooms are a street, the start locations of the agents and the drop zone
+    drop_x = columns * stride_x + 1
+    width = drop_x + 2
+    height = max((rows - 1) * stride_y + room_height + 3, nr_goal_victims + 4)
+    drop_y = max(2, (height - nr_goal_victims) // 2)
+
+    rooms = []
+    room_tiles = []
+    roofs = []
+    for nr in range(nr_rooms):
+        left, top = 1 + (nr % columns) * stride_x, 1 + (nr // columns) * stride_y
+        door = (left + room_width // 2, top + room_height - 1)
+        rooms.append({'name': 'area ' + str(nr + 1), 'top_left': [left, top], 'width': room_width,
+                      'height': room_height, 'doors': [list(door)], 'doormat': [door[0], door[1] + 1]})
+        room_tiles += [(nr, x, y) for y in range(top + 1, top + room_height - 1)
+                       for x in range(left + 1, left + room_width - 1)]
+        roofs += [[x, y] for y in range(top, top + room_height) for x in range(left, left + room_width)
+                  if (x in [left, left + room_width - 1] or y in [top, top + room_height - 1]) and (x, y) != door]
+
+    # The obstacles block randomly chosen doors
+    nr_obstacles = int(round(obstacle_density * nr_rooms))
+    objects = [{'template': obstacle_templates[rnd_gen.randint(len(obstacle_templates))],
+                'location': rooms[nr]['doors'][0]}
+               for nr in sorted(rnd_gen.choice(nr_rooms, nr_obstacles, replace=False).tolist())]
+
+    # The goal victims, critically injured ones on top of the drop zone
+    nr_critical = (nr_goal_victims + 1) // 2
+    critical = rnd_gen.permutation(len(victim_kinds))[:nr_critical]
+    mild = rnd_gen.permutation(len(victim_kinds))[:nr_goal_victims - nr_critical]
+    goal_victims = ['critically injured ' + victim_kinds[nr] for nr in critical] + \
+                   ['mildly injured ' + victim_kinds[nr] for nr in mild]
+    objects += [{'template': 'ghost block', 'location': [drop_x, drop_y + nr], 'img_name': '/images/' + victim + '.svg'}
+                for nr, victim in enumerate(goal_victims)]
+    victims = goal_victims + ['healthy ' + victim_kinds[rnd_gen.randint(len(victim_kinds))]
+                              for _ in range(nr_victims - nr_goal_victims)]
+    for victim, tile in zip(victims, rnd_gen.choice(len(room_tiles), nr_victims, replace=False).tolist()):
+        nr, x, y = room_tiles[tile]
+        objects.append({'template': 'victim', 'name': victim + ' in area ' + str(nr + 1), 'location': [x, y],
+                        'img_name': '/images/' + victim + '.svg'})
+    objects.append({'template': 'roof', 'locations': roofs})
+
+    # The walls, rooms and objects look like those of the official world
+    official = load_scenario(scenario_file('official'))
+    templates = {name: official['templates'][name] for name in obstacle_templates + ['victim', 'ghost block', 'roof']}
+    return {'shape': [width, height],
+            'bounds': official['bounds'],
+            'room_defaults': official['room_defaults'],
+            'drop_zone': {'location': [drop_x, drop_y], 'height': nr_goal_victims},
+            'agent_locations': {'agent': [drop_x - 1, drop_y + nr_goal_victims // 2 - 1],
+                                'human': [drop_x - 1, drop_y + nr_goal_victims // 2]},
+            'rooms': rooms,
+            'templates': templates,
+            'objects': objects}
+
+
+def generate_scenario_file(file_name, **kwargs):
+    '''
+    Generates a scenario with the settings of generate_scenario and saves it.
+    @return the name of the scenario file
+    '''
+    save_scenario(generate_scenario(**kwargs), file_name)
+    return file_name
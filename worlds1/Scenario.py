@@ -0,0 +1,199 @@
+import os, json, pickle, hashlib, warnings
+from collections import defaultdict
+from matrx import WorldBuilder
+from matrx.grid_world import GridWorld
+from matrx.objects import AreaTile
+
+'''
+Scenario files describe the layout of a world in JSON: its shape, the rooms with their doors and doormats, and the
+objects (obstacles, victims, drop zone ghost blocks, signs, roofs, water, streets and plants) in the order in which they
+are added to the world. A scenario is compiled into the object settings of a MATRX WorldBuilder, and the compiled
+settings are cached in the 'cache' folder keyed by the hash of the scenario file, so building a world from an unchanged
+scenario skips parsing and expanding the rooms into walls, doors and area tiles.
+
+Format:
+    shape           [width, height] of the world, which is surrounded by walls with the "bounds" settings of add_room
+    room_defaults   add_room settings that all rooms share
+    drop_zone       {"location": [x, y], "height": n} of the drop zone, with its top at location
+    agent_locations {"agent": [x, y], "human": [x, y]} where RescueBot and the human start
+    rooms           list of {"name", "top_left", "width", "height", "doors": [[x, y], ...], "doormat": [x, y]}
+    templates       named add_object settings that objects can refer to, the template name is the default object name
+    objects         list of add_object settings: "name", "class" (or "template") and "location", or "locations" to
+                    add the same object at many locations, any other key is passed on to add_object. Objects of the
+                    TileLayer class are added once, with their locations as the tiles of the layer
+All coordinates are stored as lists and passed to the builder as tuples.
+'''
+
+# Folder with the scenario files of the tutorial and official task
+scenario_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scenarios')
+# Version of the compiled format, part of the cache key so a changed compiler does not use old compiled scenarios
+compiled_version = 3
+
+
+def scenario_file(task_type):
+    '''
+    @return the scenario file of the tutorial or official task
+    '''
+    return os.path.join(scenario_folder, task_type + '.json')
+
+
+def _tuples(value):
+    # Coordinates are lists of numbers in JSON, and tuples in the world
+    if isinstance(value, list):
+        if value and all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in value):
+            return tuple(value)
+        return [_tuples(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _tuples(item) for key, item in value.items()}
+    return value
+
+
+def load_scenario(file_name):
+    '''
+    Reads and checks a scenario file.
+    @return the scenario as a dictionary, with all coordinates as tuples
+    '''
+    with open(file_name) as json_file:
+        scenario = _tuples(json.load(json_file))
+    for key in ['shape', 'drop_zone', 'agent_locations', 'rooms', 'objects']:
+        if key not in scenario:
+            raise ValueError(f"The scenario {file_name} has no '{key}'.")
+    templates = scenario.get('templates', {})
+    for nr, obj in enumerate(scenario['objects']):
+        if 'template' in obj and obj['template'] not in templates:
+            raise ValueError(f"Object {nr} of the scenario {file_name} uses the unknown template {obj['template']}.")
+        if ('location' in obj) == ('locations' in obj):
+            raise ValueError(f"Object {nr} of the scenario {file_name} needs either a 'location' or 'locations'.")
+    return scenario
+
+
+def save_scenario(scenario, file_name):
+    '''
+    Writes a scenario file, with one line per room, template and object like the scenario files in this folder.
+    '''
+    dumps = lambda value: json.dumps(value, separators=(', ', ': '))
+    lines = []
+    for key, value in scenario.items():
+        if isinstance(value, list) and key in ['rooms', 'objects']:
+            lines.append('  {}: [\n{}\n  ]'.format(dumps(key), ',\n'.join('    ' + dumps(item) for item in value)))
+        elif key == 'templates':
+            lines.append('  {}: {{\n{}\n  }}'.format(dumps(key), ',\n'.join(
+                '    {}: {}'.format(dumps(name), dumps(template)) for name, template in value.items())))
+        else:
+            lines.append('  {}: {}'.format(dumps(key), dumps(value)))
+    if os.path.dirname(file_name):
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    with open(file_name, mode='w') as json_file:
+        json_file.write('{\n' + ',\n'.join(lines) + '\n}\n')
+
+
+def _add_scenario(builder, scenario, classes):
+    # Adds the rooms and objects of the scenario to the builder, in the order of the scenario
+    width, height = scenario['shape']
+    builder.add_room(top_left_location=(0, 0), width=width, height=height, name="world_bounds",
+                     **scenario.get('bounds', {}))
+    room_defaults = scenario.get('room_defaults', {})
+    for room in scenario['rooms']:
+        builder.add_room(top_left_location=room['top_left'], width=room['width'], height=room['height'],
+                         name=room['name'], door_locations=list(room['doors']),
+                         area_custom_properties={'doormat': room['doormat']}, **room_defaults)
+    templates = scenario.get('templates', {})
+    for obj in scenario['objects']:
+        settings = {'name': obj['template']} if 'template' in obj else {}
+        settings.update(templates.get(obj.get('template'), {}))
+        settings.update(obj)
+        settings.pop('template', None)
+        locations = [settings.pop('location')] if 'location' in settings else settings.pop('locations')
+        name = settings.pop('name')
+        class_name = settings.pop('class', 'EnvObject')
+        if class_name not in classes:
+            raise ValueError(f"The object {name} of the scenario has the unknown class {class_name}.")
+        if class_name == 'TileLayer':
+            # The layer lies at the top left of the world, the same tile only needs to be drawn once
+            builder.add_object((0, 0), name, callable_class=classes[class_name],
+                               tiles=[list(location) for location in dict.fromkeys(locations)], **settings)
+            continue
+        for location in locations:
+            builder.add_object(location, name, callable_class=classes[class_name], **settings)
+
+
+def compile_scenario(file_name, classes, folder=None):
+    '''
+    Compiles a scenario into the object settings of a WorldBuilder, or loads them from the cache.
+    @param classes dictionary of the object classes the scenario can use, by class name
+    @param folder the folder in which the 'cache' folder with compiled scenarios is stored, no disk cache when None
+    @return the shape of the world, the list of object settings to extend the object settings of a builder with, and a
+    dictionary with the drop zone and agent locations of the scenario
+    '''
+    with open(file_name, 'rb') as scenario_data:
+        key = hashlib.sha256(scenario_data.read()).hexdigest()[:16]
+    cache_file = os.path.join(folder, 'cache', 'scenario_{}_v{}.pkl'.format(key, compiled_version)) \
+        if folder is not None else None
+    if cache_file is not None and os.path.isfile(cache_file):
+        with open(cache_file, 'rb') as compiled_file:
+            return pickle.load(compiled_file)
+    scenario = load_scenario(file_name)
+    compiler = WorldBuilder(shape=list(scenario['shape']))
+    _add_scenario(compiler, scenario, classes)
+    locations = {'drop_zone': scenario['drop_zone'], 'agent_locations': scenario['agent_locations']}
+    compiled = (list(scenario['shape']), compiler.object_settings, locations)
+    if cache_file is not None:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        # Write to a temporary file first, so builders in other processes never read a half written cache file
+        tmp_file = cache_file + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_file, 'wb') as compiled_file:
+            pickle.dump(compiled, compiled_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    return compiled
+
+
+# Whether this MATRX version has the private methods that the ScenarioBuilder replaces
+_placement_hooks = hasattr(WorldBuilder, '_WorldBuilder__create_grid_world') and \
+    callable(getattr(GridWorld, '_GridWorld__validate_obj_placement', None))
+if not _placement_hooks:
+    warnings.warn("The ScenarioBuilder cannot replace the placement check of this MATRX version, worlds are built with "
+                  "the (slower) check of MATRX.")
+
+
+class ScenarioBuilder(WorldBuilder):
+    '''
+    WorldBuilder that checks the placement of the objects it adds to a new world in linear time. The placement check of
+    MATRX compares every new object with all objects added before it, which makes building a world with hundreds of
+    wall, door and area tiles take most of a second. This builder checks the same rule (no two intraversable objects,
+    not counting area tiles, on the same location) with a table per location while the world is built, and gives the
+    world its own check back afterwards.
+    MATRX has no hook for the placement check, so this builder replaces the private methods
+    WorldBuilder.__create_grid_world and GridWorld.__validate_obj_placement. When a MATRX version does not have them,
+    the builder warns and the worlds are built with the check of MATRX.
+    '''
+    def add_scenario(self, compiled):
+        '''
+        Adds the object settings of a compiled scenario (see compile_scenario).
+        '''
+        self.object_settings.extend(compiled[1])
+
+    def get_world(self):
+        world = super().get_world()
+        world.__dict__.pop('_GridWorld__validate_obj_placement', None)
+        return world
+
+    def _WorldBuilder__create_grid_world(self):
+        world = super()._WorldBuilder__create_grid_world()
+        if _placement_hooks:
+            world._GridWorld__validate_obj_placement = _PlacementCheck()
+        return world
+
+
+class _PlacementCheck:
+    # The placement check of a GridWorld, with the intraversable objects added so far per location
+    def __init__(self):
+        self._intraversable = defaultdict(list)
+
+    def __call__(self, env_object):
+        obj_loc = tuple(env_object.location)
+        intraversable_objs = [obj.obj_id for obj in self._intraversable.get(obj_loc, [])]
+        if not env_object.is_traversable and len(intraversable_objs) > 0:
+            raise Exception(f"Invalid placement. Could not place object {env_object.obj_id} in grid, location already "
+                            f"occupied by intraversable object {intraversable_objs} at location {obj_loc}")
+        if not env_object.is_traversable and AreaTile.__name__ not in env_object.class_inheritance:
+            self._intraversable[obj_loc].append(env_object)
@@ -0,0 +1,267 @@
+import io, os, gzip, types, pickle, atexit, warnings, threading, tempfile, traceback
+from collections import OrderedDict
+from loggers.ActionLogger import idle_action_logger_threads
+
+# Attributes of objects and agent bodies that never change during a session, and are therefore not part of a snapshot
+static_attributes = {'obj_id', 'obj_name', 'class_inheritance', 'customizable_properties', 'sense_capability',
+                     'action_set', 'team', 'is_human_agent'}
+
+# Attributes of agent brains that never change during a session or only cache the static world, shared instead of copied
+shared_brain_attributes = {'agent_id', 'agent_name', 'action_set', 'sense_capability', 'keys_of_agent_writable_props',
+                           'rnd_seed', '_navigation', '_folder', '_ArtificialBrain__folder'}
+
+# Processes that are still writing a world snapshot to disk
+_snapshot_writers = []
+
+
+class WorldSnapshot:
+    '''
+    Copy of everything in a GridWorld that changes while it runs: the tick number, the objects and agent bodies (their
+    locations, carried objects, properties and current actions), which objects are in the world (e.g. obstacles that
+    were removed), the state of the goal (e.g. the ticks at which victims were dropped off), the messages, the random
+    generator of the world and the memory of the agent brains (e.g. the searched rooms, found victims and phase).
+    A snapshot is restored into the world it was taken from, which replaces its changing state and keeps everything
+    that does not change, so restoring does not build the world again. The changing state is kept as one pickle, in
+    which the objects, agent bodies and values that do not change (such as the navigation graph) are references to the
+    instances of the world instead of copies.
+    '''
+    def __init__(self, tick, world_state, objects, brains, payload):
+        self.tick = tick
+        self._world_state = world_state
+        self._objects = objects
+        self._brains = brains
+        self._payload = payload
+
+    @classmethod
+    def capture(cls, world, brains=True):
+        '''
+        @param brains whether to include the memory of the agent brains, not needed when the brains do not decide
+        @return a snapshot of the changing state of the world
+        '''
+        objects = _instances(world)
+        brains = _brains(world) if brains else []
+        message_manager = world.message_manager
+        payload = {'objects': [{key: value for key, value in vars(obj).items()
+                                if key not in static_attributes and not callable(value)} for obj in objects],
+                   'brains': [{key: value for key, value in vars(brain).items()
+                               if key not in shared_brain_attributes and not callable(value)} for brain in brains],
+                   'goal': {key: value for key, value in vars(world.simulation_goal).items() if not callable(value)},
+                   'message_buffer': world._GridWorld__message_buffer,
+                   'preprocessed_messages': message_manager.preprocessed_messages}
+        world_state = {'current_nr_ticks': world.current_nr_ticks,
+                       'is_done': world._GridWorld__is_done,
+                       'environment_objects': list(world.environment_objects.keys()),
+                       'registered_agents': list(world.registered_agents.keys()),
+                       'obj_indices': dict(world._GridWorld__obj_indices),
+                       'rnd_state': world._GridWorld__rnd_gen.get_state(),
+                       'current_available_tick': message_manager.current_available_tick,
+                       'message_id': message_manager.message_id}
+        buffer = io.BytesIO()
+        _SharingPickler(buffer, _shared(world, objects, brains)).dump(payload)
+        return cls(world.current_nr_ticks, world_state, objects, brains, buffer.getvalue())
+
+    def restore(self, world):
+        '''
+        Sets the world back to the state of the snapshot. The snapshot is copied while restoring, so it can be restored
+        any number of times.
+        '''
+        payload = _SharingUnpickler(io.BytesIO(self._payload), _shared(world, self._objects, self._brains)).load()
+        for obj, state in zip(self._objects, payload['objects']):
+            obj.__dict__.update(state)
+        for brain, state in zip(self._brains, payload['brains']):
+            brain.__dict__.update(state)
+        world.simulation_goal.__dict__.update(payload['goal'])
+        instances = {obj.obj_id: obj for obj in self._objects}
+        environment_objects = world._GridWorld__environment_objects
+        environment_objects.clear()
+        environment_objects.update(OrderedDict((obj_id, instances[obj_id])
+                                               for obj_id in self._world_state['environment_objects']))
+        registered_agents = world._GridWorld__registered_agents
+        agent_ids = self._world_state['registered_agents']
+        for agent_id in list(registered_agents.keys()):
+            if agent_id not in agent_ids:
+                registered_agents.pop(agent_id)
+        world._GridWorld__current_nr_ticks = self._world_state['current_nr_ticks']
+        world._GridWorld__is_done = self._world_state['is_done']
+        world._GridWorld__obj_indices = dict(self._world_state['obj_indices'])
+        world._GridWorld__message_buffer = payload['message_buffer']
+        world._GridWorld__rnd_gen.set_state(self._world_state['rnd_state'])
+        message_manager = world.message_manager
+        message_manager.preprocessed_messages = payload['preprocessed_messages']
+        message_manager.current_available_tick = self._world_state['current_available_tick']
+        message_manager.message_id = self._world_state['message_id']
+        world._GridWorld__update_grid()
+        return world
+
+
+class _WorldPickler(pickle.Pickler):
+    # Pickles a whole world with its agent brains and loggers. The keys view of the registered agents that the message
+    # manager keeps is pickled as a list, and threads (the api thread in the api info) are left out. Bound private
+    # methods (such as the callback of the world that the agent brains use to check actions) are looked up by their
+    # mangled name, which pickle does not do by itself.
+    def reducer_override(self, obj):
+        if isinstance(obj, types.MethodType) and obj.__name__.startswith('__') and not obj.__name__.endswith('__'):
+            class_name = obj.__func__.__qualname__.rsplit('.', 2)[-2]
+            return getattr, (obj.__self__, '_' + class_name.lstrip('_') + obj.__name__)
+        if isinstance(obj, type(OrderedDict().keys())):
+            return list, (list(obj),)
+        if isinstance(obj, threading.Thread):
+            return type(None), ()
+        return NotImplemented
+
+
+class _SharingPickler(_WorldPickler):
+    # Pickles references to the shared instances instead of the instances themselves. This is done in reducer_override,
+    # which the pickler does not call for plain values such as numbers, strings, lists and dictionaries, unlike
+    # persistent_id.
+    def __init__(self, file, shared):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._shared = {id(obj): nr for nr, obj in enumerate(shared)}
+
+    def reducer_override(self, obj):
+        nr = self._shared.get(id(obj))
+        if nr is not None:
+            return _shared_instance, (nr,)
+        return super().reducer_override(obj)
+
+
+def _shared_instance(nr):
+    # Stands for a shared instance in a snapshot, the _SharingUnpickler replaces it by the instance
+    raise pickle.UnpicklingError("A world snapshot is restored with WorldSnapshot.restore")
+
+
+class _SharingUnpickler(pickle.Unpickler):
+    def __init__(self, file, shared):
+        super().__init__(file)
+        self._shared = shared
+
+    def find_class(self, module, name):
+        if module == __name__ and name == _shared_instance.__name__:
+            return self._shared.__getitem__
+        return super().find_class(module, name)
+
+
+def _write_world(world, file_name):
+    # Writes the world to a temporary file first, so the snapshot file is complete whenever it exists
+    folder = os.path.dirname(file_name) or '.'
+    os.makedirs(folder, exist_ok=True)
+    handle, temp_name = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as temp_file, gzip.GzipFile(fileobj=temp_file, mode='wb', compresslevel=3) as zipped:
+            _WorldPickler(zipped, protocol=pickle.HIGHEST_PROTOCOL).dump(world)
+        os.replace(temp_name, file_name)
+    finally:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+
+
+def save_world(world, file_name, background=True):
+    '''
+    Saves the whole world, including its agent brains, goal and loggers, to a compressed binary file.
+    With background=True (and an OS that can fork) the snapshot is written by a forked child process: the child gets a
+    copy-on-write view of the memory of the world, so the world continues right away and only the pages it changes
+    afterwards are copied. Call wait_for_snapshots to wait until all snapshots are written.
+    The child only has the thread that saves the world, and sees the memory as that thread saw it when it forked. A
+    lock held by another thread at that moment stays locked in the child, so the world is only saved in the background
+    when the only other threads are the idle writers of buffered action loggers, which wait on queues the child does not
+    use. With other threads running, e.g. the MATRX api and visualizer of main.py, the world is saved synchronously.
+    @return the file name
+    '''
+    _reap_snapshot_writers()
+    if background and hasattr(os, 'fork'):
+        other_threads = set(threading.enumerate()) - {threading.current_thread()}
+        background = other_threads.issubset(idle_action_logger_threads())
+    if not background:
+        _write_world(world, file_name)
+        return file_name
+    with warnings.catch_warnings():
+        # Python 3.12+ warns about forking with other threads, of which only idle writers are left here
+        warnings.simplefilter('ignore', DeprecationWarning)
+        pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            _write_world(world, file_name)
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        finally:
+            # Exits the child without running the exit handlers and loggers of the parent
+            os._exit(status)
+    _snapshot_writers.append(pid)
+    return file_name
+
+
+def load_world(file_name, log_folder=None):
+    '''
+    Loads a world saved by save_world, without building it again. The world continues at the tick it was saved with
+    world.run(api_info) or step by step, headless (without the visualizer and api).
+    @param log_folder folder for the logs of the loaded world, e.g. to branch an experiment off a saved session. By
+    default the loggers append to the logs of the session that was saved.
+    @return the world
+    '''
+    with gzip.open(file_name, 'rb') as zipped:
+        world = pickle.load(zipped)
+    message_manager = world.message_manager
+    if message_manager.agents is not None:
+        message_manager.agents = world._GridWorld__registered_agents.keys()
+    world._GridWorld__run_matrx_api = False
+    world._GridWorld__api_info = {'run_matrx_api': False, 'api_thread': None}
+    if log_folder is not None:
+        os.makedirs(log_folder, exist_ok=True)
+        for logger in world._GridWorld__loggers:
+            logger._GridWorldLogger__save_path = log_folder
+            logger._GridWorldLogger__file_name = os.path.join(log_folder, os.path.basename(logger.file_name))
+            # The new logs start at the tick of the snapshot
+            if hasattr(logger, '_chunk_nr'):
+                logger._chunk_nr = 0
+            if hasattr(logger, '_written'):
+                logger._written = False
+    return world
+
+
+def _reap_snapshot_writers():
+    for pid in list(_snapshot_writers):
+        if os.waitpid(pid, os.WNOHANG)[0] != 0:
+            _snapshot_writers.remove(pid)
+
+
+def wait_for_snapshots():
+    '''
+    Waits until all snapshots that are written in the background are on disk.
+    '''
+    while _snapshot_writers:
+        os.waitpid(_snapshot_writers.pop(), 0)
+
+
+# Finish writing the snapshots when the process shuts down
+atexit.register(wait_for_snapshots)
+
+
+def _brains(world):
+    # The brains of the agents, found through the initialize function the body of an agent has of its brain
+    brains = []
+    for agent_body in world.registered_agents.values():
+        brain = getattr(agent_body.brain_initialize_func, '__self__', None)
+        if brain is not None:
+            brains.append(brain)
+    return brains
+
+
+def _instances(world):
+    # All objects and agent bodies of the world, including the objects that are carried and thus not on the grid
+    instances = OrderedDict()
+    for obj in list(world.environment_objects.values()) + list(world.registered_agents.values()):
+        instances[id(obj)] = obj
+        for carried in getattr(obj, 'is_carrying', []):
+            instances[id(carried)] = carried
+    return list(instances.values())
+
+
+def _shared(world, objects, brains):
+    # Objects, agent bodies, the world and the brain attributes that do not change are shared by the world and its
+    # snapshots, in the same order for capturing and restoring
+    shared = list(objects) + [world]
+    for brain in brains:
+        shared += [value for key, value in sorted(vars(brain).items()) if key in shared_brain_attributes]
+    return shared